@@ -0,0 +1,109 @@
+"""
+Author:     Chris Knowles
+File:       all_in_ev.py
+Version:    1.0.0
+Notes:      Benchmark of all-in EV accounting at showdown, three players with different stacks (so
+            there are side pots) go all-in pre-flop, on the flop or on the turn hand after hand, the
+            mean and the standard error of each player's actual results are compared with their
+            all-in adjusted results, the board is run once and then twice, the chips in the pot are
+            checked to be conserved and the cost of a showdown is timed, run from the repository
+            root with:
+                python -m benchmarks.all_in_ev
+"""
+# Imports
+import time
+import numpy as np
+from data_model.betting import Betting
+from data_model.dealer import Dealer
+from data_model.player import Player
+from data_model.table import Table
+from engine import gconsts
+
+
+# Global consts
+STACKS = (100, 300, 600)
+BIG_BLIND = 10
+SEED = 2024
+
+# Every all-in is a name, the number of board cards dealt before the all-in and the number of hands played
+ALL_INS = (("pre-flop", 0, 100),
+           ("on the flop", 3, 3000),
+           ("on the turn", 4, 3000))
+RUN_COUNTS = (1, 2)
+
+
+# Functions
+def play_hand(table, board_count, run_count):
+    """
+    Plays one hand at the supplied table, every player calls until the street with the supplied number of board
+    cards is reached and then every player goes all-in
+
+    :param table: Table class instance
+    :param board_count: number of board cards dealt before the all-in
+    :param run_count: number of times the rest of the board is run
+
+    :return ShowdownResult class instance
+    """
+    table.new_round(advance_button=True)
+    for player, stack in zip(table.players, STACKS):
+        player.funds = stack
+    table.dealer.deal_to_players(2, is_hole_card=True)
+
+    betting = Betting.for_table(table, BIG_BLIND)
+    betting.post_blinds(BIG_BLIND // 2)
+
+    for street_board_count in (0, 3, 4):
+        if street_board_count:
+            table.dealer.deal_to_table(street_board_count - len(table.board))
+            betting.start_street()
+
+        while not betting.is_street_complete:
+            seat = betting.to_act
+            if street_board_count == board_count and betting.can_raise(seat) and \
+                    betting.stacks[seat] > betting.to_call(seat):
+                betting.act(gconsts.BET_RAISE_ACTION_VALUE, int(betting.street_bets[seat] + betting.stacks[seat]))
+            else:
+                betting.act(gconsts.CHECK_CALL_ACTION_VALUE)
+
+        if street_board_count == board_count:
+            break
+
+    return table.showdown(betting, run_count=run_count)
+
+
+def main():
+    players = [Player("Player {0}".format(i), stack) for i, stack in enumerate(STACKS)]
+    table = Table("All-in", Dealer("Dealer", np.random.default_rng(SEED)), players)
+
+    for name, board_count, hands in ALL_INS:
+        for run_count in RUN_COUNTS:
+            net = {p.ident: [] for p in players}
+            expected_net = {p.ident: [] for p in players}
+            conserved = True
+            elapsed = 0.0
+
+            for _ in range(hands):
+                start = time.perf_counter()
+                result = play_hand(table, board_count, run_count)
+                elapsed += time.perf_counter() - start
+
+                conserved &= result.payouts.sum() == result.invested.sum()
+                conserved &= abs(result.expected.sum() - result.invested.sum()) < 1e-6
+                for player, n, e in zip(players, result.net, result.expected_net):
+                    net[player.ident].append(n)
+                    expected_net[player.ident].append(e)
+
+            print("All-in {0}, board run {1}, {2:,} hands, {3:.2f} ms a hand, chips {4}".format(
+                name, "once" if run_count == 1 else "{0} times".format(run_count), hands, elapsed / hands * 1e3,
+                "conserved" if conserved else "NOT CONSERVED"))
+            for player in players:
+                actual = np.array(net[player.ident])
+                adjusted = np.array(expected_net[player.ident])
+                print("    {0} ({1:>3} chips): actual {2:>+7.2f} +/- {3:>6.2f}, all-in adjusted {4:>+7.2f} +/- "
+                      "{5:>6.2f}".format(player.name, STACKS[players.index(player)], actual.mean(),
+                                         actual.std() / np.sqrt(hands), adjusted.mean(),
+                                         adjusted.std() / np.sqrt(hands)))
+
+
+if __name__ == "__main__":
+    main()
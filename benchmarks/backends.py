@@ -0,0 +1,79 @@
+"""
+Author:     Chris Knowles
+File:       backends.py
+Version:    1.0.0
+Notes:      Benchmark of the evaluation and equity backends, every available backend is first
+            checked by the correctness suite (see backends.verify()) and then timed evaluating
+            a batch of seven card hands and the equity of three hands over a batch of boards,
+            the speedup of each is reported against the pure Python backend, the Numba backend
+            is only included when Numba is installed and its compile time is not counted, run
+            from the repository root with:
+                python -m benchmarks.backends
+"""
+# Imports
+import time
+import numpy as np
+from engine import backends
+from engine import evaluator
+
+
+# Global consts
+HAND_COUNT = 200000
+BOARD_COUNT = 100000
+PLAYER_COUNT = 3
+PYTHON_FRACTION = 10
+
+
+# Functions
+def time_call(function, *args):
+    """
+    Times one call of the supplied function
+
+    :param function: function to time
+    :param args: arguments of the function
+
+    :return tuple of (result, seconds taken)
+    """
+    start = time.perf_counter()
+    result = function(*args)
+
+    return result, time.perf_counter() - start
+
+
+def main():
+    rng = np.random.default_rng(2024)
+    deals = np.argsort(rng.random((max(HAND_COUNT, BOARD_COUNT), evaluator.CARD_COUNT)), axis=1)
+    hands = deals[:HAND_COUNT, :7]
+
+    # Every board avoids the hole cards, which are the first cards of the first deal
+    holes = deals[0, :2 * PLAYER_COUNT].reshape(PLAYER_COUNT, 2)
+    rest = deals[:BOARD_COUNT][~np.isin(deals[:BOARD_COUNT], holes)].reshape(BOARD_COUNT, -1)
+    boards = rest[:, :5]
+
+    python_rates = None
+    expected = None
+    for name in backends.available():
+        failures = backends.verify(name)
+        backend = backends.get(name)
+
+        # The pure Python backend is timed on a slice of each batch, Numba is compiled before timing
+        fraction = PYTHON_FRACTION if name == backends.PYTHON_BACKEND else 1
+        backend.evaluate_batch(hands[:10])
+        backend.equity(holes, boards[:10])
+
+        strengths, evaluate_time = time_call(backend.evaluate_batch, hands[:HAND_COUNT // fraction])
+        _, equity_time = time_call(backend.equity, holes, boards[:BOARD_COUNT // fraction])
+        rates = (HAND_COUNT // fraction / evaluate_time, BOARD_COUNT // fraction / equity_time)
+        python_rates = rates if python_rates is None else python_rates
+
+        if expected is None:
+            expected = strengths
+        assert strengths[:len(expected)].tolist() == expected[:len(strengths)].tolist()
+
+        print("{0:<7} {1}: evaluate {2:12,.0f} hands/s ({3:6.1f}x), equity {4:10,.0f} boards/s ({5:6.1f}x)".format(
+            name, "passed" if not failures else "FAILED {0}".format(len(failures)), rates[0],
+            rates[0] / python_rates[0], rates[1], rates[1] / python_rates[1]))
+
+
+if __name__ == "__main__":
+    main()
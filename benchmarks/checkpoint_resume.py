@@ -0,0 +1,180 @@
+"""
+Author:     Chris Knowles
+File:       checkpoint_resume.py
+Version:    1.0.0
+Notes:      Self-check that a run resumed from a checkpoint is bit-identical to one that was never
+            stopped, hands are played at several tables with a single deck, a lazily shuffled shoe
+            and shoes with a cut card, drawing from a named numpy generator and from the global
+            random and numpy generators, each run is played through once and then again with a
+            crash after every few checkpoints, the tables and generators are set up from scratch
+            after each crash (as a new process would) and the run resumed, the players' funds,
+            the accumulated statistics, a digest of every card dealt and the decks left at the end
+            must all match, the time of a checkpoint is also reported, run from the repository
+            root with:
+                python -m benchmarks.checkpoint_resume
+"""
+# Imports
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+import numpy as np
+from data_model.dealer import Dealer
+from data_model.deck import Deck
+from data_model.player import Player
+from data_model.table import Table
+from engine import checkpoint
+from engine import evaluator
+from engine import streams
+
+
+# Global consts
+TABLE_COUNT = 3
+PLAYER_COUNT = 4
+FUNDS = 1000
+HANDS = 200
+INTERVAL = 50
+# A run is crashed once it has played each of these numbers of hands, and resumed from its last checkpoint
+CRASHES = (120, 170)
+SEED = 2024
+
+# Every deck set up is a name and the keyword arguments of the deck
+DECKS = (("1 deck", dict()),
+         ("1 deck, lazy", dict(lazy=True)),
+         ("6 deck shoe", dict(deck_count=6)),
+         ("6 deck shoe, lazy", dict(deck_count=6, lazy=True)),
+         ("6 deck shoe, cut card", dict(deck_count=6, cut_card=78)),
+         ("6 deck shoe, lazy, cut card", dict(deck_count=6, lazy=True, cut_card=78)))
+
+
+# Functions
+def set_up(deck_kwargs):
+    """
+    Sets up a run from scratch, as a new process would, seeding every generator and creating the tables
+
+    :param deck_kwargs: keyword arguments of the deck of every table
+
+    :return tuple of (tables, named generators, statistics of a new run)
+    """
+    streams.seed(SEED)
+    random.seed(SEED)
+    np.random.seed(SEED)
+
+    tables = [Table("Table {0}".format(t), Dealer("Dealer {0}".format(t), deck=Deck(**deck_kwargs)),
+                    [Player("Player {0}".format(i), FUNDS) for i in range(PLAYER_COUNT)])
+              for t in range(TABLE_COUNT)]
+    stats = {"wins": np.zeros(PLAYER_COUNT, dtype=np.int64), "digest": 0}
+
+    return tables, {"bets": np.random.default_rng(SEED)}, stats
+
+
+def play_hand(tables, generators, stats):
+    """
+    Plays one hand at every table, the winner takes a random bet from every player and some hands are returned
+    to the bottom of the deck so a shoe with a cut card also has cards pushed back into it
+
+    :param tables: Table class instances of the run
+    :param generators: named generators of the run
+    :param stats: statistics of the run, updated in place
+
+    :return nothing
+    """
+    for table in tables:
+        table.new_round(advance_button=True)
+        table.dealer.deal_to_players(2, is_hole_card=True)
+        table.dealer.deal_to_table(5)
+
+        board = [c.index for c in table.board]
+        holes = [[c.index for c in p.hand.hole_cards] for p in table.players]
+        stats["digest"] = zlib.crc32(bytes(board + sum(holes, [])), stats["digest"])
+
+        strengths = [evaluator.evaluate(hole + board) for hole in holes]
+        winner = int(np.argmax(strengths))
+        bet = int(generators["bets"].integers(1, 10))
+        for player in table.players:
+            player.funds -= bet
+        table.players[winner].funds += bet * PLAYER_COUNT
+        stats["wins"][winner] += 1
+
+        if random.random() < 0.3:
+            table.dealer.deck.return_hand(table.players[0].hand, append=np.random.random() < 0.5)
+
+
+def run(deck_kwargs, path=None, crash=None):
+    """
+    Plays a run, resuming it from its checkpoint file if there is one
+
+    :param deck_kwargs: keyword arguments of the deck of every table
+    :param path: path of the checkpoint file, if None then no checkpoints are written
+    :param crash: number of hands after which the run crashes, if None then the run is played to the end
+
+    :return tuple of (funds, statistics, decks at the end, mean time of a checkpoint in seconds), None if the run
+            crashed
+    """
+    tables, generators, stats = set_up(deck_kwargs)
+    checkpointer = checkpoint.Checkpointer(path, INTERVAL) if path else None
+    step = 0
+    elapsed = 0.0
+    saved = 0
+
+    if checkpointer:
+        step, stats = checkpointer.resume(tables, generators, stats)
+
+    for step in range(step, HANDS):
+        play_hand(tables, generators, stats)
+
+        if checkpointer:
+            start = time.perf_counter()
+            saved += checkpointer.update(step + 1, tables, generators, stats)
+            elapsed += time.perf_counter() - start
+
+        if step + 1 == crash:
+            return None
+
+    funds = [p.funds for table in tables for p in table.players]
+    decks = [table.dealer.deck.get_state() for table in tables]
+
+    return funds, stats, decks, elapsed / max(saved, 1)
+
+
+def is_identical(a, b):
+    """
+    Returns True if the supplied results of two runs are identical
+
+    :param a: results of one run, as returned by run()
+    :param b: results of the other run
+
+    :return True if identical, False otherwise
+    """
+    same_stats = np.array_equal(a[1]["wins"], b[1]["wins"]) and a[1]["digest"] == b[1]["digest"]
+    same_decks = all(x["cards"] == y["cards"] and x["rng"] == y["rng"] for x, y in zip(a[2], b[2]))
+
+    return a[0] == b[0] and same_stats and same_decks
+
+
+def main():
+    all_identical = True
+
+    with tempfile.TemporaryDirectory() as directory:
+        for index, (name, kwargs) in enumerate(DECKS):
+            path = os.path.join(directory, "run{0}.ckpt".format(index))
+
+            uninterrupted = run(kwargs)
+            for crash in CRASHES:
+                run(kwargs, path, crash)
+            resumed = run(kwargs, path)
+
+            identical = is_identical(uninterrupted, resumed)
+            all_identical &= identical
+            print("{0:<30}resumed run {1}, checkpoint {2:.2f} ms, {3:,} bytes".format(
+                name, "identical" if identical else "DIFFERENT", resumed[3] * 1e3,
+                os.path.getsize(path)))
+
+    if not all_identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Author:     Chris Knowles
+File:       icm.py
+Version:    1.0.0
+Notes:      Benchmark of the ICM calculator, the exact equities are checked against the naive
+            recursion over every finishing order for small tables, a final table of ten players is
+            timed with every place paid, and sampling is compared with the exact equities and timed
+            for a large field, run from the repository root with:
+                python -m benchmarks.icm
+"""
+# Imports
+import time
+import numpy as np
+from data_model.player import Player
+from data_model.table import Table
+from engine import icm
+
+
+# Global consts
+SEED = 2024
+FINAL_TABLE_PAYOUTS = (0.30, 0.20, 0.14, 0.10, 0.08, 0.06, 0.045, 0.035, 0.025, 0.015)
+REPEATS = 20
+
+
+# Functions
+def naive_equities(stacks, payouts):
+    """
+    Returns the tournament equity of every player by the naive recursion over every finishing order
+
+    :param stacks: chips of each player
+    :param payouts: prize of each paid place, first place first
+
+    :return numpy float64 array of the equity of each player
+    """
+    result = np.zeros(len(stacks))
+
+    def recurse(remaining, chance, place):
+        if place == len(payouts) or not remaining:
+            return
+        total = sum(stacks[i] for i in remaining)
+        for i in remaining:
+            p = chance * stacks[i] / total
+            result[i] += p * payouts[place]
+            recurse([j for j in remaining if not j == i], p, place + 1)
+
+    recurse(list(range(len(stacks))), 1.0, 0)
+
+    return result
+
+
+def main():
+    rng = np.random.default_rng(SEED)
+
+    for player_count in (4, 6, 8):
+        stacks = rng.integers(1000, 50000, player_count).tolist()
+        payouts = FINAL_TABLE_PAYOUTS[:player_count - 1]
+        start = time.perf_counter()
+        naive = naive_equities(stacks, payouts)
+        naive_time = time.perf_counter() - start
+        start = time.perf_counter()
+        exact = icm.equities(stacks, payouts)
+        exact_time = time.perf_counter() - start
+        print("{0:2d} players: naive {1:9.2f} ms, subsets {2:6.2f} ms, max difference {3:.1e}".format(
+            player_count, naive_time * 1e3, exact_time * 1e3, np.abs(naive - exact).max()))
+
+    # Final table of ten players seated at a table
+    table = Table(name="Final table")
+    for i, funds in enumerate(rng.integers(1000, 100000, 10).tolist()):
+        table.add_player(Player(name="Player {0}".format(i), funds=funds))
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        final = icm.table_equities(table, FINAL_TABLE_PAYOUTS)
+    print("10 player final table: {0:.2f} ms, equities sum to {1:.6f}".format(
+        (time.perf_counter() - start) / REPEATS * 1e3, final.sum()))
+
+    # Sampling against the exact equities of a larger table
+    stacks = rng.integers(1000, 100000, 14)
+    payouts = np.linspace(2.0, 0.5, 9) / 10
+    start = time.perf_counter()
+    exact = icm.equities(stacks, payouts)
+    exact_time = time.perf_counter() - start
+    start = time.perf_counter()
+    sampled = icm.equities(stacks, payouts, exact_limit=0, seed=SEED)
+    print("14 players, 9 paid: exact {0:.1f} ms, sampled {1:.1f} ms, max error {2:.1e}".format(
+        exact_time * 1e3, (time.perf_counter() - start) * 1e3, np.abs(sampled - exact).max()))
+
+    # Large field, more sets of players than the exact limit
+    stacks = rng.integers(1000, 100000, 500)
+    payouts = np.linspace(3.0, 0.5, 50) / 70
+    start = time.perf_counter()
+    field = icm.equities(stacks, payouts, seed=SEED)
+    print("500 players, 50 paid: sampled in {0:.2f} s, equities sum to {1:.6f}".format(
+        time.perf_counter() - start, field.sum()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Author:     Chris Knowles
+File:       player_stats.py
+Version:    1.0.0
+Notes:      Benchmark of the player statistics store, hands are played with random actions at a
+            table and recorded, the stored counts are checked against counts worked out from the
+            actions alone, then a million hands of counts for a field of players are ingested into
+            a database file one hand at a time and in bulk, and the time of a lookup during play is
+            measured, run from the repository root with:
+                python -m benchmarks.player_stats
+"""
+# Imports
+import os
+import tempfile
+import time
+import uuid
+import numpy as np
+from data_model.betting import Betting
+from engine import gconsts
+from engine import player_stats
+
+
+# Global consts
+SEAT_COUNT = 6
+PLAYER_COUNT = 1000
+PLAYED_HANDS = 2000
+INGESTED_HANDS = 1000000
+CHUNK_SIZE = 10000
+LOOKUPS = 100000
+SEED = 2024
+
+
+# Functions
+def play_hands(rng, idents, store):
+    """
+    Plays hands at one table with random actions, recording every hand in the store, the counts every player
+    should have are worked out here from the actions alone, independently of the recorder
+
+    :param rng: numpy random Generator
+    :param idents: identifier of the player in each seat
+    :param store: PlayerStatsStore class instance
+
+    :return numpy int64 array of the expected counts of each seat, of shape (SEAT_COUNT, len(COUNT_NAMES))
+    """
+    recorder = player_stats.HandRecorder()
+    betting = Betting([1000] * SEAT_COUNT, 0, 20)
+    expected = np.zeros((SEAT_COUNT, len(player_stats.COUNT_NAMES)), dtype=np.int64)
+
+    for h in range(PLAYED_HANDS):
+        betting.reset([1000] * SEAT_COUNT, h % SEAT_COUNT, 20)
+        betting.post_blinds(10)
+        recorder.start(betting)
+        vpip = np.zeros(SEAT_COUNT, dtype=bool)
+        pfr = np.zeros(SEAT_COUNT, dtype=bool)
+
+        for street in range(4):
+            if street:
+                recorder.start_street(betting)
+            while not betting.is_street_complete:
+                seat = betting.to_act
+                to_call = betting.to_call(seat)
+                action = rng.choice(3, p=(0.3, 0.55, 0.15))
+                if action == gconsts.BET_RAISE_ACTION_VALUE and betting.can_raise(seat):
+                    recorder.act(betting, action, betting.current_bet + betting.min_raise)
+                    if street:
+                        expected[seat, player_stats.BET_RAISE_COUNT] += 1
+                    else:
+                        vpip[seat] = pfr[seat] = True
+                elif action == gconsts.FOLD_ACTION_VALUE and to_call:
+                    recorder.act(betting, action)
+                else:
+                    recorder.act(betting, gconsts.CHECK_CALL_ACTION_VALUE)
+                    if to_call and street:
+                        expected[seat, player_stats.CALL_COUNT] += 1
+                    elif to_call:
+                        vpip[seat] = True
+
+        payouts = betting.settle(rng.integers(0, 100, SEAT_COUNT))
+        recorder.showdown(betting, payouts)
+        store.add(idents, recorder.counts)
+
+        in_hand = ~betting.pot.folded
+        expected[:, player_stats.HANDS_COUNT] += 1
+        expected[:, player_stats.VPIP_COUNT] += vpip
+        expected[:, player_stats.PFR_COUNT] += pfr
+        if np.count_nonzero(in_hand) > 1:
+            expected[:, player_stats.SHOWDOWN_COUNT] += in_hand
+            expected[:, player_stats.SHOWDOWN_WIN_COUNT] += in_hand & (payouts > 0)
+
+    return expected
+
+
+def random_counts(rng, hands):
+    """
+    Returns random counts of the supplied number of hands at one table
+
+    :param rng: numpy random Generator
+    :param hands: number of hands
+
+    :return numpy int64 array of shape (hands, SEAT_COUNT, len(player_stats.COUNT_NAMES))
+    """
+    counts = np.zeros((hands, SEAT_COUNT, len(player_stats.COUNT_NAMES)), dtype=np.int64)
+    counts[..., player_stats.HANDS_COUNT] = 1
+    counts[..., player_stats.VPIP_COUNT] = rng.random((hands, SEAT_COUNT)) < 0.25
+    counts[..., player_stats.PFR_COUNT] = counts[..., player_stats.VPIP_COUNT] & (rng.random((hands, SEAT_COUNT)) < 0.7)
+    counts[..., player_stats.SHOWDOWN_COUNT] = counts[..., player_stats.VPIP_COUNT] & (rng.random((hands, SEAT_COUNT)) < 0.3)
+    counts[..., player_stats.SHOWDOWN_WIN_COUNT] = counts[..., player_stats.SHOWDOWN_COUNT] & (rng.random((hands, SEAT_COUNT)) < 0.5)
+    counts[..., player_stats.BET_RAISE_COUNT] = rng.integers(0, 3, (hands, SEAT_COUNT))
+    counts[..., player_stats.CALL_COUNT] = rng.integers(0, 2, (hands, SEAT_COUNT))
+
+    return counts
+
+
+def ingest(path, rng, players, one_at_a_time):
+    """
+    Ingests INGESTED_HANDS hands of random counts, each chunk of hands is played by six players of the field
+
+    :param path: path of the database file
+    :param rng: numpy random Generator
+    :param players: identifiers of the field of players
+    :param one_at_a_time: if True then every hand is added on its own, otherwise a chunk at a time
+
+    :return tuple of (store, expected counts of every player as dict, time taken in seconds)
+    """
+    store = player_stats.PlayerStatsStore(path)
+    expected = {}
+    elapsed = 0.0
+
+    for _ in range(INGESTED_HANDS // CHUNK_SIZE):
+        idents = [players[i] for i in rng.choice(len(players), SEAT_COUNT, replace=False)]
+        counts = random_counts(rng, CHUNK_SIZE)
+        for ident, c in zip(idents, counts.sum(axis=0)):
+            expected[ident] = expected.get(ident, 0) + c
+
+        start = time.perf_counter()
+        if one_at_a_time:
+            for hand_counts in counts:
+                store.add(idents, hand_counts)
+        else:
+            store.add(idents, counts)
+        elapsed += time.perf_counter() - start
+
+    start = time.perf_counter()
+    store.flush()
+
+    return store, expected, elapsed + time.perf_counter() - start
+
+
+def main():
+    rng = np.random.default_rng(SEED)
+
+    # Recorded counts must be consistent with each other
+    store = player_stats.PlayerStatsStore()
+    idents = [uuid.uuid4() for _ in range(SEAT_COUNT)]
+    expected = play_hands(rng, idents, store)
+    recorded_ok = True
+    for ident, counts in zip(idents, expected):
+        stats = store.get(ident)
+        ok = np.array_equal(stats.counts, counts)
+        recorded_ok &= ok
+        print("    {0} {1}".format(stats, "ok" if ok else "WRONG"))
+    assert recorded_ok, "Recorded counts do not match the actions played"
+    store.close()
+
+    players = [uuid.uuid4() for _ in range(PLAYER_COUNT)]
+    with tempfile.TemporaryDirectory() as directory:
+        for one_at_a_time in (True, False):
+            path = os.path.join(directory, "stats{0}.db".format(int(one_at_a_time)))
+            store, expected, elapsed = ingest(path, rng, players, one_at_a_time)
+            ok = all(np.array_equal(store.get(ident).counts, counts) for ident, counts in expected.items())
+            print("{0:,} hands ingested {1} in {2:.2f}s ({3:,.0f} hands/s), counts {4}".format(
+                INGESTED_HANDS, "one at a time" if one_at_a_time else "in chunks", elapsed,
+                INGESTED_HANDS / elapsed, "ok" if ok else "WRONG"))
+
+            lookups = [players[i] for i in rng.integers(0, len(players), LOOKUPS)]
+            start = time.perf_counter()
+            for ident in lookups:
+                store.get(ident)
+            print("    lookup {0:.1f} us".format((time.perf_counter() - start) / LOOKUPS * 1e6))
+
+            start = time.perf_counter()
+            regulars = store.get_players(min_hands=INGESTED_HANDS * SEAT_COUNT // PLAYER_COUNT)
+            print("    {0} players with at least the average number of hands found in {1:.2f} ms".format(
+                len(regulars), (time.perf_counter() - start) * 1e3))
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
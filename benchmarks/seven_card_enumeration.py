@@ -0,0 +1,63 @@
+"""
+Author:     Chris Knowles
+File:       seven_card_enumeration.py
+Version:    1.0.0
+Notes:      Full enumeration benchmark, every one of the 133,784,560 seven card hands is unranked
+            from its combinatorial index in chunks, evaluated with the batch evaluator and counted
+            by hand quality, the histogram is checked against the known counts and a sample of each
+            chunk is ranked back to check the round trip, run from the repository root with:
+                python -m benchmarks.seven_card_enumeration [chunk size]
+"""
+# Imports
+import sys
+import time
+import numpy as np
+from engine import combinatorics
+from engine import evaluator
+from engine import gconsts
+
+
+# Global consts
+HAND_SIZE = 7
+DEFAULT_CHUNK_SIZE = 1000000
+CHECK_SAMPLE = 1000
+
+# Known number of seven card hands of each hand quality, by hand quality value
+KNOWN_COUNTS = (23294460, 58627800, 31433400, 6461620, 6180020, 4047644, 3473184, 224848, 37260, 4324)
+
+
+# Functions
+def main():
+    chunk_size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CHUNK_SIZE
+    total = combinatorics.set_count(HAND_SIZE)
+    histogram = np.zeros(len(gconsts.HAND_QUALITIES), dtype=np.int64)
+    unrank_time = evaluate_time = 0.0
+
+    start = time.perf_counter()
+    for first in range(0, total, chunk_size):
+        t = time.perf_counter()
+        indices = np.arange(first, min(first + chunk_size, total))
+        hands = combinatorics.unrank_batch(indices, HAND_SIZE)
+        unrank_time += time.perf_counter() - t
+
+        t = time.perf_counter()
+        strengths = evaluator.evaluate_batch(hands)
+        histogram += np.bincount(strengths >> evaluator.QUALITY_SHIFT, minlength=len(histogram))
+        evaluate_time += time.perf_counter() - t
+
+        assert (combinatorics.rank_batch(hands[:CHECK_SAMPLE]) == indices[:CHECK_SAMPLE]).all()
+    elapsed = time.perf_counter() - start
+
+    for value, name in enumerate(gconsts.HAND_QUALITIES):
+        print("{0:>14}: {1:12,d} {2}".format(name, histogram[value],
+                                             "ok" if histogram[value] == KNOWN_COUNTS[value] else
+                                             "expected {0:,d}".format(KNOWN_COUNTS[value])))
+    print("{0:>14}: {1:12,d}".format("Total", histogram.sum()))
+    print("{0:,d} hands in {1:.1f} s ({2:.1f} M hands/s), unranking {3:.1f} s, evaluation {4:.1f} s".format(
+        total, elapsed, total / elapsed / 1e6, unrank_time, evaluate_time))
+
+    assert histogram.tolist() == list(KNOWN_COUNTS)
+
+
+if __name__ == "__main__":
+    main()
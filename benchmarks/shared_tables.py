@@ -0,0 +1,81 @@
+"""
+Author:     Chris Knowles
+File:       shared_tables.py
+Version:    1.0.0
+Notes:      Benchmark of worker start up with and without shared evaluator tables, a pool of spawned
+            worker processes each imports every table building engine module and reports how long
+            the import took and how many bytes of tables it built itself, run from the repository
+            root with:
+                python -m benchmarks.shared_tables [workers]
+"""
+# Imports
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+
+# Global consts
+DEFAULT_WORKERS = 8
+
+
+# Functions
+def start_worker(_):
+    """
+    Imports the table building engine modules in a worker process
+
+    :return tuple of (seconds taken to import, bytes of tables built rather than attached)
+    """
+    # Numpy is imported first so that only the engine modules are timed
+    import numpy
+    start = time.perf_counter()
+    from engine import lowball, preflop, tables, wild
+    elapsed = time.perf_counter() - start
+
+    installed = tables._installed_tables()
+    attached = set(installed.groups) if installed is not None else set()
+    built = 0
+    for name, group in tables._loaded.items():
+        if name not in attached:
+            built += sum(a.nbytes for a in ((group,) if hasattr(group, "nbytes") else group))
+
+    return elapsed, built
+
+
+def run_pool(workers):
+    """
+    Starts a pool of spawned workers and imports the engine modules in every one of them
+
+    :param workers: number of worker processes
+
+    :return tuple of (seconds to start every worker, average import seconds, total bytes built by workers)
+    """
+    context = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        results = list(pool.map(start_worker, range(workers), chunksize=1))
+    elapsed = time.perf_counter() - start
+
+    return elapsed, sum(r[0] for r in results) / workers, sum(r[1] for r in results)
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_WORKERS
+
+    from engine import lowball, preflop, tables, wild
+    separate = run_pool(workers)
+
+    shared = tables.share()
+    try:
+        attached = run_pool(workers)
+    finally:
+        shared.unlink()
+
+    for label, (elapsed, average, built) in (("separate", separate), ("shared", attached)):
+        print("{0:>8} tables: {1} workers started in {2:6.2f} s, import {3:7.1f} ms/worker, "
+              "{4:6.1f} MB of tables built by workers".format(label, workers, elapsed, 1e3 * average, built / 1e6))
+    print("shared block: {0:.1f} MB".format(shared.size / 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Author:     Chris Knowles
+File:       shoe.py
+Version:    1.0.0
+Notes:      Benchmark of the per-hand cost of readying a deck and dealing a Holdem hand from it,
+            for heads-up, six-handed and nine-handed games, with a deck shuffled in full every hand
+            and one shuffled lazily as it is dealt, for a single deck and a six deck shoe (a single
+            deck asked to be lazy is shuffled in full, see Deck), run from the repository root with:
+                python -m benchmarks.shoe
+"""
+# Imports
+import time
+import numpy as np
+from data_model.deck import Deck
+from engine import preflop
+
+
+# Global consts
+PLAYER_COUNTS = (2, 6, 9)
+HANDS = 100000
+# Best of several timings, as the cost of a hand is only a few microseconds
+REPEATS = 3
+SEED = 2024
+
+# Every deck set up is a name and the keyword arguments of the deck
+DECKS = (("1 deck, full shuffle", dict(deck_count=1)),
+         ("1 deck, lazy", dict(deck_count=1, lazy=True)),
+         ("6 deck shoe, full shuffle", dict(deck_count=6)),
+         ("6 deck shoe, lazy", dict(deck_count=6, lazy=True)),
+         ("6 deck shoe, lazy, cut card", dict(deck_count=6, lazy=True, cut_card=52)))
+
+
+# Functions
+def time_hands(deck, card_count):
+    """
+    Times readying the supplied deck for a new round and dealing the supplied number of cards, many times over
+
+    :param deck: Deck class instance
+    :param card_count: number of cards dealt each hand
+
+    :return time of each hand in microseconds
+    """
+    start = time.perf_counter()
+    for _ in range(HANDS):
+        deck.new_round()
+        for _ in range(card_count):
+            deck.pop_shuffled_card()
+
+    return (time.perf_counter() - start) / HANDS * 1e6
+
+
+def main():
+    print("{0:<30}{1}".format("", "".join("{0:>12}".format("{0} players".format(p)) for p in PLAYER_COUNTS)))
+    for name, kwargs in DECKS:
+        times = []
+        for player_count in PLAYER_COUNTS:
+            deck = Deck(rng=np.random.default_rng(SEED), **kwargs)
+            times.append(min(time_hands(deck, 2 * player_count + preflop.BOARD_SIZE) for _ in range(REPEATS)))
+        print("{0:<30}{1}".format(name, "".join("{0:>9.2f} us".format(t) for t in times)))
+
+
+if __name__ == "__main__":
+    main()
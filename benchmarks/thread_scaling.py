@@ -0,0 +1,149 @@
+"""
+Author:     Chris Knowles
+File:       thread_scaling.py
+Version:    1.0.0
+Notes:      Benchmark and check of the threading model, a fixed set of tables (each with its own
+            dealer, deck and generator spawned in the main thread) plays five card hands on 1, 2,
+            4 and 8 threads, and an adaptive equity simulation draws its batches on the same
+            numbers of threads, every threaded run must give exactly the same results as the
+            sequential run and the speed up over it is reported, the scaling is only near linear
+            on a free-threaded (no GIL) build of Python, run from the repository root with:
+                python -m benchmarks.thread_scaling
+"""
+# Imports
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import time
+from data_model.player import Player
+from data_model.dealer import Dealer
+from data_model.table import Table
+from engine import equity
+from engine import evaluator
+from engine import streams
+
+
+# Global consts
+THREAD_COUNTS = (1, 2, 4, 8)
+TABLE_COUNT = 8
+PLAYER_COUNT = 6
+HAND_SIZE = 5
+HANDS_PER_TABLE = 1000
+SEED = 2024
+
+
+# Functions
+def gil_enabled():
+    """
+    Returns True if this build of Python runs with the GIL
+
+    :return True if the GIL is enabled, False otherwise
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def make_tables():
+    """
+    Sets up the tables of a run, every dealer's deck owns a generator spawned from the root seed in this thread so
+    each table deals the same cards whichever thread plays it
+
+    :return list of Table class instances
+    """
+    streams.seed(SEED)
+    result = []
+    for t in range(TABLE_COUNT):
+        table = Table(name="Table {0}".format(t), dealer=Dealer(name="Dealer {0}".format(t),
+                                                                rng=streams.generator()))
+        for p in range(PLAYER_COUNT):
+            table.add_player(Player(name="Player {0}".format(p), funds=10000, max_hand_size=HAND_SIZE))
+        result.append(table)
+
+    return result
+
+
+def play(table):
+    """
+    Plays hands at the supplied table, this only touches the table, its dealer and its players
+
+    :param table: Table class instance
+
+    :return list of the number of hands won by each player
+    """
+    wins = [0] * table.player_count
+    for _ in range(HANDS_PER_TABLE):
+        table.new_round(advance_button=True)
+        table.dealer.deal_to_players(count=HAND_SIZE)
+        for player in table.players:
+            player.hand.determine_quality()
+
+        best = 0
+        for p in range(1, table.player_count):
+            if table.players[p].hand.compare_hands(table.players[best].hand) > 0:
+                best = p
+        wins[best] += 1
+
+    return wins
+
+
+def run_tables(thread_count):
+    """
+    Plays every table on a pool of threads, each table is played by one thread
+
+    :param thread_count: number of threads
+
+    :return tuple of (wins of every table, time taken in seconds)
+    """
+    table_list = make_tables()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(thread_count) as pool:
+        wins = list(pool.map(play, table_list))
+
+    return wins, time.perf_counter() - start
+
+
+def run_equity(thread_count):
+    """
+    Runs an adaptive equity simulation drawing its batches on a pool of threads
+
+    :param thread_count: number of threads
+
+    :return running_stats.SimulationReport class instance
+    """
+    holes = [[0, 48], [44, 45], [36, 38]]
+
+    return equity.equity_adaptive(holes, precision=0.002, batch_size=20000, min_samples=20000, seed=SEED,
+                                  threads=thread_count)
+
+
+def main():
+    print("Python {0}, GIL {1}".format(sys.version.split()[0], "enabled" if gil_enabled() else "disabled"))
+
+    # Writing to a shared table is refused
+    try:
+        evaluator.NP_STRAIGHTS[0] = 0
+        print("shared tables: writable (FAILED)")
+    except ValueError:
+        print("shared tables: read-only")
+
+    sequential_wins, sequential_time = None, None
+    for thread_count in THREAD_COUNTS:
+        wins, elapsed = run_tables(thread_count)
+        sequential_wins = wins if sequential_wins is None else sequential_wins
+        sequential_time = elapsed if sequential_time is None else sequential_time
+        print("tables: {0} thread(s) {1:7.3f}s ({2:4.2f}x), {3}".format(
+            thread_count, elapsed, sequential_time / elapsed,
+            "same as sequential" if wins == sequential_wins else "DIFFERENT FROM SEQUENTIAL"))
+
+    sequential = None
+    for thread_count in THREAD_COUNTS:
+        report = run_equity(thread_count)
+        sequential = report if sequential is None else sequential
+        same = report.samples == sequential.samples and (report.mean == sequential.mean).all()
+        print("equity: {0} thread(s) {1:7.3f}s ({2:4.2f}x), {3} samples, {4}".format(
+            thread_count, report.elapsed, sequential.elapsed / report.elapsed, report.samples,
+            "same as sequential" if same else "DIFFERENT FROM SEQUENTIAL"))
+
+
+if __name__ == "__main__":
+    main()
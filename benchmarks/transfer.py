@@ -0,0 +1,73 @@
+"""
+Author:     Chris Knowles
+File:       transfer.py
+Version:    1.0.0
+Notes:      Benchmark of moving dealt hands to a worker process, as pickled Hand objects, as the
+            compact bytes encoding and as a shared memory batch the worker attaches to, each worker
+            evaluates every hand it receives so the results can be checked to match, run from the
+            repository root with:
+                python -m benchmarks.transfer [hands]
+"""
+# Imports
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import numpy as np
+
+
+# Global consts
+DEFAULT_HANDS = 200000
+CARDS_PER_HAND = 7
+
+
+# Functions
+def evaluate_hands(hands):
+    from engine import evaluator
+    return evaluator.evaluate_batch(np.array([[c.index for c in h.cards] for h in hands])).sum()
+
+
+def evaluate_encoded(data):
+    from engine import evaluator
+    cards = np.frombuffer(data, dtype=np.int8).reshape(-1, CARDS_PER_HAND)
+    return evaluator.evaluate_batch(cards).sum()
+
+
+def evaluate_shared(descriptor):
+    from engine import evaluator
+    from engine.shared_batch import SharedHandBatch
+    batch = SharedHandBatch.attach(descriptor)
+    total = evaluator.evaluate_batch(batch.cards).sum()
+    batch.close()
+    return total
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_HANDS
+
+    from engine.shared_batch import SharedHandBatch
+    batch = SharedHandBatch.create(count, CARDS_PER_HAND)
+    batch.deal(np.random.default_rng(7))
+    hands = batch.hands()
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(1, mp_context=context) as pool:
+        pool.submit(evaluate_encoded, b"").result()
+
+        results = []
+        for label, function, payload in (("Hand objects", evaluate_hands, hands),
+                                          ("encoded bytes", evaluate_encoded, batch.cards.tobytes()),
+                                          ("shared memory", evaluate_shared, batch.descriptor)):
+            size = len(pickle.dumps(payload))
+            start = time.perf_counter()
+            results.append(pool.submit(function, payload).result())
+            elapsed = time.perf_counter() - start
+            print("{0:>14}: {1:10d} bytes sent, {2:7.3f} s including evaluation".format(label, size, elapsed))
+
+    batch.unlink()
+    assert len(set(results)) == 1
+
+
+if __name__ == "__main__":
+    main()
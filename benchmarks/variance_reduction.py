@@ -0,0 +1,67 @@
+"""
+Author:     Chris Knowles
+File:       variance_reduction.py
+Version:    1.0.0
+Notes:      Benchmark of the equity sampling modes, for a few close spots every sampling mode is
+            run until the confidence interval of the first player's (the hero's) equity is within
+            the target precision and the number of runouts evaluated, the time taken and the error
+            against the exact equity are reported, run from the repository root with:
+                python -m benchmarks.variance_reduction
+"""
+# Imports
+from engine import equity
+from engine import evaluator
+from engine import preflop
+
+
+# Global consts
+PRECISION = 0.003
+BATCH_SIZE = 2000
+MIN_SAMPLES = 100
+SEED = 2024
+
+
+# Functions
+def card(value, suit):
+    """
+    Returns the integer encoded card of the supplied value and suit
+
+    :param value: index into gconsts.VALUE_NAMES, ace first
+    :param suit: index into gconsts.SUIT_NAMES
+
+    :return integer encoded card
+    """
+    return value * evaluator.SUIT_COUNT + suit
+
+
+# Every spot is a name, the hole cards of each player and the board
+SPOTS = (("preflop AKs v QQ", [[card(0, 0), card(12, 0)], [card(11, 1), card(11, 2)]], []),
+         ("flop flush draw v overpair", [[card(0, 1), card(5, 1)], [card(10, 0), card(10, 2)]],
+          [card(9, 1), card(3, 1), card(1, 3)]),
+         ("flop top pair v open-ended", [[card(0, 1), card(12, 2)], [card(4, 0), card(5, 2)]],
+          [card(0, 3), card(6, 1), card(8, 3)]),
+         ("turn flush draw v overpair", [[card(0, 1), card(5, 1)], [card(10, 0), card(10, 2)]],
+          [card(9, 1), card(3, 1), card(1, 3), card(7, 0)]))
+
+
+def main():
+    for name, holes, board in SPOTS:
+        exact = equity.equity(holes, board, exact_limit=2000000)
+        to_come = preflop.BOARD_SIZE - len(board)
+        remaining_count = evaluator.CARD_COUNT - len(board) - sum(len(h) for h in holes)
+        print("{0}: exact equity {1:.4f}".format(name, exact[0]))
+
+        uniform_runouts = None
+        for sampling in equity.SAMPLINGS:
+            report = equity.equity_adaptive(holes, board, precision=PRECISION, batch_size=BATCH_SIZE,
+                                            min_samples=MIN_SAMPLES, seed=SEED, sampling=sampling, hero=0)
+            runouts = report.samples * equity.runouts_per_sample(sampling, to_come, remaining_count)
+            uniform_runouts = runouts if uniform_runouts is None else uniform_runouts
+            error = abs(report.mean[2 * len(holes)] - exact[0])
+
+            print("    {0:<10} {1:9d} runouts ({2:4.2f}x uniform) in {3:6.3f}s, error {4:.4f}".format(
+                sampling, runouts, runouts / uniform_runouts, report.elapsed, error))
+
+
+if __name__ == "__main__":
+    main()
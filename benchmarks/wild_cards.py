@@ -0,0 +1,82 @@
+"""
+Author:     Chris Knowles
+File:       wild_cards.py
+Version:    1.0.0
+Notes:      Benchmark of wild card (joker) evaluation, the direct best-completion evaluator (scalar
+            and batch) against naive substitution of every card for every joker, every result is
+            checked against the naive result, run from the repository root with:
+                python -m benchmarks.wild_cards
+"""
+# Imports
+import time
+import numpy as np
+from engine import evaluator
+from engine import wild
+
+
+# Global consts
+HAND_SIZE = 7
+SCALAR_HANDS = 2000
+BATCH_HANDS = 200000
+NAIVE_TWO_WILD_HANDS = 100
+
+
+# Functions
+def deal_hands(count, wild_count, rng):
+    """
+    Deals random seven card hands each holding the supplied number of jokers
+
+    :param count: number of hands
+    :param wild_count: number of jokers in each hand
+    :param rng: numpy random generator
+
+    :return numpy int64 array of shape (count, 7) of integer encoded cards
+    """
+    real = np.argsort(rng.random((count, evaluator.CARD_COUNT)), axis=1)[:, :HAND_SIZE - wild_count]
+    jokers = np.tile(np.arange(evaluator.CARD_COUNT, evaluator.CARD_COUNT + wild_count), (count, 1))
+
+    return np.hstack((real, jokers)).astype(np.int64)
+
+
+def time_per_hand(function, hands):
+    """
+    Times the supplied scalar evaluation function over the supplied hands
+
+    :param function: function taking a list of integer encoded cards
+    :param hands: numpy array of hands
+
+    :return tuple of (list of results, seconds per hand)
+    """
+    rows = hands.tolist()
+    start = time.perf_counter()
+    results = [function(row) for row in rows]
+
+    return results, (time.perf_counter() - start) / len(rows)
+
+
+def main():
+    rng = np.random.default_rng(2024)
+
+    for wild_count in range(1, wild.MAX_WILD_COUNT + 1):
+        hands = deal_hands(SCALAR_HANDS, wild_count, rng)
+        naive_hands = hands if wild_count == 1 else hands[:NAIVE_TWO_WILD_HANDS]
+
+        naive, naive_time = time_per_hand(wild.evaluate_wild_naive, naive_hands)
+        direct, direct_time = time_per_hand(wild.evaluate_wild, hands)
+        batch_hands = deal_hands(BATCH_HANDS, wild_count, rng)
+        start = time.perf_counter()
+        batch = wild.evaluate_wild_batch(batch_hands)
+        batch_time = (time.perf_counter() - start) / BATCH_HANDS
+
+        assert direct[:len(naive)] == naive
+        assert wild.evaluate_wild_batch(hands).tolist() == direct
+        assert batch[:100].tolist() == [wild.evaluate_wild(row) for row in batch_hands[:100].tolist()]
+
+        print("{0} joker(s): naive {1:9.2f} us/hand, direct {2:7.2f} us/hand ({3:.0f}x), "
+              "batch {4:6.3f} us/hand ({5:.0f}x)".format(wild_count, 1e6 * naive_time, 1e6 * direct_time,
+                                                         naive_time / direct_time, 1e6 * batch_time,
+                                                         naive_time / batch_time))
+
+
+if __name__ == "__main__":
+    main()
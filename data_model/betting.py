@@ -0,0 +1,422 @@
+"""
+Author:     Chris Knowles
+File:       betting.py
+Version:    1.0.0
+Notes:      No limit betting for a single poker hand, covering antes, blinds and each street of
+            betting through to settling the pot, the state of every seat is held in numpy arrays
+            indexed by seat so that no per-player objects are needed while simulating
+"""
+# Imports
+import numpy as np
+from engine import gconsts
+from engine.exceptions import IllegalActionError
+from data_model.pot import Pot
+
+
+# Classes
+class Betting:
+    """
+    No limit betting for a single poker hand - class variables:
+        none
+    """
+    def __init__(self, stacks, button_index=0, big_blind=0):
+        """
+        Initialiser - instance variables:
+            __stacks: chips each seat has behind (ie. not yet put into the pot), as numpy int64 array indexed
+                      by seat, property with read only access
+            __street_bets: chips each seat has put in during the current street, as numpy int64 array indexed
+                           by seat, property with read only access
+            __all_in: whether each seat is all-in, as numpy bool array indexed by seat
+            __acted: whether each seat has acted since the last full bet or raise, as numpy bool array indexed
+                     by seat, a seat that has acted cannot raise again until it is reopened by a full raise
+            __pot: pot holding all chips contributed this hand, as Pot class, property with read only access
+            __button_index: seat index of the player on the button, heads-up a button on a seat not dealt in
+                            moves to the small blind (see post_blinds()), property with read only access
+            __big_blind: size of the big blind, also the minimum bet, property with read only access
+            __current_bet: street bet every seat still in the hand must match, property with read only access
+            __min_raise: minimum size of a raise above the current bet, property with read only access
+            __to_act: seat index of the player to act next, or gconsts.NO_PLAYER_INDEX if the current street
+                      of betting is complete, property with read only access
+
+        :param stacks: chips held by each seat at the start of the hand, as sequence indexed by seat
+        :param button_index: seat index of the player on the button
+        :param big_blind: size of the big blind
+        """
+        self.__stacks = np.array(stacks, dtype=np.int64)
+        self.__street_bets = np.zeros(len(self.__stacks), dtype=np.int64)
+        self.__all_in = np.zeros(len(self.__stacks), dtype=bool)
+        self.__acted = np.zeros(len(self.__stacks), dtype=bool)
+        self.__pot = Pot(len(self.__stacks))
+        self.__button_index = button_index
+        self.__big_blind = big_blind
+        self.__current_bet = 0
+        self.__min_raise = big_blind
+        self.__to_act = gconsts.NO_PLAYER_INDEX
+
+        # Seats that start the hand with no chips are not dealt in
+        self.__pot.folded[:] = self.__stacks == 0
+
+    @classmethod
+    def for_table(cls, table, big_blind=0):
+        """
+        Creates the betting for a new hand at the supplied table, using the funds of the players at the
+        table as the stacks and the table's current button
+
+        :param table: table the hand is being played at
+        :param big_blind: size of the big blind
+
+        :return new Betting instance
+        """
+        return cls([p.funds for p in table.players], table.on_the_button_player_index, big_blind)
+
+    @property
+    def stacks(self):
+        return self.__stacks
+
+    @property
+    def street_bets(self):
+        return self.__street_bets
+
+    @property
+    def pot(self):
+        return self.__pot
+
+    @property
+    def seat_count(self):
+        return len(self.__stacks)
+
+    @property
+    def button_index(self):
+        return self.__button_index
+
+    @property
+    def big_blind(self):
+        return self.__big_blind
+
+    @property
+    def current_bet(self):
+        return self.__current_bet
+
+    @property
+    def min_raise(self):
+        return self.__min_raise
+
+    @property
+    def to_act(self):
+        return self.__to_act
+
+    @property
+    def live_count(self):
+        # Number of seats that have not folded
+        return int(np.count_nonzero(~self.__pot.folded))
+
+    @property
+    def is_street_complete(self):
+        return self.__to_act == gconsts.NO_PLAYER_INDEX
+
+    @property
+    def is_hand_over(self):
+        # Hand is over without a showdown once all but one seat has folded
+        return self.live_count < 2
+
+    def reset(self, stacks, button_index=0, big_blind=None):
+        """
+        Resets the betting ready for a new hand, the existing arrays are reused unless the number of seats
+        has changed
+
+        :param stacks: chips held by each seat at the start of the hand, as sequence indexed by seat
+        :param button_index: seat index of the player on the button
+        :param big_blind: size of the big blind, if None then it is unchanged
+
+        :return nothing
+        """
+        if not len(stacks) == self.seat_count:
+            self.__init__(stacks, button_index, self.__big_blind if big_blind is None else big_blind)
+            return
+
+        self.__stacks[:] = stacks
+        self.__street_bets[:] = 0
+        self.__all_in[:] = False
+        self.__acted[:] = False
+        self.__pot.reset()
+        self.__button_index = button_index
+        if big_blind is not None:
+            self.__big_blind = big_blind
+        self.__current_bet = 0
+        self.__min_raise = self.__big_blind
+        self.__to_act = gconsts.NO_PLAYER_INDEX
+        self.__pot.folded[:] = self.__stacks == 0
+
+    def to_call(self, seat):
+        """
+        Returns the chips the supplied seat must put in to call the current bet, limited by the chips
+        the seat has behind
+
+        :param seat: seat index to check
+
+        :return chips needed to call
+        """
+        return int(min(self.__current_bet - self.__street_bets[seat], self.__stacks[seat]))
+
+    def can_raise(self, seat):
+        """
+        Returns True if the supplied seat is allowed to bet or raise, ie. it has chips behind beyond a
+        call and the betting has not been closed to it by it already acting on the current bet
+
+        :param seat: seat index to check
+
+        :return True if seat can bet or raise, False otherwise
+        """
+        return not self.__acted[seat] and self.__stacks[seat] > self.__current_bet - self.__street_bets[seat]
+
+    def post_antes(self, ante):
+        """
+        Each seat with chips puts the supplied ante into the pot, a seat with fewer chips than the ante
+        is all-in, antes do not count towards the street bets
+
+        :param ante: size of the ante
+
+        :return nothing
+        """
+        amounts = np.minimum(self.__stacks, ante)
+        self.__stacks -= amounts
+        self.__pot.contributions[:] += amounts
+        self.__all_in |= (self.__stacks == 0) & ~self.__pot.folded
+
+    def post_blinds(self, small_blind, big_blind=None):
+        """
+        The two seats after the button post the small and big blinds (heads-up, ie. with only two seats dealt
+        in, the button posts the small blind), the first seat to act pre-flop is then the seat after the big
+        blind
+
+        :param small_blind: size of the small blind
+        :param big_blind: size of the big blind, if None then the size given to the initialiser is used
+
+        :return nothing
+        """
+        if big_blind is not None:
+            self.__big_blind = big_blind
+
+        # Heads-up is decided by the seats dealt in, not the seats at the table, as busted seats stay seated,
+        # if the button is on a seat not dealt in the small blind takes the button so it acts last post-flop
+        if np.count_nonzero(~self.__pot.folded) == 2:
+            if not self.__in_hand(self.__button_index):
+                self.__button_index = self.__next_seat(self.__button_index, self.__in_hand)
+            sb_index = self.__button_index
+        else:
+            sb_index = self.__next_seat(self.__button_index, self.__in_hand)
+        bb_index = self.__next_seat(sb_index, self.__in_hand)
+
+        self.__commit(sb_index, small_blind)
+        self.__commit(bb_index, self.__big_blind)
+        self.__current_bet = self.__big_blind
+        self.__min_raise = self.__big_blind
+        self.__to_act = self.__next_to_act(bb_index)
+
+    def start_street(self):
+        """
+        Starts a new street of betting, the street bets are cleared and the first seat to act is the first
+        seat after the button still able to bet, if fewer than two seats are able to bet then there is no
+        betting on this street
+
+        :return nothing
+        """
+        self.__street_bets[:] = 0
+        self.__acted[:] = False
+        self.__current_bet = 0
+        self.__min_raise = self.__big_blind
+
+        if np.count_nonzero(self.__can_act_mask()) < 2:
+            self.__to_act = gconsts.NO_PLAYER_INDEX
+        else:
+            self.__to_act = self.__next_to_act(self.__button_index)
+
+    def act(self, action, amount=0):
+        """
+        Applies the supplied action for the seat currently to act and moves on to the next seat to act,
+        checking and calling are the same action (calling nothing is a check), for a bet or raise the
+        amount is the total street bet to raise to, a seat may always go all-in even if this is less
+        than a full raise but a raise for less than all-in must be at least the minimum raise
+
+        :param action: one of gconsts.FOLD_ACTION_VALUE, gconsts.CHECK_CALL_ACTION_VALUE or
+                       gconsts.BET_RAISE_ACTION_VALUE
+        :param amount: for a bet or raise, the total street bet to raise to
+
+        :return nothing
+
+        :exception IllegalActionError: thrown when there is no seat to act or the action is not allowed
+        """
+        seat = self.__to_act
+        if seat == gconsts.NO_PLAYER_INDEX:
+            raise IllegalActionError("No seat is to act, the street of betting is complete")
+
+        if action == gconsts.FOLD_ACTION_VALUE:
+            self.__pot.fold(seat)
+        elif action == gconsts.CHECK_CALL_ACTION_VALUE:
+            self.__commit(seat, self.to_call(seat))
+        elif action == gconsts.BET_RAISE_ACTION_VALUE:
+            self.__raise_to(seat, amount)
+        else:
+            raise IllegalActionError("Unknown action: {0}".format(action))
+
+        self.__acted[seat] = True
+
+        if self.is_hand_over:
+            self.__to_act = gconsts.NO_PLAYER_INDEX
+        else:
+            self.__to_act = self.__next_to_act(seat)
+
+    def settle(self, ranks=None, low_ranks=None):
+        """
+        Settles the pot at the end of the hand, any uncalled chips are returned first and then the main
+        pot and side pots are awarded to the seats with the best ranked hands, the winnings are added to
+        the stacks
+
+        :param ranks: rank of the hand held by each seat, as sequence indexed by seat where a higher rank
+                      is a better hand, or one of these for each run of a board run more than once (see
+                      Pot.award()), may be None if the hand is over with only one seat left in it
+        :param low_ranks: rank of the low hand held by each seat for a hi/lo split game (see Pot.award()),
+                          None if the game is not split
+
+        :return numpy int64 array of the chips won by each seat (not including returned uncalled chips)
+        """
+        self.return_uncalled()
+
+        if ranks is None:
+            ranks = np.zeros(self.seat_count, dtype=np.int64)
+
+        payouts = self.__pot.award(ranks, self.__button_index, low_ranks)
+        self.__stacks += payouts
+
+        return payouts
+
+    def return_uncalled(self):
+        """
+        Returns any uncalled chips in the pot to the stack of the seat that put them in (see
+        Pot.return_uncalled()), once returned there is nothing more to return so this may be called
+        before settling, eg. to value the pots that are contested
+
+        :return tuple of the seat index and the amount returned to it
+        """
+        seat, amount = self.__pot.return_uncalled()
+        self.__stacks[seat] += amount
+
+        return seat, amount
+
+    def apply_to_table(self, table):
+        """
+        Copies the stacks back into the funds of the players at the supplied table, this should be called
+        once the hand has been settled
+
+        :param table: table the hand was played at, the players must be in the same seats as when the
+                      betting was created
+
+        :return nothing
+        """
+        for seat, player in enumerate(table.players):
+            player.funds = int(self.__stacks[seat])
+
+    def __raise_to(self, seat, amount):
+        """
+        Bets or raises the supplied seat's street bet to the supplied amount, a full raise reopens the
+        betting to all other seats
+
+        :param seat: seat index that is raising
+        :param amount: the total street bet to raise to
+
+        :return nothing
+
+        :exception IllegalActionError: thrown when the raise is not allowed
+        """
+        all_in_amount = int(self.__street_bets[seat] + self.__stacks[seat])
+
+        if not self.can_raise(seat):
+            raise IllegalActionError("Seat {0} is not allowed to raise".format(seat))
+
+        if amount > all_in_amount:
+            msg = "Seat {0} cannot raise to {1} with only {2} available".format(seat, amount, all_in_amount)
+            raise IllegalActionError(msg)
+
+        raise_size = amount - self.__current_bet
+        if raise_size < self.__min_raise and not amount == all_in_amount:
+            msg = "Seat {0} raise of {1} is less than the minimum raise of {2}".format(seat, raise_size,
+                                                                                      self.__min_raise)
+            raise IllegalActionError(msg)
+
+        self.__commit(seat, amount - int(self.__street_bets[seat]))
+
+        # Only a full raise reopens the betting, an all-in for less just has to be called
+        if raise_size >= self.__min_raise:
+            self.__min_raise = raise_size
+            self.__acted[:] = False
+
+        self.__current_bet = amount
+
+    def __commit(self, seat, amount):
+        """
+        Moves the supplied amount of chips (limited by the seat's stack) from the seat's stack into
+        the pot
+
+        :param seat: seat index committing chips
+        :param amount: chips to commit
+
+        :return nothing
+        """
+        amount = min(amount, int(self.__stacks[seat]))
+        self.__stacks[seat] -= amount
+        self.__street_bets[seat] += amount
+        self.__pot.contribute(seat, amount)
+
+        if not self.__stacks[seat]:
+            self.__all_in[seat] = True
+
+    def __in_hand(self, seat):
+        # Seat has not folded
+        return not self.__pot.folded[seat]
+
+    def __can_act_mask(self):
+        # Seats that have not folded and are not all-in
+        return ~self.__pot.folded & ~self.__all_in
+
+    def __needs_to_act(self, seat):
+        # Seat can still act and has either not acted or not matched the current bet
+        return (not self.__pot.folded[seat] and not self.__all_in[seat] and
+                (not self.__acted[seat] or self.__street_bets[seat] < self.__current_bet))
+
+    def __next_seat(self, seat, condition):
+        """
+        Returns the next seat after the supplied seat (going round the table) that meets the supplied
+        condition
+
+        :param seat: seat index to start after
+        :param condition: function taking a seat index and returning True if the seat is wanted
+
+        :return next seat index meeting the condition, or gconsts.NO_PLAYER_INDEX if there is none
+        """
+        for i in range(1, self.seat_count + 1):
+            next_seat = (seat + i) % self.seat_count
+            if condition(next_seat):
+                return next_seat
+
+        return gconsts.NO_PLAYER_INDEX
+
+    def __next_to_act(self, seat):
+        # Next seat after the supplied seat that still needs to act, the street is complete if there is none
+        if np.count_nonzero(self.__can_act_mask()) == 1:
+            # Only one seat can still act so it only needs to act if facing a bet
+            remaining = int(np.flatnonzero(self.__can_act_mask())[0])
+            if self.__street_bets[remaining] >= self.__current_bet:
+                return gconsts.NO_PLAYER_INDEX
+
+            return remaining
+
+        return self.__next_seat(seat, self.__needs_to_act)
+
+    def __str__(self):
+        """
+        To string method
+
+        :return string representation of this betting instance
+        """
+        return "Stacks:{0}:Bets:{1}:Pot:{2}:ToAct:{3}".format(self.__stacks.tolist(), self.__street_bets.tolist(),
+                                                             self.__pot, self.__to_act)
@@ -2,32 +2,61 @@
 Author:     Chris Knowles
 File:       card.py
 Version:    1.0.0
-Notes:      Standard playing card class
+Notes:      Standard playing card class, cards compare and hash by value (ie. by their integer
+            encoding, see Card.index) rather than by identity, and each has a fixed 64-bit Zobrist
+            key so that the key of any collection of cards can be kept up to date as cards are added
+            and removed (see Hand.key)
 """
 # Imports
+import numpy as np
 from engine import gconsts
 
 
+# Global consts
+ZOBRIST_SEED = 0x5EED_CA4D
+ZOBRIST_MASK = (1 << 64) - 1
+
+
+# Tables
+# ZOBRIST_KEYS[index] is the random 64-bit key of the card with that index, including the jokers, the keys are
+# drawn from a fixed seed so they are the same in every process and every run
+ZOBRIST_KEYS = tuple(np.random.default_rng(ZOBRIST_SEED).integers(
+    0, 1 << 64, len(gconsts.VALUE_NAMES) * len(gconsts.SUIT_NAMES) + len(gconsts.JOKER_NAMES),
+    dtype=np.uint64, endpoint=False).tolist())
+
+
 # Classes
 class Card:
     """
     Standard playing card class - class variables:
         none
     """
-    def __init__(self, value_name, suit_name):
+    def __init__(self, value_name, suit_name, index=None):
         """
         Initialiser - instance variables:
             __value_name: value name of this instance, as string (from gconsts.VALUE_NAMES consts),
                           property with read only access
             __suit_name: suit name of this instance, as string (from gconsts.SUIT_NAMES consts),
                          property with read only access
+            __index: integer encoding of this card, which is its position in an ordered deck (ie. value
+                     index times the number of suits plus suit index), property with read only access
+            __zobrist_key: random 64-bit key of this card (from ZOBRIST_KEYS), property with read only access
 
         :param value_name: value name of this card
         :param suit_name: suit name of this card
+        :param index: integer encoding of this card, if None then it is worked out from the value and suit
+                      names (special cards such as jokers supply their own)
         """
         self.__value_name = value_name
         self.__suit_name = suit_name
 
+        if index is None:
+            index = gconsts.VALUE_NAMES.index(value_name) * len(gconsts.SUIT_NAMES) + \
+                    gconsts.SUIT_NAMES.index(suit_name)
+
+        self.__index = index
+        self.__zobrist_key = ZOBRIST_KEYS[index]
+
     @property
     def value_name(self):
         return self.__value_name
@@ -65,6 +94,14 @@ class Card:
         # Non-joker cards return False
         return False
 
+    @property
+    def index(self):
+        return self.__index
+
+    @property
+    def zobrist_key(self):
+        return self.__zobrist_key
+
     def value_delta(self, card):
         """
         Return the difference in value of the supplied card from the value of this card, a negative delta
@@ -100,6 +137,23 @@ class Card:
         """
         return self.suit_name == card.suit_name
 
+    def __eq__(self, other):
+        """
+        Equal To method, check that this and other instance are same class and that the
+        index properties are equal, ie. that they are the same card whichever deck they came from
+
+        :return: True if this instance and other instance are equal
+        """
+        return self.__class__ == other.__class__ and self.index == other.index
+
+    def __hash__(self):
+        """
+        Hash method, equal cards have equal hashes so cards can be held in sets and used as dict keys
+
+        :return: hash of this instance
+        """
+        return self.__index
+
     def __str__(self):
         """
         To string method
@@ -107,3 +161,17 @@ class Card:
         :return string representation of this card instance
         """
         return "{0}{1}".format(self.value_symbol, self.suit_symbol)
+
+
+# Functions
+def cards_key(cards):
+    """
+    Returns the Zobrist key of the supplied cards, ie. the sum of the key of every card modulo 2^64, the key
+    does not depend on the order of the cards and, being a sum rather than an exclusive or, tells apart cards
+    repeated from more than one deck
+
+    :param cards: iterable of cards
+
+    :return 64-bit integer key
+    """
+    return sum(c.zobrist_key for c in cards) & ZOBRIST_MASK
@@ -0,0 +1,143 @@
+"""
+Author:     Chris Knowles
+File:       codec.py
+Version:    1.0.0
+Notes:      Compact bytes encoding of cards, hands and decks for passing them between processes,
+            every card is encoded as the single byte of its index (see Card.index), a hand adds a
+            three byte header of its maximum size, card count and hole card count and follows its
+            cards with its hole cards, a deck adds a one byte header of whether it has jokers and
+            its number of decks followed by its shuffled cards, so a full deck is 53 bytes rather
+            than the hundreds of bytes of pickled card objects
+"""
+# Imports
+from engine import gconsts
+from data_model.card import Card
+from data_model.joker import Joker
+
+
+# Global consts
+HAND_HEADER_SIZE = 3
+
+
+# Functions
+def _build_cards():
+    """
+    Builds one card for every card index, in the same order as the ordered cards of a deck with jokers
+
+    :return tuple of cards, indexed by card index
+    """
+    cards = [Card(vname, sname) for vname in gconsts.VALUE_NAMES for sname in gconsts.SUIT_NAMES]
+    cards += [Joker(jname) for jname in gconsts.JOKER_NAMES]
+
+    return tuple(cards)
+
+
+# Cards are never changed once made, so decoded hands share these rather than making new cards
+CARDS = _build_cards()
+
+# Card index of every (value symbol, suit symbol) pair, so a card can be looked up by its symbols directly
+SYMBOL_INDICES = {(c.value_symbol, c.suit_symbol): c.index for c in CARDS}
+
+
+def card_from_index(index, cards=CARDS):
+    """
+    Returns the card of the supplied index
+
+    :param index: integer encoded card (see Card.index)
+    :param cards: cards indexed by card index to take the card from (eg. Deck.ordered_cards)
+
+    :return card
+    """
+    return cards[index]
+
+
+def encode_cards(cards):
+    """
+    Encodes the supplied cards as one byte per card
+
+    :param cards: iterable of cards
+
+    :return bytes
+    """
+    return bytes(c.index for c in cards)
+
+
+def decode_cards(data, cards=CARDS):
+    """
+    Decodes the supplied bytes into cards
+
+    :param data: bytes as returned by encode_cards()
+    :param cards: cards indexed by card index to take the cards from
+
+    :return list of cards
+    """
+    return [cards[b] for b in data]
+
+
+def encode_hand(hand):
+    """
+    Encodes the supplied hand as a three byte header of its maximum size, card count and hole card count
+    followed by one byte per card and then one byte per hole card
+
+    :param hand: Hand class instance
+
+    :return bytes
+    """
+    header = bytes((hand.max_size, hand.size, len(hand.hole_cards)))
+
+    return header + encode_cards(hand.cards) + encode_cards(hand.hole_cards)
+
+
+def decode_hand(data, cards=CARDS):
+    """
+    Decodes the supplied bytes into a new hand
+
+    :param data: bytes as returned by encode_hand()
+    :param cards: cards indexed by card index to take the cards from
+
+    :return Hand class instance
+    """
+    # Imported here as the hand module imports this module
+    from data_model.hand import Hand
+
+    end = HAND_HEADER_SIZE + data[1]
+    hand = Hand(data[0])
+    hand.load_cards(decode_cards(data[HAND_HEADER_SIZE:end], cards), decode_cards(data[end:end + data[2]], cards))
+
+    return hand
+
+
+def encode_deck(deck):
+    """
+    Encodes the supplied deck as a one byte header of whether it has jokers (the lowest bit) and the number of
+    decks in the shoe less one (the other bits), followed by one byte for each of its shuffled cards, from the
+    top card down
+
+    :param deck: Deck class instance
+
+    :return bytes
+    """
+    return bytes((int(deck.has_jokers) | (deck.deck_count - 1) << 1,)) + encode_cards(deck.shuffled_cards)
+
+
+def decode_deck(data, cut_card=None, lazy=False, pool=None, rng=None):
+    """
+    Decodes the supplied bytes into a new deck, whose shuffled cards are its own ordered cards
+
+    :param data: bytes as returned by encode_deck()
+    :param cut_card: number of cards behind the cut card of the deck (see Deck), these and the following
+                     parameters are not part of the encoding
+    :param lazy: the deck is shuffled lazily
+    :param pool: offsets from the top card of the cards still to be lazily shuffled (see Deck.pool)
+    :param rng: numpy random generator of the deck, if None then a new generator is spawned (see Deck)
+
+    :return Deck class instance
+    """
+    # Imported here as the deck module imports this module
+    from data_model.deck import Deck
+
+    deck = Deck(has_jokers=bool(data[0] & 1), deck_count=(data[0] >> 1) + 1, cut_card=cut_card, lazy=lazy,
+                rng=rng)
+    deck.set_shuffled_cards(data[1:], pool)
+
+    return deck
@@ -16,7 +16,7 @@ class Dealer:
     Dealer class utilised for dealing poker hands - class variables:
         none
     """
-    def __init__(self, name):
+    def __init__(self, name, rng=None, deck=None):
         """
         Initialiser - instance variables:
             __ident: unique identifier of this dealer, as random UUID from uuid package, property
@@ -26,11 +26,15 @@ class Dealer:
             __deck: deck of cards managed by this dealer
 
         :param name: name of this dealer
+        :param rng: numpy random generator for the dealer's deck, if None then the deck spawns its own from the
+                    root sequence (see streams.generator())
+        :param deck: deck (eg. a shoe of several decks) managed by this dealer, if None then a standard deck with
+                     the supplied generator
         """
         self.__ident = uuid.uuid4()
         self.__name = name
         self.__table = None
-        self.__deck = Deck()
+        self.__deck = Deck(rng=rng) if deck is None else deck
         self.deck.shuffle()
 
     @property
@@ -57,7 +61,27 @@ class Dealer:
     def deck(self):
         return self.__deck
 
-    def deal_to_players(self, count=1):
+    def get_state(self):
+        """
+        Returns the state of this dealer for a checkpoint, see set_state()
+
+        :return dict of the ident, name and deck state of this dealer
+        """
+        return {"ident": self.ident, "name": self.name, "deck": self.deck.get_state()}
+
+    def set_state(self, state):
+        """
+        Restores this dealer in place to the supplied state returned by get_state()
+
+        :param state: dict as returned by get_state()
+
+        :return nothing
+        """
+        self.__ident = state["ident"]
+        self.__name = state["name"]
+        self.deck.set_state(state["deck"])
+
+    def deal_to_players(self, count=1, is_hole_card=False):
         """
         Deal a number of cards (default 1 card) from the dealer's shuffled card deck
         into the hand of all players currently playing at the dealer's table
@@ -70,6 +94,7 @@ class Dealer:
         not have enough    cards then throw an InsufficientCardsError exception
 
         :param count: number of cards to deal into each player's hand
+        :param is_hole_card: the dealt cards are hole cards of each player's hand
 
         :return nothing
 
@@ -85,9 +110,10 @@ class Dealer:
         for _ in range(count):
             for i in range (self.table.player_count):
                 player_index = (self.table.on_the_button_player_index + i + 1) % self.table.player_count
-                self.deal_to_player(player=self.table.get_player_by_index(player_index))
+                self.deal_to_player(player=self.table.get_player_by_index(player_index),
+                                    is_hole_card=is_hole_card)
 
-    def deal_to_player(self, player, count=1):
+    def deal_to_player(self, player, count=1, is_hole_card=False):
         """
         Deal a number of cards (default 1 card) into a supplied player's hand, this will
         only work if there are a suitably number of cards remaining in the dealer's
@@ -96,6 +122,7 @@ class Dealer:
 
         :param player: player to receive card(s) into their hand
         :param count: number of cards to deal into the player's hand
+        :param is_hole_card: the dealt cards are hole cards of the player's hand
 
         :return nothing
 
@@ -109,7 +136,7 @@ class Dealer:
             raise InsufficientCardsError(msg)
 
         for _ in range(count):
-            player.receive_card(self.deck.pop_shuffled_card())
+            player.receive_card(self.deck.pop_shuffled_card(), is_hole_card)
 
     def deal_to_table(self, count=1):
         """
@@ -131,6 +158,9 @@ class Dealer:
             msg = msg_str.format(self.deck.shuffled_cards_count, count)
             raise InsufficientCardsError(msg)
 
+        for _ in range(count):
+            self.table.receive_card(self.deck.pop_shuffled_card())
+
     def __eq__(self, other):
         """
         Equal To method, check that this and other instance are same class and that the
@@ -3,13 +3,31 @@ Author:     Chris Knowles
 File:       deck.py
 Version:    1.0.0
 Notes:      Standard deck of playing cards class, notice that the deck has been implemented
-            using numpy arrays as an exercise for adopting numpy instead of raw Python lists
+            using numpy arrays as an exercise for adopting numpy instead of raw Python lists, a deck
+            is not locked so it must only be used by one thread at a time, a threaded simulation
+            gives each thread its own deck with its own generator, a deck can also be a shoe of
+            several decks with a cut card, and a shoe can be shuffled lazily, ie. rather than
+            permuting every card on each shuffle the next card is picked at random from the cards
+            not yet dealt as it is dealt (an on-demand Fisher-Yates shuffle), so only the cards
+            actually dealt cost a random number and a swap, a single deck is always shuffled in
+            full as numpy shuffles 52 cards faster than a handful of them can be picked one at a
+            time in Python (see benchmarks/shoe.py)
 """
 # Imports
+from itertools import chain
+from itertools import combinations
+from itertools import islice
 import numpy as np
 from engine import gconsts
+from engine import streams
 from data_model.card import Card
 from data_model.joker import Joker
+from data_model import codec
+from engine.exceptions import InsufficientCardsError
+
+
+# Global consts
+RANDOM_BLOCK_SIZE = 256
 
 
 # Classes
@@ -18,25 +36,73 @@ class Deck:
     Standard deck of playing card class - class variables:
         none
     """
-    def __init__(self, has_jokers=False):
+    def __init__(self, has_jokers=False, rng=None, deck_count=1, cut_card=None, lazy=False):
         """
         Initialiser - instance variables:
+            __rng: random number generator owned by this deck and used for all its shuffles and random deals,
+                   as numpy Generator, property with read only access
+            __has_jokers: each deck includes jokers, as boolean, property with read only access
+            __deck_count: number of decks shuffled together as one shoe, property with read only access
+            __cut_card: number of cards behind the cut card, once no more than this many shuffled cards are left
+                        the cut card has been reached and the shoe is shuffled at the start of the next round
+                        (see new_round()), if None then the deck is shuffled every round, property with read only
+                        access
+            __lazy: the deck is shuffled lazily, only ever True for a shoe of several decks, as boolean, property
+                    with read only access
             __ordered_cards: collection of ordered playing cards in the deck, property with read only access
-            __shuffled_cards: collection of shuffled playing cards in the deck, property with read only access
+            __shuffled_cards: collection of shuffled playing cards in the deck, property with read only access,
+                              this is held as a fixed size buffer that is reused for every shuffle, the cards
+                              currently in the shuffled deck are those between the top and end indices
+            __shuffled_top: index into the shuffled cards buffer of the current top card
+            __shuffled_end: index into the shuffled cards buffer one past the current bottom card
+            __pool_top: index into the shuffled cards buffer of the first card not yet lazily shuffled, the cards
+                        between the pool top and end indices are in no particular order and the next card dealt
+                        from them is picked at random, the pool is empty unless the deck is shuffled lazily
+            __pool_end: index into the shuffled cards buffer one past the last card not yet lazily shuffled, any
+                        cards after this have been pushed onto the bottom of the deck since it was shuffled
+            __random_block: random numbers in [0, 1) drawn from the generator in a block and used one for each
+                            lazily dealt card, as list of floats
+            __random_index: index into the random block of the next random number
 
         :param has_jokers: indicates whether to include jokers in this deck or not
+        :param rng: numpy random generator for this deck, if None then a new generator is spawned from the root
+                    sequence (see streams.generator())
+        :param deck_count: number of decks shuffled together as one shoe
+        :param cut_card: number of cards behind the cut card, if None then the deck is shuffled every round
+        :param lazy: if True then a shoe of several decks is shuffled lazily as its cards are dealt, a single
+                     deck is always shuffled in full
         """
-        self.__ordered_cards = np.array([])
-        self.__shuffled_cards = np.array([])
+        self.__rng = streams.generator() if rng is None else rng
+        self.__has_jokers = has_jokers
+        self.__deck_count = deck_count
+        self.__cut_card = cut_card
+        self.__lazy = lazy and deck_count > 1
+
+        cards = []
+
+        # Generate all card values for each card suit (including two jokers if required) of each deck
+        for _ in range(deck_count):
+            for vname in gconsts.VALUE_NAMES:
+                for sname in gconsts.SUIT_NAMES:
+                    cards.append(Card(vname, sname))
 
-        # Generate all card values for each card suit (including two jokers if required)
-        for vname in gconsts.VALUE_NAMES:
-            for sname in gconsts.SUIT_NAMES:
-                self.__ordered_cards = np.append(self.__ordered_cards, [Card(vname, sname)])
+            if has_jokers:
+                cards.append(Joker(gconsts.JOKER_NAMES[0]))
+                cards.append(Joker(gconsts.JOKER_NAMES[1]))
 
-        if has_jokers:
-            self.__ordered_cards = np.append(self.__ordered_cards, [Joker(gconsts.JOKER_NAMES[0])])
-            self.__ordered_cards = np.append(self.__ordered_cards, [Joker(gconsts.JOKER_NAMES[1])])
+        self.__ordered_cards = np.empty(len(cards), dtype=object)
+        self.__ordered_cards[:] = cards
+        self.__shuffled_cards = np.empty(len(cards), dtype=object)
+        self.__shuffled_top = 0
+        self.__shuffled_end = 0
+        self.__pool_top = 0
+        self.__pool_end = 0
+        self.__random_block = []
+        self.__random_index = 0
+
+    @property
+    def rng(self):
+        return self.__rng
 
     @property
     def ordered_cards(self):
@@ -44,20 +110,274 @@ class Deck:
 
     @property
     def shuffled_cards(self):
-        return self.__shuffled_cards
+        return self.__shuffled_cards[self.__shuffled_top:self.__shuffled_end]
 
     @property
     def shuffled_cards_count(self):
-        return len(self.__shuffled_cards)
+        return self.__shuffled_end - self.__shuffled_top
+
+    @property
+    def has_jokers(self):
+        return self.__has_jokers
+
+    @property
+    def deck_count(self):
+        return self.__deck_count
+
+    @property
+    def cut_card(self):
+        return self.__cut_card
+
+    @property
+    def lazy(self):
+        return self.__lazy
+
+    @property
+    def is_cut_card_reached(self):
+        return self.__cut_card is not None and self.shuffled_cards_count <= self.__cut_card
+
+    @property
+    def pool(self):
+        # Offsets from the top card of the cards still to be lazily shuffled, as (start, end)
+        return self.__pool_top - self.__shuffled_top, self.__pool_end - self.__shuffled_top
 
     def shuffle(self):
         """
-        Shuffles the ordered cards into a new shuffled array of cards
+        Shuffles the ordered cards into the shuffled array of cards, the shuffled cards buffer is reused
+        rather than a new array being created for each shuffle, a lazy deck only returns every card to the
+        pool of cards that are picked at random as they are dealt
+
+        :return nothing
+        """
+        if self.__lazy:
+            # The pool starts in the order of the ordered cards every shuffle, so the cards dealt depend only on
+            # the generator and not on the order earlier rounds left the pool in, which a checkpoint does not hold
+            self.__refill_shuffled()
+            self.__shuffled_top = self.__pool_top = 0
+            self.__shuffled_end = self.__pool_end = len(self.__shuffled_cards)
+        else:
+            self.__refill_shuffled()
+            self.__rng.shuffle(self.__shuffled_cards)
+
+    def reset(self, shuffle=True):
+        """
+        Resets this deck ready for a new round, all cards are returned to the shuffled array of cards without
+        any new arrays or cards being created, so a deck can be reused for any number of rounds
+
+        :param shuffle: if True then the reset deck is shuffled, otherwise the shuffled cards are left in the
+                        same order as the ordered cards
+
+        :return nothing
+        """
+        if shuffle:
+            self.shuffle()
+        else:
+            self.__refill_shuffled()
+
+    def new_round(self):
+        """
+        Readies this deck for a new round, a deck without a cut card is reset and shuffled every round, a shoe
+        with a cut card carries on dealing from where the last round stopped until the cut card is reached
 
         :return nothing
         """
-        self.__shuffled_cards = np.copy(self.__ordered_cards)
-        np.random.shuffle(self.__shuffled_cards)
+        if self.__cut_card is None or self.is_cut_card_reached:
+            self.reset()
+
+    def set_shuffled_cards(self, indices, pool=None):
+        """
+        Sets the shuffled cards to this deck's own cards of the supplied card indices, in the supplied order
+        from the top card down, eg. to restore a deck encoded by to_bytes()
+
+        :param indices: iterable of integer encoded cards (see Card.index), eg. bytes
+        :param pool: for a lazy deck, the (start, end) offsets from the top card of the cards still to be lazily
+                     shuffled, if None then the cards are dealt in the supplied order
+
+        :return nothing
+        """
+        indices = np.fromiter(indices, dtype=np.intp)
+
+        if len(indices) > len(self.__shuffled_cards):
+            self.__shuffled_cards = np.empty(len(indices), dtype=object)
+
+        # The first deck of a shoe holds one of every card
+        self.__shuffled_cards[:len(indices)] = self.__ordered_cards[indices]
+        self.__shuffled_top = 0
+        self.__shuffled_end = len(indices)
+        self.__pool_top, self.__pool_end = (0, 0) if pool is None else pool
+
+    def to_bytes(self):
+        """
+        Encodes this deck compactly as about one byte per shuffled card (see codec.encode_deck())
+
+        :return bytes
+        """
+        return codec.encode_deck(self)
+
+    @staticmethod
+    def from_bytes(data):
+        """
+        Decodes a deck encoded by to_bytes()
+
+        :param data: bytes
+
+        :return Deck class instance
+        """
+        return codec.decode_deck(data)
+
+    def get_state(self):
+        """
+        Returns the state of this deck for a checkpoint, ie. its shuffled cards from the top card down and the
+        state of its generator, plus for a lazy deck the cards still to be shuffled and the unused random
+        numbers drawn, see set_state()
+
+        :return dict of the shuffled cards, as returned by to_bytes(), the pool, the generator state and the
+                unused random numbers
+        """
+        return {"cards": self.to_bytes(),
+                "pool": self.pool,
+                "rng": self.__rng.bit_generator.state,
+                "random": self.__random_block[self.__random_index:]}
+
+    def set_state(self, state):
+        """
+        Restores this deck in place to the supplied state returned by get_state()
+
+        :param state: dict as returned by get_state()
+
+        :return nothing
+        """
+        self.set_shuffled_cards(state["cards"][1:], state.get("pool"))
+        self.__rng.bit_generator.state = state["rng"]
+        self.__random_block = list(state.get("random", ()))
+        self.__random_index = 0
+
+    def __reduce__(self):
+        # Pickle as the compact encoding rather than as arrays of card objects, the generator and the unused
+        # random numbers are restored by __setstate__() so an unpickled deck deals the same cards as this one
+        return codec.decode_deck, (self.to_bytes(), self.__cut_card, self.__lazy, self.pool, self.__rng), \
+            self.get_state()
+
+    def __setstate__(self, state):
+        self.set_state(state)
+
+    def card_indices(self, dead_cards=(), undealt=False):
+        """
+        Returns the integer encoded cards (see Card.index) of this deck that are not in the supplied dead cards
+
+        :param dead_cards: iterable of integer encoded cards to leave out (eg. known hole and board cards)
+        :param undealt: if True then only the cards currently in the shuffled cards are used, otherwise all the
+                        cards of this deck are used
+
+        :return numpy int8 array of integer encoded cards, in ascending order, with a card repeated for every
+                copy of it in a shoe of several decks
+        """
+        cards = self.shuffled_cards if undealt else self.__ordered_cards
+        indices = np.fromiter((c.index for c in cards), dtype=np.int8, count=len(cards))
+        dead_cards = np.fromiter(dead_cards, dtype=np.int8)
+
+        # Counting the copies of every card leaves one copy out for each dead card in a shoe of several decks
+        size = max(len(self.__ordered_cards) // self.__deck_count, len(dead_cards) and int(dead_cards.max()) + 1)
+        counts = np.bincount(indices, minlength=size) - np.bincount(dead_cards, minlength=size)
+
+        return np.repeat(np.arange(size, dtype=np.int8), np.maximum(counts, 0))
+
+    def iter_random_hands(self, card_count, chunk_size=10000, count=None, dead_cards=(), undealt=False, rng=None):
+        """
+        Lazily deals random hands of integer encoded cards in chunks, the cards of each hand are all different
+        but every hand is dealt independently of the others, only one chunk is held at a time so any number of
+        hands can be dealt in constant memory
+
+        :param card_count: number of cards in each hand
+        :param chunk_size: number of hands in each chunk (the last chunk may be smaller)
+        :param count: total number of hands to deal, if None then hands are dealt without end
+        :param dead_cards: iterable of integer encoded cards that are never dealt
+        :param undealt: if True then only the cards currently in the shuffled cards are dealt
+        :param rng: numpy random generator used to deal, if None then this deck's generator is used
+
+        :return generator of numpy int8 arrays of shape (hands, card_count)
+
+        :exception InsufficientCardsError: thrown when the first chunk is requested if there are fewer cards than
+                                           card_count
+        """
+        cards = self.card_indices(dead_cards, undealt)
+        rng = self.__rng if rng is None else rng
+
+        if card_count > len(cards):
+            msg = "Not enough cards for hands: available={0} required={1}".format(len(cards), card_count)
+            raise InsufficientCardsError(msg)
+
+        while count is None or count > 0:
+            size = chunk_size if count is None else min(chunk_size, count)
+
+            # The card_count smallest of a row of random keys pick a random set of different cards
+            keys = rng.random((size, len(cards)), dtype=np.float32)
+            yield cards[np.argpartition(keys, card_count - 1, axis=1)[:, :card_count]]
+
+            if count is not None:
+                count -= size
+
+    def iter_hands(self, card_count, chunk_size=10000, dead_cards=(), undealt=False):
+        """
+        Lazily enumerates every hand of integer encoded cards in chunks, in lexicographic order of card index,
+        only one chunk is held at a time so every hand can be enumerated in constant memory
+
+        :param card_count: number of cards in each hand
+        :param chunk_size: number of hands in each chunk (the last chunk may be smaller)
+        :param dead_cards: iterable of integer encoded cards that are never used
+        :param undealt: if True then only the cards currently in the shuffled cards are used
+
+        :return generator of numpy int8 arrays of shape (hands, card_count)
+        """
+        hands = combinations(self.card_indices(dead_cards, undealt).tolist(), card_count)
+
+        while True:
+            chunk = np.fromiter(chain.from_iterable(islice(hands, chunk_size)), dtype=np.int8)
+            if not len(chunk):
+                return
+
+            yield chunk.reshape(-1, card_count)
+
+    def iter_boards(self, board=(), dead_cards=(), board_size=5, chunk_size=10000, samples=None, rng=None):
+        """
+        Lazily yields every board (or a random sample of boards) that completes the supplied board without
+        using any of the supplied dead cards, in chunks
+
+        :param board: integer encoded board cards dealt so far
+        :param dead_cards: iterable of integer encoded cards that are never used (eg. known hole cards)
+        :param board_size: number of cards in a complete board
+        :param chunk_size: number of boards in each chunk (the last chunk may be smaller)
+        :param samples: number of random boards to yield, if None then every board is enumerated
+        :param rng: numpy random generator used when sampling, if None then this deck's generator is used
+
+        :return generator of numpy int8 arrays of shape (boards, board_size), the supplied board cards are
+                first in every row
+        """
+        board = np.array(board, dtype=np.int8)
+        dead_cards = list(board) + list(dead_cards)
+        to_come = board_size - len(board)
+
+        if samples is None:
+            completions = self.iter_hands(to_come, chunk_size, dead_cards)
+        else:
+            completions = self.iter_random_hands(to_come, chunk_size, samples, dead_cards, rng=rng)
+
+        for chunk in completions:
+            yield np.hstack((np.broadcast_to(board, (len(chunk), len(board))), chunk))
+
+    def __refill_shuffled(self):
+        """
+        Copies the ordered cards into the shuffled cards buffer, the buffer is only reallocated if it has been
+        grown beyond the size of the ordered cards
+
+        :return nothing
+        """
+        if not len(self.__shuffled_cards) == len(self.__ordered_cards):
+            self.__shuffled_cards = np.empty(len(self.__ordered_cards), dtype=object)
+
+        self.__shuffled_cards[:] = self.__ordered_cards
+        self.__shuffled_top = self.__pool_top = self.__pool_end = 0
+        self.__shuffled_end = len(self.__shuffled_cards)
 
     def clear_shuffled(self):
         """
@@ -65,7 +385,8 @@ class Deck:
 
         :return nothing
         """
-        self.__shuffled_cards = np.array([])
+        self.__shuffled_top = self.__pool_top = self.__pool_end = 0
+        self.__shuffled_end = 0
 
     def peek_shuffled_card(self):
         """
@@ -73,10 +394,13 @@ class Deck:
 
         :return first card in the shuffled card array, or None if no shuffled card array
         """
-        if not len(self.shuffled_cards):
+        if self.__shuffled_top == self.__shuffled_end:
             return None
 
-        return self.shuffled_cards[0]
+        if self.__shuffled_top == self.__pool_top < self.__pool_end:
+            self.__draw_from_pool()
+
+        return self.__shuffled_cards[self.__shuffled_top]
 
     def pop_shuffled_card(self):
         """
@@ -84,14 +408,50 @@ class Deck:
 
         :return first card in the shuffled card list, or None if no shuffled card list
         """
-        if not len(self.shuffled_cards):
+        top = self.__shuffled_top
+        if top == self.__shuffled_end:
             return None
 
-        ret_card = self.__shuffled_cards[0]
-        self.__shuffled_cards = np.delete(self.__shuffled_cards, 0)
+        cards = self.__shuffled_cards
+        if top == self.__pool_top < self.__pool_end:
+            # One step of the lazy shuffle (see __draw_from_pool()), written out here as it is done for every
+            # card dealt from a lazy deck
+            if self.__random_index == len(self.__random_block):
+                self.__random_block = self.__rng.random(RANDOM_BLOCK_SIZE).tolist()
+                self.__random_index = 0
+            pick = top + int(self.__random_block[self.__random_index] * (self.__pool_end - top))
+            self.__random_index += 1
+            self.__pool_top = top + 1
+
+            ret_card = cards[pick]
+            cards[pick] = cards[top]
+            cards[top] = ret_card
+        else:
+            ret_card = cards[top]
+
+        self.__shuffled_top = top + 1
 
         return ret_card
 
+    def __draw_from_pool(self):
+        """
+        Lazily shuffles the top card, ie. one step of a Fisher-Yates shuffle, a card picked at random from the
+        pool of cards not yet shuffled is swapped into the top of the pool, which then leaves the pool
+
+        :return nothing
+        """
+        if self.__random_index == len(self.__random_block):
+            self.__random_block = self.__rng.random(RANDOM_BLOCK_SIZE).tolist()
+            self.__random_index = 0
+
+        top = self.__pool_top
+        pick = top + int(self.__random_block[self.__random_index] * (self.__pool_end - top))
+        self.__random_index += 1
+
+        cards = self.__shuffled_cards
+        cards[top], cards[pick] = cards[pick], cards[top]
+        self.__pool_top = top + 1
+
     def push_shuffled_card(self, card, append=True):
         """
         Pushes the supplied card onto the shuffled array of cards, either to the end or the front of this array
@@ -104,9 +464,48 @@ class Deck:
         :return nothing
         """
         if append:
-            self.__shuffled_cards = np.append(self.__shuffled_cards, [card])
+            if self.__shuffled_end == len(self.__shuffled_cards):
+                self.__compact_shuffled()
+
+            self.__shuffled_cards[self.__shuffled_end] = card
+            self.__shuffled_end += 1
         else:
-            self.__shuffled_cards = np.insert(self.__shuffled_cards, 0, [card])
+            if not self.__shuffled_top:
+                self.__compact_shuffled(front=True)
+
+            self.__shuffled_top -= 1
+            self.__shuffled_cards[self.__shuffled_top] = card
+
+    def __compact_shuffled(self, front=False):
+        """
+        Makes room in the shuffled cards buffer for one more card, either at the end or the front of the buffer
+        depending on the value of the front flag, the current cards are moved within the buffer if there is
+        room and the buffer is only grown if it is full (eg. when cards not from this deck are pushed onto it)
+
+        :param front: if True then make room before the top card, otherwise make room after the bottom card
+
+        :return nothing
+        """
+        count = self.shuffled_cards_count
+        old_top = self.__shuffled_top
+
+        if count == len(self.__shuffled_cards):
+            grown = np.empty(count + 1, dtype=object)
+            grown[int(front):int(front) + count] = self.__shuffled_cards[self.__shuffled_top:self.__shuffled_end]
+            self.__shuffled_cards = grown
+            self.__shuffled_top = int(front)
+        else:
+            top = len(self.__shuffled_cards) - count if front else 0
+            self.__shuffled_cards[top:top + count] = \
+                self.__shuffled_cards[self.__shuffled_top:self.__shuffled_end].copy()
+            self.__shuffled_top = top
+
+        self.__shuffled_end = self.__shuffled_top + count
+
+        # The pool of cards not yet lazily shuffled moves with the cards
+        if self.__pool_top < self.__pool_end:
+            self.__pool_top += self.__shuffled_top - old_top
+            self.__pool_end += self.__shuffled_top - old_top
 
     def return_hand(self, hand, append=True, shuffled=False):
         """
@@ -122,7 +521,7 @@ class Deck:
         :return nothing
         """
         if shuffled:
-            hand.shuffle()
+            hand.shuffle(self.__rng)
 
         for _ in range(hand.size):
             self.push_shuffled_card(hand.pop_card(), append)
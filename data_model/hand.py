@@ -7,9 +7,11 @@ Notes:      A hand of standard playing cards class
 # Imports
 from operator import attrgetter
 from operator import itemgetter
-from random import shuffle
 from engine import gconsts
+from engine import streams
 from data_model.hand_quality import HandQuality
+from data_model.card import ZOBRIST_MASK
+from data_model import codec
 
 
 # Classes
@@ -26,6 +28,12 @@ class Hand:
             __hole_cards: when this hand is part of a Texas Holdem style game, then these cards form the hole
             __quality: a HandQuality instance that holds details of the quality of the current hand, if None then
                        the quality of the hand has not yet been determined
+            __members: the cards currently in this hand, as dict of card index to list of [card, number of such
+                       cards held], so that membership is found without scanning the cards
+            __hole_members: the cards currently in the hole, in the same form as __members
+            __key: Zobrist key of the cards in this hand, kept up to date as cards are added and removed (see
+                   card.cards_key()), property with read only access
+            __hole_key: Zobrist key of the hole cards, property with read only access
 
         :param max_size: maximum number of cards in this hand
         """
@@ -33,6 +41,10 @@ class Hand:
         self.__cards = []
         self.__hole_cards = []
         self.__quality = None
+        self.__members = {}
+        self.__hole_members = {}
+        self.__key = 0
+        self.__hole_key = 0
 
     @property
     def max_size(self):
@@ -48,8 +60,21 @@ class Hand:
 
     @property
     def quality(self):
+        # Cards loaded in one step (see load_cards()) leave the quality to be determined when first needed
+        if self.__quality is None and self.__cards:
+            self.determine_quality()
+
         return self.__quality
 
+    @property
+    def key(self):
+        # Order independent key of the cards, equal for hands of the same cards, eg. for caching evaluations
+        return self.__key
+
+    @property
+    def hole_key(self):
+        return self.__hole_key
+
     @property
     def size(self):
         # Return the current size of the hand
@@ -80,10 +105,12 @@ class Hand:
 
         # Append added card
         self.__cards.append(card)
+        self.__key = self.__track(self.__members, card, self.__key)
 
         # If this is a hole card then also add it to the hole
         if is_hole_card:
             self.__hole_cards.append(card)
+            self.__hole_key = self.__track(self.__hole_members, card, self.__hole_key)
 
         if sort:
             self.sort()
@@ -91,6 +118,21 @@ class Hand:
         # Make sure quality is redetermined if card is added
         self.determine_quality()
 
+    def load_cards(self, cards, hole_cards):
+        """
+        Replaces the cards of this hand with the supplied cards in one step, eg. when decoding a hand, the
+        quality of the hand is not determined until it is next needed
+
+        :param cards: cards of the hand, no more than the maximum size
+        :param hole_cards: those of the cards that are hole cards
+
+        :return nothing
+        """
+        self.__cards[:] = cards
+        self.__hole_cards[:] = hole_cards
+        self.__quality = None
+        self.__rebuild_members()
+
     def sort(self):
         """
         Sort the card list in place using the value of the cards, smaller value cards are at front of
@@ -100,13 +142,16 @@ class Hand:
         """
         self.__cards.sort(key=attrgetter("value"))
 
-    def shuffle(self):
+    def shuffle(self, rng=None):
         """
         Shuffle the card list in place
 
+        :param rng: numpy random generator to shuffle with (eg. Deck.rng), if None then the shared generator of
+                    streams.default_generator() is used
+
         :return nothing
         """
-        shuffle(self.__cards)
+        (streams.default_generator() if rng is None else rng).shuffle(self.__cards)
 
     def find_card_with(self, value_symbol, suit_symbol):
         """
@@ -118,10 +163,10 @@ class Hand:
 
         :return card if successfully found, None otherwise
         """
-        # Get card with supplied value and suit symbols from the hand
-        card = [c for c in self.cards if (c.value_symbol == value_symbol) and (c.suit_symbol == suit_symbol)]
+        # Look up the card with supplied value and suit symbols by its index
+        member = self.__members.get(codec.SYMBOL_INDICES.get((value_symbol, suit_symbol)))
 
-        return None if not card else card[0]
+        return None if member is None else member[0]
 
     def is_hole_card(self, card):
         """
@@ -131,10 +176,26 @@ class Hand:
 
         :return True if is hole card, False otherwise
         """
-        card = [c for c in self.hole_cards if (c.value_symbol == card.value_symbol) and
-                (c.suit_symbol == card.suit_symbol)]
+        return card.index in self.__hole_members
+
+    def has_card(self, card):
+        """
+        Is the supplied card in this hand, cards are matched by value so any card equal to a card in this hand
+        is found
 
-        return False if not card else True
+        :param card: card to check if is in this hand
+
+        :return True if in this hand, False otherwise
+        """
+        return card.index in self.__members
+
+    def __contains__(self, card):
+        """
+        Membership test method, same as has_card()
+
+        :return: True if supplied card is in this hand
+        """
+        return card.index in self.__members
 
     def peek_card(self):
         """
@@ -160,9 +221,12 @@ class Hand:
 
         card = self.__cards.pop(0)
 
+        self.__key = self.__untrack(self.__members, card, self.__key)
+
         # If card is in the hand's hole then also remove from the hole
         if self.is_hole_card(card):
             self.hole_cards.remove(card)
+            self.__hole_key = self.__untrack(self.__hole_members, card, self.__hole_key)
 
         # Make sure quality is redetermined if card is popped
         self.determine_quality()
@@ -201,9 +265,12 @@ class Hand:
 
         card = self.__cards.pop(index)
 
+        self.__key = self.__untrack(self.__members, card, self.__key)
+
         # If card is in the hand's hole then also remove from the hole
         if self.is_hole_card(card):
             self.hole_cards.remove(card)
+            self.__hole_key = self.__untrack(self.__hole_members, card, self.__hole_key)
 
         # Make sure quality is redetermined if card is popped
         self.determine_quality()
@@ -218,15 +285,18 @@ class Hand:
 
         :return nothing
         """
-        # If hand is empty then immediately return
-        if self.is_empty():
+        # If card is not in hand then immediately return
+        if not self.has_card(card):
             return
 
         self.__cards.remove(card)
 
+        self.__key = self.__untrack(self.__members, card, self.__key)
+
         # If card is in the hand's hole then also remove from the hole
         if self.is_hole_card(card):
             self.hole_cards.remove(card)
+            self.__hole_key = self.__untrack(self.__hole_members, card, self.__hole_key)
 
         # Make sure quality is redetermined if card is removed
         self.determine_quality()
@@ -248,10 +318,6 @@ class Hand:
 
         self.remove_card(card)
 
-        # If card is in the hand's hole then also remove from the hole
-        if self.is_hole_card(card):
-            self.hole_cards.remove(card)
-
         return True
 
     def clear(self):
@@ -262,10 +328,77 @@ class Hand:
         """
         self.__cards = []
         self.__hole_cards = []
+        self.__rebuild_members()
 
         # Make sure quality is redetermined if hand is cleared
         self.determine_quality()
 
+    def reset(self):
+        """
+        Resets the hand to have no cards, including hole cards, this reuses the existing card lists rather
+        than creating new ones so that a hand can be reused for any number of rounds
+
+        :return nothing
+        """
+        self.__cards.clear()
+        self.__hole_cards.clear()
+        self.__quality = None
+        self.__rebuild_members()
+
+    def __rebuild_members(self):
+        """
+        Rebuilds the members and keys of this hand from its cards and hole cards, eg. after they have been
+        replaced in one step
+
+        :return nothing
+        """
+        self.__members.clear()
+        self.__hole_members.clear()
+        self.__key = 0
+        self.__hole_key = 0
+
+        for card in self.__cards:
+            self.__key = self.__track(self.__members, card, self.__key)
+        for card in self.__hole_cards:
+            self.__hole_key = self.__track(self.__hole_members, card, self.__hole_key)
+
+    @staticmethod
+    def __track(members, card, key):
+        """
+        Records one more of the supplied card in the supplied members
+
+        :param members: dict of card index to list of [card, number of such cards held]
+        :param card: card being added
+        :param key: Zobrist key of the members before the card is added
+
+        :return Zobrist key of the members after the card is added
+        """
+        member = members.get(card.index)
+        if member is None:
+            members[card.index] = [card, 1]
+        else:
+            member[1] += 1
+
+        return (key + card.zobrist_key) & ZOBRIST_MASK
+
+    @staticmethod
+    def __untrack(members, card, key):
+        """
+        Records one less of the supplied card in the supplied members
+
+        :param members: dict of card index to list of [card, number of such cards held]
+        :param card: card being removed
+        :param key: Zobrist key of the members before the card is removed
+
+        :return Zobrist key of the members after the card is removed
+        """
+        member = members[card.index]
+        member[1] -= 1
+        if not member[1]:
+            del members[card.index]
+
+        return (key - card.zobrist_key) & ZOBRIST_MASK
+
     def determine_quality(self):
         """
         Using Poker rules, determine the quality of the current hand, the various quality measures are to be
@@ -277,6 +410,7 @@ class Hand:
         # If hand is empty then the quality is set as None
         if self.is_empty():
             self.__quality = None
+            return
 
         # Make sure the hand is sorted
         self.sort()
@@ -568,6 +702,51 @@ class Hand:
         # Other hand definitely wins
         return gconsts.HAND_LOSE
 
+    def to_bytes(self):
+        """
+        Encodes this hand compactly as a three byte header and one byte per card (see codec.encode_hand())
+
+        :return bytes
+        """
+        return codec.encode_hand(self)
+
+    @staticmethod
+    def from_bytes(data, cards=codec.CARDS):
+        """
+        Decodes a hand encoded by to_bytes()
+
+        :param data: bytes
+        :param cards: cards indexed by card index to take the cards from (eg. Deck.ordered_cards)
+
+        :return Hand class instance
+        """
+        return codec.decode_hand(data, cards)
+
+    def get_state(self):
+        """
+        Returns the state of this hand for a checkpoint, see set_state()
+
+        :return bytes, as returned by to_bytes()
+        """
+        return self.to_bytes()
+
+    def set_state(self, state, cards=codec.CARDS):
+        """
+        Restores this hand in place to the supplied state returned by get_state()
+
+        :param state: bytes
+        :param cards: cards indexed by card index to take the cards from (eg. Deck.ordered_cards)
+
+        :return nothing
+        """
+        end = codec.HAND_HEADER_SIZE + state[1]
+        self.load_cards(codec.decode_cards(state[codec.HAND_HEADER_SIZE:end], cards),
+                        codec.decode_cards(state[end:end + state[2]], cards))
+
+    def __reduce__(self):
+        # Pickle as the compact encoding rather than as lists of card objects
+        return codec.decode_hand, (self.to_bytes(),)
+
     def __str__(self):
         """
         To string method
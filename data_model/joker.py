@@ -20,10 +20,13 @@ class Joker(Card):
         Initialiser - instance variables:
             __value_name: from base class
             __suit_name: from base class
+            __index: from base class, jokers follow on after all the standard cards in an ordered deck
+            __zobrist_key: from base class
 
         :param name: name of this joker
         """
-        super().__init__(name, "*")
+        super().__init__(name, "*", len(gconsts.VALUE_NAMES) * len(gconsts.SUIT_NAMES) +
+                         gconsts.JOKER_NAMES.index(name))
 
     @property
     def value_symbol(self):
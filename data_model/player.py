@@ -7,6 +7,7 @@ Notes:      Poker game player class
 # Imports
 import uuid
 from data_model.hand import Hand
+from data_model import codec
 
 
 # Classes
@@ -70,11 +71,12 @@ class Player:
 
     def clear_hand(self):
         """
-        Clears the current hand to None
+        Clears the current hand of all cards, the hand itself is kept so that it is ready to receive
+        cards in the next deal
 
         :return nothing
         """
-        self.__hand = None
+        self.hand.reset()
 
     def receive_card(self, card, is_hole_card=False):
         """
@@ -87,6 +89,29 @@ class Player:
         """
         self.hand.add_card(card, is_hole_card)
 
+    def get_state(self):
+        """
+        Returns the state of this player for a checkpoint, see set_state()
+
+        :return dict of the ident, name, funds and hand state of this player
+        """
+        return {"ident": self.ident, "name": self.name, "funds": self.funds, "hand": self.hand.get_state()}
+
+    def set_state(self, state, cards=codec.CARDS):
+        """
+        Restores this player in place to the supplied state returned by get_state(), including the ident, so
+        a player of a resumed run is the same player as the one checkpointed
+
+        :param state: dict as returned by get_state()
+        :param cards: cards indexed by card index to take the cards of the hand from (eg. Deck.ordered_cards)
+
+        :return nothing
+        """
+        self.__ident = state["ident"]
+        self.__name = state["name"]
+        self.__funds = state["funds"]
+        self.hand.set_state(state["hand"], cards)
+
     def __eq__(self, other):
         """
         Equal To method, check that this and other instance are same class and that the
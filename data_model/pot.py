@@ -0,0 +1,209 @@
+"""
+Author:     Chris Knowles
+File:       pot.py
+Version:    1.0.0
+Notes:      Pot class that holds the chips contributed by each player during a hand and splits
+            them into the main pot and side pots, the contributions are held as numpy arrays
+            indexed by seat so that splitting needs only one sort of the contributions
+"""
+# Imports
+import numpy as np
+
+
+# Classes
+class Pot:
+    """
+    Pot of chips contributed by the players during a hand - class variables:
+        none
+    """
+    def __init__(self, seat_count):
+        """
+        Initialiser - instance variables:
+            __contributions: total chips contributed to the pot by each seat during this hand, as numpy
+                             int64 array indexed by seat, property with read only access
+            __folded: whether each seat has folded this hand, as numpy bool array indexed by seat, property
+                      with read only access
+
+        :param seat_count: number of seats contributing to this pot
+        """
+        self.__contributions = np.zeros(seat_count, dtype=np.int64)
+        self.__folded = np.zeros(seat_count, dtype=bool)
+
+    @property
+    def contributions(self):
+        return self.__contributions
+
+    @property
+    def folded(self):
+        return self.__folded
+
+    @property
+    def seat_count(self):
+        return len(self.__contributions)
+
+    @property
+    def total(self):
+        return int(self.__contributions.sum())
+
+    def reset(self, seat_count=None):
+        """
+        Empties the pot ready for a new hand, the existing arrays are reused unless the number of seats
+        has changed
+
+        :param seat_count: number of seats contributing to the pot, if None then it is unchanged
+
+        :return nothing
+        """
+        if seat_count is not None and not seat_count == self.seat_count:
+            self.__contributions = np.zeros(seat_count, dtype=np.int64)
+            self.__folded = np.zeros(seat_count, dtype=bool)
+        else:
+            self.__contributions[:] = 0
+            self.__folded[:] = False
+
+    def contribute(self, seat, amount):
+        """
+        Adds the supplied amount of chips from the supplied seat into the pot
+
+        :param seat: seat index contributing the chips
+        :param amount: number of chips contributed
+
+        :return nothing
+        """
+        self.__contributions[seat] += amount
+
+    def fold(self, seat):
+        """
+        Marks the supplied seat as folded, its contributions remain in the pot but it can no longer
+        win any part of the pot
+
+        :param seat: seat index that has folded
+
+        :return nothing
+        """
+        self.__folded[seat] = True
+
+    def return_uncalled(self):
+        """
+        Returns the part of the largest contribution that no other seat has matched (ie. an uncalled
+        bet or the excess of a player that is all-in for more than anyone else), this is removed from
+        the pot
+
+        :return tuple of the seat index and the amount returned to it, the amount is 0 if nothing is
+                uncalled
+        """
+        if self.seat_count < 2:
+            return 0, 0
+
+        top_two = np.argpartition(self.__contributions, -2)[-2:]
+        if self.__contributions[top_two[0]] > self.__contributions[top_two[1]]:
+            top_two = top_two[::-1]
+
+        seat = int(top_two[1])
+        amount = int(self.__contributions[seat] - self.__contributions[top_two[0]])
+        self.__contributions[seat] -= amount
+
+        return seat, amount
+
+    def side_pots(self):
+        """
+        Splits the pot into the main pot and any side pots, a new pot is started at each distinct
+        contribution level of the seats still in the hand, so a seat all-in for less is only eligible
+        for the pots up to its own contribution, chips from folded seats go into the pots they were
+        contributed to, the contributions are sorted once and the size of every pot is found from the
+        cumulative sums of the sorted contributions, so the split is O(n log n)
+
+        :return list of tuples of (amount, eligible seats), from the main pot through to the last side
+                pot, the eligible seats are a numpy array of seat indices
+        """
+        live = np.flatnonzero(~self.__folded & (self.__contributions > 0))
+        if not live.size:
+            return []
+
+        # Live seats ordered by their contribution, the seats eligible for each pot are a suffix of this
+        live = live[np.argsort(self.__contributions[live], kind="stable")]
+        live_contributions = self.__contributions[live]
+        levels, starts = np.unique(live_contributions, return_index=True)
+
+        # Sum of all contributions capped at each level, found from the sorted contributions
+        ordered = np.sort(self.__contributions)
+        cumulative = np.concatenate(([0], np.cumsum(ordered)))
+        below = np.searchsorted(ordered, levels, side="left")
+        capped = cumulative[below] + levels * (len(ordered) - below)
+
+        amounts = np.diff(capped, prepend=0)
+
+        # Any chips above the top live level (folded seats that put in more) go into the last pot
+        amounts[-1] += cumulative[-1] - capped[-1]
+
+        return [(int(amounts[i]), live[starts[i]:]) for i in range(len(levels))]
+
+    def award(self, ranks, button_index=0, low_ranks=None):
+        """
+        Awards the pot to the seats still in the hand, each pot goes to the eligible seats with the
+        highest rank and is split evenly between them if they tie, any odd chips go to the tied seats
+        closest to the left of the button, in a hi/lo split game each pot is split in half between the
+        best high hands and the best qualifying low hands (the odd chip of the split goes to the high
+        half), or goes whole to the best high hands if no eligible seat has a qualifying low, if the
+        board was run more than once every pot is divided evenly between the runs (any odd chips to the
+        first runs) and each part is awarded on the ranks of its own run
+
+        :param ranks: rank of the hand held by each seat, as sequence indexed by seat where a higher
+                      rank is a better hand, ranks of folded seats are ignored, or for a board run more
+                      than once a sequence of these, one for each run
+        :param button_index: seat index of the player on the button, used to allocate odd chips
+        :param low_ranks: rank of the low hand held by each seat for a hi/lo split game, as sequence
+                          indexed by seat where a higher rank is a better low and 0 is no qualifying
+                          low (or one of these for each run, as ranks), None if the game is not split
+
+        :return numpy int64 array of the chips won by each seat
+        """
+        ranks = np.atleast_2d(ranks)
+        low_ranks = None if low_ranks is None else np.atleast_2d(low_ranks)
+        payouts = np.zeros(self.seat_count, dtype=np.int64)
+        run_count = len(ranks)
+
+        for pot_amount, eligible in self.side_pots():
+            run_amount, odd = divmod(pot_amount, run_count)
+            for run in range(run_count):
+                amount = run_amount + int(run < odd)
+                if low_ranks is not None and low_ranks[run, eligible].max() > 0:
+                    low_amount = amount // 2
+                    self.__split(payouts, amount - low_amount, eligible, ranks[run, eligible], button_index)
+                    self.__split(payouts, low_amount, eligible, low_ranks[run, eligible], button_index)
+                else:
+                    self.__split(payouts, amount, eligible, ranks[run, eligible], button_index)
+
+        return payouts
+
+    def __split(self, payouts, amount, eligible, eligible_ranks, button_index):
+        """
+        Splits the supplied amount evenly between the eligible seats with the highest rank, any odd chips
+        go to the tied seats closest to the left of the button
+
+        :param payouts: numpy int64 array of the chips won by each seat, updated in place
+        :param amount: chips to split
+        :param eligible: numpy array of the seat indices eligible for the chips
+        :param eligible_ranks: numpy array of the rank of each eligible seat
+        :param button_index: seat index of the player on the button
+
+        :return nothing
+        """
+        winners = eligible[eligible_ranks == eligible_ranks.max()]
+
+        share, odd = divmod(amount, len(winners))
+        payouts[winners] += share
+
+        if odd:
+            winners = winners[np.argsort((winners - button_index - 1) % self.seat_count)]
+            payouts[winners[:odd]] += 1
+
+    def __str__(self):
+        """
+        To string method
+
+        :return string representation of this pot instance
+        """
+        p = " ".join("{0}:{1}".format(amount, eligible.tolist()) for amount, eligible in self.side_pots())
+
+        return "{0}:[{1}]".format(self.total, p if not p == "" else "Empty")
@@ -3,9 +3,13 @@ Author:     Chris Knowles
 File:       table.py
 Version:    1.0.0
 Notes:      Table class that holds the current set of active players and the current state of
-            the poker game
+            the poker game, a table with its dealer and players belongs to one thread at a time
+            (see the threading model in README.md)
 """
 # Imports
+from data_model import codec
+from engine import all_in
+from engine import gconsts
 
 
 # Classes
@@ -23,9 +27,14 @@ class Table:
                        read only access, the order of the players in this array is important as it defines
                        the on the button sequence with the player at index 0 being the first player that is
                        on the button
+            __player_indices: index of the seat of each player at this table, as dict of player ident to
+                              integer index into the players array, used so that seat lookups do not need
+                              to scan the players array
             __on_the_button_player_index: player that is currently on the button, as integer index into the
                                           players array
             __current_player_index: player that is currently active, as integer index into the players array
+            __board: community cards dealt face up to this table, as list of Card class, property with read
+                     only access
 
         :param name: name of this table
         :param dealer: dealer at this table as Dealer class, defaults to None
@@ -38,11 +47,14 @@ class Table:
             self.dealer.table = self
 
         self.__players = [] if not players else players
-        for player in self.players:
+        self.__player_indices = {}
+        for index, player in enumerate(self.players):
             player.table = self
+            self.__player_indices[player.ident] = index
 
         self.__on_the_button_player_index = 0
         self.__current_player_index = 0
+        self.__board = []
 
         # otb - sb - bb - utg - mp1 - mp2 - mp3 ... mpN - hj - co
 
@@ -74,6 +86,20 @@ class Table:
     def player_count(self):
         return len(self.players)
 
+    @property
+    def board(self):
+        return self.__board
+
+    def receive_card(self, card):
+        """
+        Receive a community card dealt face up to this table
+
+        :param card: card to add to the board
+
+        :return nothing
+        """
+        self.__board.append(card)
+
     def get_player_by_index(self, index):
         """
         Returns the player held in the players array at the supplied index or returns
@@ -90,6 +116,41 @@ class Table:
 
         return self.players[index]
 
+    def get_player_by_ident(self, ident):
+        """
+        Returns the player at this table with the supplied unique ident or returns None if
+        there is no such player at this table
+
+        :param ident: the unique ident of the player instance to return
+
+        :return player instance or None if no player with supplied ident
+        """
+        index = self.__player_indices.get(ident)
+
+        return None if index is None else self.players[index]
+
+    def get_player_index(self, player):
+        """
+        Returns the index into the players array of the seat taken by the supplied player or
+        returns -1 if the player is not at this table
+
+        :param player: the player instance to find the seat of
+
+        :return index of the player's seat or -1 if player is not at this table
+        """
+        return self.__player_indices.get(player.ident, -1)
+
+    def has_player(self, player):
+        """
+        Returns True if the supplied player is at this table, matched by the unique ident of
+        the player, return False otherwise
+
+        :param player: the player instance to check for
+
+        :return True if player is at this table, False otherwise
+        """
+        return player.ident in self.__player_indices
+
     def add_player(self, player):
         """
         Adds the supplied player onto this table, if the player is not duplicated by
@@ -100,12 +161,44 @@ class Table:
         :return nothing
         """
         # Check if player already in players, if so then abort
-        if player in self.players:
+        if self.has_player(player):
             return
 
+        self.__player_indices[player.ident] = len(self.__players)
         self.__players.append(player)
         player.table = self
 
+    def remove_player(self, player):
+        """
+        Removes the supplied player from this table, matched by unique ident of player, the
+        seats of the players after the removed player move up by one and the button is kept
+        with the same player where that player is still at the table
+
+        :param player: player to remove from this table
+
+        :return True if player was removed, False if player was not at this table
+        """
+        index = self.__player_indices.pop(player.ident, None)
+        if index is None:
+            return False
+
+        del self.__players[index]
+        for i in range(index, len(self.__players)):
+            self.__player_indices[self.__players[i].ident] = i
+
+        if index < self.__on_the_button_player_index:
+            self.__on_the_button_player_index -= 1
+
+        if self.__on_the_button_player_index >= self.player_count:
+            self.__on_the_button_player_index = 0
+
+        if self.__current_player_index >= self.player_count:
+            self.__current_player_index = 0
+
+        player.table = None
+
+        return True
+
     def advance_button(self):
         """
         Calling this method advances the button to the player next in the players array
@@ -116,6 +209,89 @@ class Table:
         """
         self.__on_the_button_player_index = (self.__on_the_button_player_index + 1) % self.player_count
 
+    def new_round(self, advance_button=False):
+        """
+        Prepares this table for a new round, every player's hand and the board are cleared and the
+        dealer's deck is reset and shuffled (or for a shoe with a cut card, only once the cut card has
+        been reached, see Deck.new_round()), the existing hands and deck are reused so no new objects
+        are created for each round
+
+        :param advance_button: if True then the button is also advanced to the next player
+
+        :return nothing
+        """
+        for player in self.players:
+            player.clear_hand()
+
+        self.__board.clear()
+
+        if self.dealer:
+            self.dealer.deck.new_round()
+
+        if advance_button and self.player_count:
+            self.advance_button()
+
+    def showdown(self, betting, game=gconsts.HOLDEM_GAME_VALUE, run_count=1, exact_limit=all_in.DEFAULT_EXACT_LIMIT,
+                 samples=all_in.DEFAULT_SAMPLES, seed=None):
+        """
+        Plays the showdown of the current round once its betting is complete, dealing the rest of the
+        board (once for every run) if players are all-in before the river and recording their all-in
+        adjusted expected chips next to the chips they actually win, see all_in.showdown()
+
+        :param betting: Betting class instance of the current round
+        :param game: game value (as gconsts.GAMES)
+        :param run_count: number of times the rest of the board is run when players are all-in
+        :param exact_limit: largest number of runouts enumerated exactly for the expected chips
+        :param samples: number of runouts sampled when there are too many to enumerate
+        :param seed: seed of the random generator used when sampling
+
+        :return ShowdownResult class instance
+        """
+        return all_in.showdown(self, betting, game, run_count, exact_limit, samples, seed)
+
+    def get_state(self):
+        """
+        Returns the state of this table for a checkpoint, see set_state()
+
+        :return dict of the button and current player indices, the board, and the state of every player in
+                seat order and of the dealer
+        """
+        return {"on_the_button_player_index": self.__on_the_button_player_index,
+                "current_player_index": self.__current_player_index,
+                "board": codec.encode_cards(self.__board),
+                "players": [player.get_state() for player in self.players],
+                "dealer": self.dealer.get_state() if self.dealer else None}
+
+    def set_state(self, state):
+        """
+        Restores this table in place to the supplied state returned by get_state(), the table must have been
+        set up with the same number of players (and a dealer if the checkpointed table had one), each seat is
+        restored to the player checkpointed in that seat, cards are taken from the dealer's deck
+
+        :param state: dict as returned by get_state()
+
+        :return nothing
+
+        :exception ValueError: thrown when the number of players does not match the state
+        """
+        if not len(state["players"]) == self.player_count:
+            msg_str = "Table state does not match players at table: state={0} table={1}"
+            raise ValueError(msg_str.format(len(state["players"]), self.player_count))
+
+        cards = codec.CARDS
+        if self.dealer and state["dealer"] is not None:
+            self.dealer.set_state(state["dealer"])
+            cards = self.dealer.deck.ordered_cards
+
+        self.__player_indices.clear()
+        for index, (player, player_state) in enumerate(zip(self.players, state["players"])):
+            player.set_state(player_state, cards)
+            self.__player_indices[player.ident] = index
+
+        self.__on_the_button_player_index = state["on_the_button_player_index"]
+        self.__current_player_index = state["current_player_index"]
+        self.__board[:] = codec.decode_cards(state["board"], cards)
+
     def __str__(self):
         """
         To string method
@@ -123,8 +299,10 @@ class Table:
         :return string representation of this table instance
         """
         p = "\n\t".join(map(str, self.players))
-        s = "{0}\nDealer: {1}\nPlayers:\n\t{2}".format(self.name,
-                                                       self.dealer.name if self.dealer else "None",
-                                                       p if not p == "" else "None")
+        b = " ".join(map(str, self.board))
+        s = "{0}\nDealer: {1}\nBoard: {2}\nPlayers:\n\t{3}".format(self.name,
+                                                                   self.dealer.name if self.dealer else "None",
+                                                                   b if not b == "" else "None",
+                                                                   p if not p == "" else "None")
 
         return s
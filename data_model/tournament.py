@@ -0,0 +1,263 @@
+"""
+Author:     Chris Knowles
+File:       tournament.py
+Version:    1.0.0
+Notes:      Tournament class that manages players seated across many tables, balancing the tables
+            and breaking them as players bust out of the tournament
+"""
+# Imports
+from data_model.dealer import Dealer
+from data_model.table import Table
+
+
+# Classes
+class Tournament:
+    """
+    Tournament class that seats players across multiple tables - class variables:
+        none
+    """
+    def __init__(self, name, players=None, seats_per_table=9):
+        """
+        Initialiser - instance variables:
+            __name: name of this instance, as string, property with read only access
+            __seats_per_table: maximum number of players seated at each table, as integer, property with
+                               read only access
+            __players: registry of all players still in this tournament, as dict of player ident to
+                       Player class
+            __tables: all tables currently running in this tournament, as dict of Table class (used as an
+                      ordered set), property with read only access as a list
+            __tables_by_count: the tables bucketed by the number of players seated at them, as list (indexed
+                               by player count) of dicts of Table class, this allows the fullest and
+                               emptiest tables to be found without scanning all the tables
+            __table_number: number given to the most recently created table, used to name new tables
+
+        :param name: name of this tournament
+        :param players: players entered into this tournament as list of Player class, defaults to none
+        :param seats_per_table: maximum number of players seated at each table
+        """
+        self.__name = name
+        self.__seats_per_table = seats_per_table
+        self.__players = {}
+        self.__tables = {}
+        self.__tables_by_count = [{} for _ in range(seats_per_table + 1)]
+        self.__table_number = 0
+
+        if players:
+            self.seat_players(players)
+
+    @property
+    def name(self):
+        return self.__name
+
+    @property
+    def seats_per_table(self):
+        return self.__seats_per_table
+
+    @property
+    def players(self):
+        return list(self.__players.values())
+
+    @property
+    def player_count(self):
+        return len(self.__players)
+
+    @property
+    def tables(self):
+        return list(self.__tables)
+
+    @property
+    def table_count(self):
+        return len(self.__tables)
+
+    def get_player(self, ident):
+        """
+        Returns the player in this tournament with the supplied unique ident or returns None if
+        there is no such player still in this tournament
+
+        :param ident: the unique ident of the player instance to return
+
+        :return player instance or None if no player with supplied ident
+        """
+        return self.__players.get(ident)
+
+    def seat_players(self, players):
+        """
+        Registers the supplied players and seats them, enough new tables are opened so that all the
+        players (including those already seated) can be seated and then each player is seated at
+        the table with the fewest players, so all tables are left balanced
+
+        :param players: players to seat, as list of Player class, any player already registered in
+                        this tournament is ignored
+
+        :return nothing
+        """
+        players = [p for p in players if p.ident not in self.__players]
+        required = -(-(self.player_count + len(players)) // self.seats_per_table)
+
+        while self.table_count < required:
+            self.__open_table()
+
+        for player in players:
+            self.__players[player.ident] = player
+            self.__seat(player, self.__emptiest_table())
+
+    def register_player(self, player):
+        """
+        Registers the supplied player and seats them at the table with the fewest players, opening a
+        new table if all the current tables are full
+
+        :param player: player to register into this tournament
+
+        :return nothing
+        """
+        self.seat_players([player])
+
+    def bust_player(self, player):
+        """
+        Removes the supplied player from this tournament and from the table they are seated at, the
+        tables are then balanced
+
+        :param player: player that has busted out of this tournament
+
+        :return list of moves made to balance the tables, each a tuple of (player, from table,
+                to table), or empty list if the player is not in this tournament
+        """
+        if self.__players.pop(player.ident, None) is None:
+            return []
+
+        self.__unseat(player)
+
+        return self.balance()
+
+    def balance(self):
+        """
+        Balances the tables of this tournament, first any table that is no longer needed (ie. its
+        players can be seated at the remaining tables) is broken and its players are seated at the
+        emptiest remaining tables, then players are moved from the fullest table to the emptiest
+        table until no two tables differ by more than one player, the player moved is the one due
+        to take the big blind next at their table, finding the fullest and emptiest tables only
+        ever checks the count buckets so the cost does not grow with the number of tables
+
+        :return list of moves made to balance the tables, each a tuple of (player, from table,
+                to table)
+        """
+        moves = []
+
+        # Break tables while the remaining players fit on one less table
+        while self.table_count > 1 and self.player_count <= (self.table_count - 1) * self.seats_per_table:
+            broken = self.__emptiest_table()
+            self.__close_table(broken)
+
+            for player in list(broken.players):
+                broken.remove_player(player)
+                to_table = self.__emptiest_table()
+                self.__seat(player, to_table)
+                moves.append((player, broken, to_table))
+
+        # Move players from the fullest to the emptiest table until balanced
+        while self.table_count > 1:
+            from_table = self.__fullest_table()
+            to_table = self.__emptiest_table()
+
+            if from_table.player_count - to_table.player_count < 2:
+                break
+
+            index = (from_table.on_the_button_player_index + 2) % from_table.player_count
+            player = from_table.get_player_by_index(index)
+            self.__unseat(player)
+            self.__seat(player, to_table)
+            moves.append((player, from_table, to_table))
+
+        return moves
+
+    def __open_table(self):
+        """
+        Opens a new empty table (with its own dealer) in this tournament
+
+        :return the new table
+        """
+        self.__table_number += 1
+        name = "{0} Table {1}".format(self.name, self.__table_number)
+        table = Table(name=name, dealer=Dealer(name="{0} Dealer".format(name)))
+
+        self.__tables[table] = None
+        self.__tables_by_count[0][table] = None
+
+        return table
+
+    def __close_table(self, table):
+        """
+        Closes the supplied table so that it no longer runs in this tournament, the players at the table
+        are left seated so that they can be moved
+
+        :param table: table to close
+
+        :return nothing
+        """
+        del self.__tables[table]
+        del self.__tables_by_count[table.player_count][table]
+
+    def __seat(self, player, table):
+        """
+        Seats the supplied player at the supplied table and keeps the table count buckets up to date
+
+        :param player: player to seat
+        :param table: table to seat the player at
+
+        :return nothing
+        """
+        del self.__tables_by_count[table.player_count][table]
+        table.add_player(player)
+        self.__tables_by_count[table.player_count][table] = None
+
+    def __unseat(self, player):
+        """
+        Removes the supplied player from the table they are seated at and keeps the table count buckets
+        up to date
+
+        :param player: player to remove from their table
+
+        :return nothing
+        """
+        table = player.table
+        if table is None or table not in self.__tables:
+            return
+
+        del self.__tables_by_count[table.player_count][table]
+        table.remove_player(player)
+        self.__tables_by_count[table.player_count][table] = None
+
+    def __emptiest_table(self):
+        """
+        Returns the table with the fewest players seated at it, or None if there are no tables
+
+        :return table with fewest players
+        """
+        for bucket in self.__tables_by_count:
+            if bucket:
+                return next(iter(bucket))
+
+        return None
+
+    def __fullest_table(self):
+        """
+        Returns the table with the most players seated at it, or None if there are no tables
+
+        :return table with most players
+        """
+        for bucket in reversed(self.__tables_by_count):
+            if bucket:
+                return next(iter(bucket))
+
+        return None
+
+    def __str__(self):
+        """
+        To string method
+
+        :return string representation of this tournament instance
+        """
+        t = "\n\t".join("{0}: {1} players".format(table.name, table.player_count) for table in self.__tables)
+        s = "{0}\nPlayers: {1}\nTables:\n\t{2}".format(self.name, self.player_count, t if not t == "" else "None")
+
+        return s
@@ -0,0 +1,292 @@
+"""
+Author:     Chris Knowles
+File:       agent.py
+Version:    1.0.0
+Notes:      Batched decision making for bots playing at many tables at once, the state of every
+            table waiting on a decision is gathered into numpy arrays so that an agent makes the
+            decisions for all the tables with a single call
+"""
+# Imports
+import numpy as np
+from engine import gconsts
+from engine.exceptions import IllegalActionError
+
+
+# Classes
+class StateBatch:
+    """
+    Batch of table states for the tables waiting on a betting decision - class variables:
+        none
+    """
+    def __init__(self, table_count, max_seats=10, max_hole_cards=2, max_board_cards=5):
+        """
+        Initialiser - instance variables (all arrays are indexed first by row in the batch, where a row is
+        one table, and all have read only access through properties):
+            __active: whether the row is waiting on a decision, as numpy bool array, rows that are not active
+                      should be ignored by an agent
+            __seat: seat index of the player to act, as numpy int8 array
+            __player_count: number of players at the table, as numpy int8 array
+            __position: position of the player to act relative to the player on the button
+                        (Table.on_the_button_player_index), 0 being the button, 1 the seat after the button
+                        and so on, as numpy int8 array
+            __hole_cards: hole cards of the player to act as integer card encodings (Card.index), padded with
+                          -1, as numpy int8 array of shape (rows, max_hole_cards)
+            __board: community cards of the table as integer card encodings, padded with -1, as numpy int8
+                     array of shape (rows, max_board_cards)
+            __pot: total chips in the pot, as numpy int64 array
+            __stacks: chips behind of every seat, padded with 0, as numpy int64 array of shape (rows, max_seats)
+            __street_bets: chips put in on the current street by every seat, padded with 0, as numpy int64
+                           array of shape (rows, max_seats)
+            __to_call: chips the player to act must put in to call, as numpy int64 array
+            __can_raise: whether the player to act may bet or raise, as numpy bool array
+            __min_raise_to: smallest total street bet the player to act may raise to, as numpy int64 array
+            __max_raise_to: largest total street bet the player to act may raise to (ie. all-in), as numpy
+                            int64 array
+
+        :param table_count: number of rows (tables) in the batch
+        :param max_seats: maximum number of seats at any table
+        :param max_hole_cards: maximum number of hole cards held by any player
+        :param max_board_cards: maximum number of community cards on any table
+        """
+        self.__active = np.zeros(table_count, dtype=bool)
+        self.__seat = np.zeros(table_count, dtype=np.int8)
+        self.__player_count = np.zeros(table_count, dtype=np.int8)
+        self.__position = np.zeros(table_count, dtype=np.int8)
+        self.__hole_cards = np.full((table_count, max_hole_cards), -1, dtype=np.int8)
+        self.__board = np.full((table_count, max_board_cards), -1, dtype=np.int8)
+        self.__pot = np.zeros(table_count, dtype=np.int64)
+        self.__stacks = np.zeros((table_count, max_seats), dtype=np.int64)
+        self.__street_bets = np.zeros((table_count, max_seats), dtype=np.int64)
+        self.__to_call = np.zeros(table_count, dtype=np.int64)
+        self.__can_raise = np.zeros(table_count, dtype=bool)
+        self.__min_raise_to = np.zeros(table_count, dtype=np.int64)
+        self.__max_raise_to = np.zeros(table_count, dtype=np.int64)
+
+    @property
+    def table_count(self):
+        return len(self.__active)
+
+    @property
+    def active(self):
+        return self.__active
+
+    @property
+    def seat(self):
+        return self.__seat
+
+    @property
+    def player_count(self):
+        return self.__player_count
+
+    @property
+    def position(self):
+        return self.__position
+
+    @property
+    def hole_cards(self):
+        return self.__hole_cards
+
+    @property
+    def board(self):
+        return self.__board
+
+    @property
+    def pot(self):
+        return self.__pot
+
+    @property
+    def stacks(self):
+        return self.__stacks
+
+    @property
+    def street_bets(self):
+        return self.__street_bets
+
+    @property
+    def to_call(self):
+        return self.__to_call
+
+    @property
+    def can_raise(self):
+        return self.__can_raise
+
+    @property
+    def min_raise_to(self):
+        return self.__min_raise_to
+
+    @property
+    def max_raise_to(self):
+        return self.__max_raise_to
+
+    def fill(self, row, table, betting):
+        """
+        Fills the supplied row of the batch from the supplied table and the betting of its current hand,
+        the row is marked active if a seat is to act, otherwise it is marked inactive and left as it is
+
+        :param row: row of the batch to fill
+        :param table: table to take the players, button and board from
+        :param betting: betting of the current hand at the table, as Betting class
+
+        :return nothing
+        """
+        seat = betting.to_act
+        if seat == gconsts.NO_PLAYER_INDEX:
+            self.__active[row] = False
+            return
+
+        count = betting.seat_count
+        self.__active[row] = True
+        self.__seat[row] = seat
+        self.__player_count[row] = count
+        self.__position[row] = (seat - table.on_the_button_player_index) % count
+
+        hand = table.get_player_by_index(seat).hand
+        cards = hand.hole_cards if hand.hole_cards else hand.cards
+        self.__fill_cards(self.__hole_cards[row], cards)
+        self.__fill_cards(self.__board[row], table.board)
+
+        self.__pot[row] = betting.pot.total
+        self.__stacks[row, :count] = betting.stacks
+        self.__stacks[row, count:] = 0
+        self.__street_bets[row, :count] = betting.street_bets
+        self.__street_bets[row, count:] = 0
+
+        self.__to_call[row] = betting.to_call(seat)
+        self.__can_raise[row] = betting.can_raise(seat)
+        self.__max_raise_to[row] = betting.street_bets[seat] + betting.stacks[seat]
+        self.__min_raise_to[row] = min(betting.current_bet + max(betting.min_raise, 1), self.__max_raise_to[row])
+
+    @staticmethod
+    def __fill_cards(row, cards):
+        """
+        Writes the integer encodings of the supplied cards into the supplied array row, padding with -1
+
+        :param row: numpy array row to write into
+        :param cards: cards to encode
+
+        :return nothing
+        """
+        count = min(len(cards), len(row))
+        for i in range(count):
+            row[i] = cards[i].index
+        row[count:] = -1
+
+
+class Agent:
+    """
+    Base class of agents that make betting decisions for a batch of tables at once, a subclass overrides
+    decide_batch(), typically with a numpy-backed policy working on whole arrays of the state batch -
+    class variables:
+        none
+    """
+    def decide_batch(self, state):
+        """
+        Decides the action for every active row of the supplied state batch, the results for inactive
+        rows are ignored
+
+        :param state: batch of table states, as StateBatch class
+
+        :return tuple of two numpy arrays, each with one element per row of the batch, the first holds the
+                action (one of the gconsts action values) and the second holds the total street bet to
+                raise to for a bet or raise action
+        """
+        raise NotImplementedError("Agent subclasses must implement decide_batch()")
+
+
+class CallingAgent(Agent):
+    """
+    Agent that always checks or calls - class variables:
+        none
+    """
+    def decide_batch(self, state):
+        """
+        Checks or calls for every row of the supplied state batch
+
+        :param state: batch of table states, as StateBatch class
+
+        :return tuple of action and raise to amount arrays (see Agent.decide_batch())
+        """
+        actions = np.full(state.table_count, gconsts.CHECK_CALL_ACTION_VALUE, dtype=np.int8)
+
+        return actions, np.zeros(state.table_count, dtype=np.int64)
+
+
+class TableBatch:
+    """
+    Plays betting in lockstep across many tables, each step gathers the state of every table waiting on
+    a decision into one StateBatch and asks the agent for all the decisions with a single call -
+    class variables:
+        none
+    """
+    def __init__(self, tables, bettings):
+        """
+        Initialiser - instance variables:
+            __tables: tables being played, as list of Table class, property with read only access
+            __bettings: betting of the current hand at each table, as list of Betting class (in the same
+                        order as the tables), property with read only access
+            __state: batch of table states reused for every step, as StateBatch class, property with read
+                     only access
+
+        :param tables: tables being played
+        :param bettings: betting of the current hand at each table
+        """
+        self.__tables = tables
+        self.__bettings = bettings
+        self.__state = StateBatch(len(tables), max_seats=max([b.seat_count for b in bettings], default=1))
+
+    @property
+    def tables(self):
+        return self.__tables
+
+    @property
+    def bettings(self):
+        return self.__bettings
+
+    @property
+    def state(self):
+        return self.__state
+
+    def step(self, agent):
+        """
+        Fills the state batch from every table, asks the supplied agent for the decisions of all active
+        rows and applies them, a raise amount outside the allowed range is clamped into it and a raise by
+        a seat that may not raise is treated as a call
+
+        :param agent: agent making the decisions, as Agent class
+
+        :return number of decisions applied
+        """
+        state = self.__state
+        for row in range(len(self.__tables)):
+            state.fill(row, self.__tables[row], self.__bettings[row])
+
+        rows = np.flatnonzero(state.active)
+        if not rows.size:
+            return 0
+
+        actions, amounts = agent.decide_batch(state)
+        amounts = np.clip(amounts, state.min_raise_to, state.max_raise_to)
+        raising = (actions == gconsts.BET_RAISE_ACTION_VALUE) & ~state.can_raise
+        actions = np.where(raising, gconsts.CHECK_CALL_ACTION_VALUE, actions)
+
+        for row in rows:
+            try:
+                self.__bettings[row].act(int(actions[row]), int(amounts[row]))
+            except IllegalActionError:
+                self.__bettings[row].act(gconsts.CHECK_CALL_ACTION_VALUE)
+
+        return rows.size
+
+    def play_street(self, agent):
+        """
+        Steps until the current street of betting is complete at every table
+
+        :param agent: agent making the decisions, as Agent class
+
+        :return number of steps taken (ie. number of calls made to the agent)
+        """
+        steps = 0
+        while self.step(agent):
+            steps += 1
+
+        return steps
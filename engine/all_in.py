@@ -0,0 +1,243 @@
+"""
+Author:     Chris Knowles
+File:       all_in.py
+Version:    1.0.0
+Notes:      Showdown of a hand at a table with all-in EV accounting, when players are all-in
+            before the river the chips they actually win depend on the rest of the board, which
+            adds a great deal of variance to any evaluation of a strategy, so at the moment of the
+            all-in the equity of every player in every pot (main and side pots) is worked out by
+            enumerating every rest of the board from the cards left in the dealer's deck, and the
+            expected chips won are recorded next to the chips actually won, summing the all-in
+            adjusted results over many hands converges far faster than summing the actual results,
+            the board can also be run more than once (eg. run it twice), each run is dealt from
+            the deck and wins an equal part of every pot
+"""
+# Imports
+import numpy as np
+from engine import equity
+from engine import evaluator
+from engine import gconsts
+from engine import preflop
+from engine.exceptions import IllegalActionError
+from engine.exceptions import InsufficientCardsError
+
+
+# Global consts
+DEFAULT_EXACT_LIMIT = 100000
+DEFAULT_SAMPLES = 100000
+
+
+# Classes
+class ShowdownResult:
+    """
+    Outcome of the showdown of one hand, with the actual and the all-in adjusted results of every seat - class
+    variables:
+        none
+    """
+    def __init__(self, invested, payouts, expected, equities=None, boards=None, exact=True):
+        """
+        Initialiser - instance variables:
+            __invested: chips each seat put into the pot (less any uncalled chips returned), as numpy int64 array
+                        indexed by seat, property with read only access
+            __payouts: chips each seat actually won, as numpy int64 array indexed by seat, property with read only
+                       access
+            __expected: chips each seat was expected to win at the moment of the all-in, the same as the payouts
+                        if nobody was all-in before the river, as numpy float64 array indexed by seat, property
+                        with read only access
+            __equities: share of all the chips in the pot each seat was expected to win at the moment of the
+                        all-in, as numpy float64 array indexed by seat, None if nobody was all-in before the
+                        river, property with read only access
+            __boards: board of each run, as list of lists of integer encoded cards, property with read only access
+            __exact: the expected chips were worked out over every rest of the board rather than a sample, as
+                     boolean, property with read only access
+
+        :param invested: chips each seat put into the pot
+        :param payouts: chips each seat actually won
+        :param expected: chips each seat was expected to win
+        :param equities: share of the pot each seat was expected to win, None if there was no all-in
+        :param boards: board of each run
+        :param exact: the expected chips are exact
+        """
+        self.__invested = invested
+        self.__payouts = payouts
+        self.__expected = expected
+        self.__equities = equities
+        self.__boards = boards or []
+        self.__exact = exact
+
+    @property
+    def invested(self):
+        return self.__invested
+
+    @property
+    def payouts(self):
+        return self.__payouts
+
+    @property
+    def expected(self):
+        return self.__expected
+
+    @property
+    def equities(self):
+        return self.__equities
+
+    @property
+    def boards(self):
+        return self.__boards
+
+    @property
+    def exact(self):
+        return self.__exact
+
+    @property
+    def run_count(self):
+        return len(self.__boards)
+
+    @property
+    def is_all_in(self):
+        # The board was still to come when the last chips went in
+        return self.__equities is not None
+
+    @property
+    def net(self):
+        # Chips actually won or lost by each seat
+        return self.__payouts - self.__invested
+
+    @property
+    def expected_net(self):
+        # Chips won or lost by each seat adjusted for the all-in, ie. expected rather than actual
+        return self.__expected - self.__invested
+
+    def __str__(self):
+        """
+        To string method
+
+        :return string representation of this showdown result instance
+        """
+        return "net={0}:expected={1}:runs={2}".format(self.net.tolist(), np.round(self.expected_net, 2).tolist(),
+                                                      self.run_count)
+
+
+# Functions
+def expected_payouts(holes, board, known_cards, pots, game=gconsts.HOLDEM_GAME_VALUE, exact_limit=DEFAULT_EXACT_LIMIT,
+                     samples=DEFAULT_SAMPLES, seed=None):
+    """
+    Returns the chips every player is expected to win from the supplied pots over every rest of the board that
+    avoids the known cards, or a random sample of them if there are more than the supplied limit
+
+    :param holes: hole cards of each player, as list of lists of integer encoded cards
+    :param board: integer encoded board cards dealt so far
+    :param known_cards: integer encoded cards that can not be dealt (including the hole and board cards)
+    :param pots: list of tuples of (amount, eligible players), the eligible players being indices into holes
+    :param game: game value (as gconsts.GAMES)
+    :param exact_limit: largest number of runouts enumerated exactly
+    :param samples: number of runouts sampled when there are too many to enumerate
+    :param seed: seed of the random generator used when sampling
+
+    :return tuple of (numpy float64 array of the chips expected to be won by each player, True if exact)
+    """
+    to_come = preflop.BOARD_SIZE - len(board)
+    rest, exact = equity.runouts(known_cards, to_come, samples, exact_limit, np.random.default_rng(seed))
+    boards = np.hstack((np.tile(np.array(board, dtype=np.int8), (len(rest), 1)), rest))
+    holes = np.array(holes)
+    expected = np.zeros(len(holes))
+
+    if game in gconsts.HI_LO_GAME_VALUES:
+        high, low = equity.showdown_hi_lo(holes, boards, game)
+        for amount, eligible in pots:
+            expected[eligible] += amount * equity.shares_hi_lo(high[:, eligible], low[:, eligible]).mean(axis=0)
+    else:
+        strengths = equity.showdown(holes, boards, game)
+        for amount, eligible in pots:
+            expected[eligible] += amount * equity.shares(strengths[:, eligible]).mean(axis=0)
+
+    return expected, exact
+
+
+def showdown(table, betting, game=gconsts.HOLDEM_GAME_VALUE, run_count=1, exact_limit=DEFAULT_EXACT_LIMIT,
+             samples=DEFAULT_SAMPLES, seed=None):
+    """
+    Plays the showdown of the hand at the supplied table once its betting is complete, if the board is not
+    complete (ie. players are all-in before the river) the expected chips of every seat are worked out from the
+    cards left in the dealer's deck and the rest of the board is dealt, once for every run, then the pot is
+    settled and the stacks of the betting are updated (see Betting.apply_to_table() for the players' funds)
+
+    :param table: Table class instance, whose players (in seat order) hold their hole cards and whose board holds
+                  the community cards dealt so far, the first run is dealt to the board
+    :param betting: Betting class instance of the hand
+    :param game: game value (as gconsts.GAMES)
+    :param run_count: number of times the rest of the board is run when players are all-in before the river
+    :param exact_limit: largest number of runouts enumerated exactly for the expected chips, every runout from
+                        the flop or turn is always enumerated, pre-flop there are 1,712,304 runouts
+    :param samples: number of runouts sampled when there are too many to enumerate
+    :param seed: seed of the random generator used when sampling, if None then the generator is seeded from the
+                 cards known at the all-in, so the expected chips of a hand are repeatable and the dealer's
+                 generator is never used
+
+    :return ShowdownResult class instance
+
+    :exception IllegalActionError: thrown when there is more betting to come
+    :exception InsufficientCardsError: thrown when there are not enough cards in the deck for every run
+    """
+    if not betting.is_street_complete:
+        raise IllegalActionError("Showdown before the betting is complete")
+
+    folded = betting.pot.folded
+    board = [c.index for c in table.board]
+    to_come = preflop.BOARD_SIZE - len(board)
+
+    if betting.live_count < 2:
+        invested = betting.pot.contributions.copy()
+        payouts = betting.settle()
+        return ShowdownResult(invested, payouts, payouts.astype(np.float64))
+
+    if to_come and np.count_nonzero(~folded & (betting.stacks > 0)) > 1:
+        raise IllegalActionError("Showdown with more betting to come: board cards={0}".format(len(board)))
+
+    deck = table.dealer.deck
+    if deck.shuffled_cards_count < to_come * run_count:
+        msg_str = "Not enough cards in dealer's shuffled deck for every run: available={0} required={1}"
+        raise InsufficientCardsError(msg_str.format(deck.shuffled_cards_count, to_come * run_count))
+
+    # Only the chips that are contested are valued
+    betting.return_uncalled()
+    invested = betting.pot.contributions.copy()
+    live = np.flatnonzero(~folded)
+    holes = [[c.index for c in table.players[seat].hand.hole_cards] for seat in live]
+    pot_total = betting.pot.total
+
+    expected = None
+    equities = None
+    exact = True
+    if to_come:
+        # Every card not left in the deck is known, whether it is in a hand, on the board or out of play
+        known = np.setdiff1d(np.arange(evaluator.CARD_COUNT), deck.card_indices(undealt=True)).tolist()
+        seat_pots = [(amount, np.searchsorted(live, eligible)) for amount, eligible in betting.pot.side_pots()]
+        seed = known + [to_come] if seed is None else seed
+        live_expected, exact = expected_payouts(holes, board, known, seat_pots, game, exact_limit, samples, seed)
+        expected = np.zeros(len(invested))
+        expected[live] = live_expected
+        equities = expected / pot_total
+
+    # The first run is dealt to the board, any later runs from the deck after it
+    runs = [board]
+    if to_come:
+        table.dealer.deal_to_table(to_come)
+        runs = [[c.index for c in table.board]]
+        for _ in range(run_count - 1):
+            runs.append(board + [deck.pop_shuffled_card().index for _ in range(to_come)])
+
+    ranks = np.zeros((len(runs), len(invested)), dtype=np.int64)
+    low_ranks = None
+    if game in gconsts.HI_LO_GAME_VALUES:
+        high, low = equity.showdown_hi_lo(np.array(holes), np.array(runs), game)
+        low_ranks = np.zeros_like(ranks)
+        ranks[:, live] = high
+        low_ranks[:, live] = low
+    else:
+        ranks[:, live] = equity.showdown(np.array(holes), np.array(runs), game)
+
+    payouts = betting.settle(ranks, low_ranks)
+
+    return ShowdownResult(invested, payouts, payouts.astype(np.float64) if expected is None else expected,
+                          equities, runs, exact)
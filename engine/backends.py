@@ -0,0 +1,404 @@
+"""
+Author:     Chris Knowles
+File:       backends.py
+Version:    1.0.0
+Notes:      Pluggable backends for the evaluation and equity kernels, every backend evaluates a
+            batch of hands and the Holdem equity of known hands over a batch of boards with the
+            same results, the pure Python backend loops over the scalar evaluator, the NumPy
+            backend evaluates whole batches with array operations and the Numba backend compiles
+            the scalar evaluator to machine code on first use (cached on disk between runs),
+            Numba is optional and is only imported when its backend is first used, the default
+            backend is the fastest one available unless another is selected with select(), every
+            backend is checked by the same correctness suite against Hand.determine_quality()
+            (see verify())
+"""
+# Imports
+from importlib.util import find_spec
+import threading
+import numpy as np
+from engine import evaluator
+from engine import gconsts
+
+
+# Global consts
+PYTHON_BACKEND = "python"
+NUMPY_BACKEND = "numpy"
+NUMBA_BACKEND = "numba"
+BACKENDS = (PYTHON_BACKEND, NUMPY_BACKEND, NUMBA_BACKEND)
+
+# One hand of every quality, so the correctness suite always covers the rare ones
+QUALITY_HANDS = (
+    (0, 48, 44, 40, 36, 5, 9),      # royal flush
+    (20, 24, 28, 32, 36, 1, 2),     # straight flush
+    (0, 4, 8, 12, 16, 21, 26),      # five high straight flush
+    (8, 9, 10, 11, 20, 25, 30),     # quads
+    (8, 9, 10, 20, 21, 30, 35),     # full house
+    (8, 9, 10, 20, 21, 22, 35),     # full house from two trips
+    (0, 12, 20, 28, 44, 1, 6),      # flush
+    (0, 5, 10, 15, 16, 30, 35),     # five high straight
+    (36, 41, 46, 51, 0, 22, 27),    # ace high straight
+    (8, 9, 10, 20, 25, 30, 47),     # trips
+    (8, 9, 20, 21, 30, 31, 47),     # two pairs from three pairs
+    (8, 9, 20, 25, 30, 35, 47),     # pair
+    (4, 13, 22, 31, 40, 45, 50),    # high card
+)
+
+
+# Global variables
+_backends = {}
+_selected = None
+_lock = threading.Lock()
+
+
+# Classes
+class Backend:
+    """
+    Evaluation and equity kernels of one backend - class variables:
+        none
+    """
+    def __init__(self, name, evaluate_batch, equity):
+        """
+        Initialiser - instance variables:
+            __name: name of this backend (as BACKENDS), property with read only access
+            __evaluate_batch: function evaluating the strength of every hand in a numpy integer array of shape
+                              (hands, cards per hand) of integer encoded cards padded with evaluator.NO_CARD,
+                              returning a numpy int64 array, property with read only access
+            __equity: function of (hole cards as numpy integer array of shape (players, hole cards), complete
+                      boards as numpy integer array of shape (boards, board size)) returning the Holdem equity
+                      of each player over the boards as numpy float64 array, property with read only access
+
+        :param name: name of this backend
+        :param evaluate_batch: batch evaluation kernel
+        :param equity: equity kernel
+        """
+        self.__name = name
+        self.__evaluate_batch = evaluate_batch
+        self.__equity = equity
+
+    @property
+    def name(self):
+        return self.__name
+
+    @property
+    def evaluate_batch(self):
+        return self.__evaluate_batch
+
+    @property
+    def equity(self):
+        return self.__equity
+
+    def __str__(self):
+        """
+        To string method
+
+        :return string representation of this backend instance
+        """
+        return "Backend:{0}".format(self.__name)
+
+
+# Functions
+def _python_evaluate_batch(cards):
+    """
+    Pure Python batch evaluation kernel, see Backend
+
+    :param cards: numpy integer array of shape (hands, cards per hand)
+
+    :return numpy int64 array of the strength of each hand
+    """
+    return np.array([evaluator.evaluate([c for c in row if c >= 0]) for row in np.asarray(cards).tolist()],
+                    dtype=np.int64)
+
+
+def _python_equity(holes, boards):
+    """
+    Pure Python equity kernel, see Backend
+
+    :param holes: numpy integer array of shape (players, hole cards)
+    :param boards: numpy integer array of shape (boards, board size)
+
+    :return numpy float64 array of the equity of each player
+    """
+    holes = np.asarray(holes).tolist()
+    won = [0.0] * len(holes)
+
+    for board in np.asarray(boards).tolist():
+        strengths = [evaluator.evaluate(hole + board) for hole in holes]
+        best = max(strengths)
+        winners = [i for i, s in enumerate(strengths) if s == best]
+        for i in winners:
+            won[i] += 1.0 / len(winners)
+
+    return np.array(won) / max(len(boards), 1)
+
+
+def _numpy_equity(holes, boards):
+    """
+    NumPy equity kernel, see Backend
+
+    :param holes: numpy integer array of shape (players, hole cards)
+    :param boards: numpy integer array of shape (boards, board size)
+
+    :return numpy float64 array of the equity of each player
+    """
+    holes = np.asarray(holes)
+    boards = np.asarray(boards)
+    players = len(holes)
+    count = len(boards)
+
+    cards = np.concatenate((np.broadcast_to(holes[None, :, :], (count, players, holes.shape[1])),
+                            np.broadcast_to(boards[:, None, :], (count, players, boards.shape[1]))), axis=2)
+    strengths = evaluator.evaluate_batch(cards.reshape(count * players, -1)).reshape(count, players)
+    winners = strengths == strengths.max(axis=1, keepdims=True)
+
+    return (winners / winners.sum(axis=1, keepdims=True)).mean(axis=0)
+
+
+def _build_numba_backend():
+    """
+    Builds the Numba backend, its kernels are compiled on first use and take the evaluator tables as arguments
+    so that they use the same (possibly shared, see tables.load()) tables as every other backend
+
+    :return Backend class instance
+    """
+    # Imported here as Numba is optional and slow to import
+    import numba
+
+    rank_bits = np.array(evaluator.CARD_RANK_BITS, dtype=np.int64)
+    card_suits = np.array(evaluator.CARD_SUITS, dtype=np.int64)
+    popcounts = np.asarray(evaluator.NP_POPCOUNTS, dtype=np.int64)
+    top_cards = np.asarray(evaluator.NP_TOP_CARDS, dtype=np.int64)
+    straights = np.asarray(evaluator.NP_STRAIGHTS, dtype=np.int64)
+
+    quality_shift = evaluator.QUALITY_SHIFT
+    major_shift = evaluator.MAJOR_SHIFT
+    royal_straight = evaluator.ROYAL_STRAIGHT
+
+    @numba.njit(cache=True)
+    def evaluate_cards(cards, rank_bits, card_suits, popcounts, top_cards, straights):
+        # Same as evaluator.evaluate() and evaluator.evaluate_masks(), the rank mask of each of the four suits is
+        # kept in a scalar (in gconsts.SUIT_NAMES order) rather than an array so nothing is allocated for each hand
+        seen = pairs = trips = quads = 0
+        spades = hearts = clubs = diamonds = 0
+
+        for c in cards:
+            if c < 0:
+                continue
+            b = rank_bits[c]
+            quads |= trips & b
+            trips |= pairs & b
+            pairs |= seen & b
+            seen |= b
+            suit = card_suits[c]
+            if suit == 0:
+                spades |= b
+            elif suit == 1:
+                hearts |= b
+            elif suit == 2:
+                clubs |= b
+            else:
+                diamonds |= b
+
+        flush = 0
+        if popcounts[spades] >= 5:
+            flush = spades
+        elif popcounts[hearts] >= 5:
+            flush = hearts
+        elif popcounts[clubs] >= 5:
+            flush = clubs
+        elif popcounts[diamonds] >= 5:
+            flush = diamonds
+
+        if flush:
+            top = straights[flush]
+            if top:
+                if top == royal_straight:
+                    return (gconsts.ROYAL_FLUSH_QUALITY_VALUE << quality_shift) | (top << major_shift)
+                return (gconsts.STRAIGHT_FLUSH_QUALITY_VALUE << quality_shift) | (top << major_shift)
+
+        if quads:
+            top = top_cards[1, quads]
+            return (gconsts.QUADS_QUALITY_VALUE << quality_shift) | (top << major_shift) | top_cards[1, seen ^ top]
+
+        if trips:
+            top = top_cards[1, trips]
+            low = pairs ^ top
+            if low:
+                return ((gconsts.FULL_HOUSE_QUALITY_VALUE << quality_shift) | (top << major_shift) |
+                        top_cards[1, low])
+
+        if flush:
+            return (gconsts.FLUSH_QUALITY_VALUE << quality_shift) | (top_cards[5, flush] << major_shift)
+
+        top = straights[seen]
+        if top:
+            return (gconsts.STRAIGHT_QUALITY_VALUE << quality_shift) | (top << major_shift)
+
+        if trips:
+            top = top_cards[1, trips]
+            return (gconsts.TRIPS_QUALITY_VALUE << quality_shift) | (top << major_shift) | top_cards[2, seen ^ top]
+
+        if pairs:
+            top = top_cards[2, pairs]
+            if top ^ top_cards[1, top]:
+                return ((gconsts.TWO_PAIRS_QUALITY_VALUE << quality_shift) | (top << major_shift) |
+                        top_cards[1, seen ^ top])
+            return (gconsts.PAIR_QUALITY_VALUE << quality_shift) | (top << major_shift) | top_cards[3, seen ^ top]
+
+        return (gconsts.HIGH_CARD_QUALITY_VALUE << quality_shift) | (top_cards[5, seen] << major_shift)
+
+    @numba.njit(cache=True)
+    def evaluate_rows(cards, rank_bits, card_suits, popcounts, top_cards, straights):
+        strengths = np.empty(cards.shape[0], dtype=np.int64)
+        for i in range(cards.shape[0]):
+            strengths[i] = evaluate_cards(cards[i], rank_bits, card_suits, popcounts, top_cards, straights)
+        return strengths
+
+    @numba.njit(cache=True)
+    def equity_rows(holes, boards, rank_bits, card_suits, popcounts, top_cards, straights):
+        players = holes.shape[0]
+        hole_size = holes.shape[1]
+        won = np.zeros(players)
+        cards = np.empty(hole_size + boards.shape[1], dtype=np.int64)
+        strengths = np.empty(players, dtype=np.int64)
+
+        for b in range(boards.shape[0]):
+            cards[hole_size:] = boards[b]
+            best = -1
+            for p in range(players):
+                cards[:hole_size] = holes[p]
+                strengths[p] = evaluate_cards(cards, rank_bits, card_suits, popcounts, top_cards, straights)
+                best = max(best, strengths[p])
+            winners = 0
+            for p in range(players):
+                if strengths[p] == best:
+                    winners += 1
+            for p in range(players):
+                if strengths[p] == best:
+                    won[p] += 1.0 / winners
+
+        return won / max(boards.shape[0], 1)
+
+    def evaluate_batch(cards):
+        return evaluate_rows(np.ascontiguousarray(cards, dtype=np.int64), rank_bits, card_suits, popcounts,
+                             top_cards, straights)
+
+    def equity(holes, boards):
+        return equity_rows(np.ascontiguousarray(holes, dtype=np.int64), np.ascontiguousarray(boards, dtype=np.int64),
+                           rank_bits, card_suits, popcounts, top_cards, straights)
+
+    return Backend(NUMBA_BACKEND, evaluate_batch, equity)
+
+
+def available():
+    """
+    Returns the names of the backends that can be used here, ie. the Numba backend only if Numba is installed
+
+    :return tuple of backend names, fastest last
+    """
+    return BACKENDS if find_spec("numba") is not None else (PYTHON_BACKEND, NUMPY_BACKEND)
+
+
+def get(name=None):
+    """
+    Returns the named backend, building it the first time it is asked for
+
+    :param name: backend name (as BACKENDS), if None then the selected backend (see select()), or the fastest
+                 available if none has been selected
+
+    :return Backend class instance
+
+    :exception ValueError: thrown when the named backend does not exist or is not available
+    """
+    name = name or _selected or available()[-1]
+
+    if name not in available():
+        raise ValueError("Backend not available: {0} (available: {1})".format(name, ", ".join(available())))
+
+    # Built under the lock so that threads asking for a backend at the same time share one build
+    with _lock:
+        backend = _backends.get(name)
+        if backend is None:
+            if name == PYTHON_BACKEND:
+                backend = Backend(PYTHON_BACKEND, _python_evaluate_batch, _python_equity)
+            elif name == NUMPY_BACKEND:
+                backend = Backend(NUMPY_BACKEND, evaluator.evaluate_batch, _numpy_equity)
+            else:
+                backend = _build_numba_backend()
+            _backends[name] = backend
+
+    return backend
+
+
+def select(name):
+    """
+    Selects the backend used when no backend is named
+
+    :param name: backend name (as BACKENDS), or None to go back to the fastest available
+
+    :return nothing
+
+    :exception ValueError: thrown when the named backend does not exist or is not available
+    """
+    global _selected
+    if name is not None:
+        get(name)
+
+    _selected = name
+
+
+def verify(name=None, hand_count=2000, seed=0):
+    """
+    Correctness suite run against every backend, the strength of one hand of every quality plus random hands of
+    five, six and seven cards must give the hand quality found by Hand.determine_quality(), every pair of
+    consecutive hands must be ordered as Hand.compare_hands() orders them, and the equity of random hole cards
+    on random boards must match the NumPy backend
+
+    :param name: backend name (as BACKENDS), if None then the selected backend
+    :param hand_count: number of random hands checked
+    :param seed: seed of the random hands
+
+    :return list of descriptions of every failure, empty if the backend passed
+    """
+    # Imported here as the data model imports the engine
+    from data_model import codec
+    from data_model.hand import Hand
+
+    backend = get(name)
+    rng = np.random.default_rng(seed)
+    cards = np.full((len(QUALITY_HANDS) + hand_count, 7), evaluator.NO_CARD, dtype=np.int64)
+    cards[:len(QUALITY_HANDS)] = QUALITY_HANDS
+
+    for row in range(len(QUALITY_HANDS), len(cards)):
+        size = rng.integers(5, 8)
+        cards[row, :size] = rng.choice(evaluator.CARD_COUNT, size, replace=False)
+
+    strengths = backend.evaluate_batch(cards).tolist()
+    failures = []
+    previous = None
+
+    for row, strength in zip(cards.tolist(), strengths):
+        hand = Hand(len(row))
+        hand.load_cards([codec.CARDS[c] for c in row if c >= 0], [])
+
+        if not evaluator.hand_quality_value(strength) == hand.quality.value:
+            failures.append("{0}: quality {1} expected {2}".format(hand, evaluator.hand_quality_value(strength),
+                                                                    hand.quality.value))
+
+        if previous is not None:
+            order = (strength > previous[0]) - (strength < previous[0])
+            if not order == hand.compare_hands(previous[1]):
+                failures.append("{0} against {1}: order {2} expected {3}".format(hand, previous[1], order,
+                                                                                 hand.compare_hands(previous[1])))
+        previous = strength, hand
+
+    # Three players' hole cards then nine more cards, each window of five of which is a board
+    deals = np.argsort(rng.random((20, evaluator.CARD_COUNT)), axis=1)[:, :15]
+    for deal in deals:
+        holes = deal[:6].reshape(3, 2)
+        boards = np.array([deal[6 + k:11 + k] for k in range(5)])
+        equity = backend.equity(holes, boards)
+        expected = _numpy_equity(holes, boards)
+        if not np.allclose(equity, expected):
+            failures.append("equity {0} expected {1}".format(equity.tolist(), expected.tolist()))
+
+    return failures
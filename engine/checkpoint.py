@@ -0,0 +1,215 @@
+"""
+Author:     Chris Knowles
+File:       checkpoint.py
+Version:    1.0.0
+Notes:      Deterministic checkpoint and resume of long-running simulations, a checkpoint holds
+            the state of the random number generators (the seeded streams of every dealer's deck
+            and of the streams module, any named numpy generators of the run and the global random
+            and numpy generators), every table with its dealer's deck position, players' stacks
+            and hands, and whatever statistics the run has accumulated, so a run resumed from a
+            checkpoint produces the same results as one that was never stopped, eg.
+
+                checkpointer = checkpoint.Checkpointer("run.ckpt", interval=1000)
+                step, stats = checkpointer.resume(tables, generators, default_stats)
+                for step in range(step, steps):
+                    ... play one hand at every table ...
+                    checkpointer.update(step + 1, tables, generators, stats)
+
+            the tables are set up in the same way as for a new run and then restored in place,
+            a checkpoint is a gzip compressed pickle written atomically, so a crash while writing
+            leaves the previous checkpoint in place, each worker process keeps its own file (see
+            worker_path()), benchmarks/checkpoint_resume.py checks that resumed runs are identical
+            to uninterrupted ones for every kind of deck and exits with an error if any differ
+"""
+# Imports
+import gzip
+import os
+import pickle
+import random
+import numpy as np
+from engine import streams
+
+
+# Global consts
+CHECKPOINT_VERSION = 1
+
+
+# Classes
+class Checkpointer:
+    """
+    Writes the checkpoint of a run to one file at a fixed interval of steps - class variables:
+        none
+    """
+    def __init__(self, path, interval=1000):
+        """
+        Initialiser - instance variables:
+            __path: path of the checkpoint file, as string, property with read only access
+            __interval: number of steps between checkpoints, as integer, property with read only access
+
+        :param path: path of the checkpoint file
+        :param interval: number of steps between checkpoints
+        """
+        self.__path = path
+        self.__interval = interval
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def interval(self):
+        return self.__interval
+
+    def is_due(self, step):
+        """
+        Returns True if a checkpoint is due once the supplied number of steps have been completed
+
+        :param step: number of steps completed
+
+        :return True if a checkpoint is due, False otherwise
+        """
+        return step > 0 and step % self.__interval == 0
+
+    def update(self, step, tables=(), generators=None, stats=None, force=False):
+        """
+        Saves a checkpoint of the run if one is due once the supplied number of steps have been completed
+
+        :param step: number of steps completed
+        :param tables: iterable of Table class instances of the run
+        :param generators: named numpy random generators of the run, as dict of name to numpy Generator
+        :param stats: statistics accumulated by the run, any picklable object (eg. dict of numpy arrays)
+        :param force: if True then the checkpoint is saved even if it is not due (eg. at the end of the run)
+
+        :return True if a checkpoint was saved, False otherwise
+        """
+        if not force and not self.is_due(step):
+            return False
+
+        save(self.__path, capture(step, tables, generators, stats))
+
+        return True
+
+    def resume(self, tables=(), generators=None, stats=None):
+        """
+        Restores the run from the checkpoint file if there is one
+
+        :param tables: iterable of Table class instances of the run, set up as for a new run
+        :param generators: named numpy random generators of the run, as dict of name to numpy Generator
+        :param stats: statistics of a new run, returned if there is no checkpoint
+
+        :return tuple of (number of steps completed, statistics), (0, supplied statistics) if there is no
+                checkpoint
+        """
+        state = load(self.__path)
+        if state is None:
+            return 0, stats
+
+        return restore(state, tables, generators)
+
+
+# Functions
+def capture(step, tables=(), generators=None, stats=None):
+    """
+    Captures the state of a run
+
+    :param step: number of steps completed
+    :param tables: iterable of Table class instances of the run
+    :param generators: named numpy random generators of the run, as dict of name to numpy Generator
+    :param stats: statistics accumulated by the run, any picklable object
+
+    :return dict of the state of the run
+    """
+    return {"version": CHECKPOINT_VERSION,
+            "step": step,
+            "streams": streams.get_state(),
+            "random": random.getstate(),
+            "np_random": np.random.get_state(),
+            "generators": {name: g.bit_generator.state for name, g in (generators or {}).items()},
+            "tables": [table.get_state() for table in tables],
+            "stats": stats}
+
+
+def restore(state, tables=(), generators=None):
+    """
+    Restores a run in place to the supplied state
+
+    :param state: dict of the state of the run as returned by capture()
+    :param tables: iterable of Table class instances of the run, the same number as when captured
+    :param generators: named numpy random generators of the run, as dict of name to numpy Generator, the same
+                       names as when captured
+
+    :return tuple of (number of steps completed, statistics)
+
+    :exception ValueError: thrown when the state does not match the supplied tables or generators
+    """
+    tables = list(tables)
+    generators = generators or {}
+
+    if not state["version"] == CHECKPOINT_VERSION:
+        raise ValueError("Unsupported checkpoint version: {0}".format(state["version"]))
+
+    if not len(state["tables"]) == len(tables):
+        msg_str = "Checkpoint does not match tables of run: checkpoint={0} run={1}"
+        raise ValueError(msg_str.format(len(state["tables"]), len(tables)))
+
+    if not set(state["generators"]) == set(generators):
+        msg_str = "Checkpoint does not match generators of run: checkpoint={0} run={1}"
+        raise ValueError(msg_str.format(sorted(state["generators"]), sorted(generators)))
+
+    for table, table_state in zip(tables, state["tables"]):
+        table.set_state(table_state)
+
+    for name, g in generators.items():
+        g.bit_generator.state = state["generators"][name]
+
+    streams.set_state(state["streams"])
+    random.setstate(state["random"])
+    np.random.set_state(state["np_random"])
+
+    return state["step"], state["stats"]
+
+
+def save(path, state):
+    """
+    Writes the supplied state to a checkpoint file, the file is written alongside and then moved into place so
+    the previous checkpoint is kept if writing fails part way
+
+    :param path: path of the checkpoint file
+    :param state: dict of the state of the run as returned by capture()
+
+    :return nothing
+    """
+    temp_path = "{0}.tmp".format(path)
+    with gzip.open(temp_path, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    os.replace(temp_path, path)
+
+
+def load(path):
+    """
+    Reads the state saved in a checkpoint file
+
+    :param path: path of the checkpoint file
+
+    :return dict of the state of the run, or None if there is no checkpoint file
+    """
+    if not os.path.exists(path):
+        return None
+
+    with gzip.open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def worker_path(path, worker_index):
+    """
+    Returns the path of the checkpoint file of one worker of a run, eg. "run.ckpt" becomes "run.3.ckpt"
+
+    :param path: path of the checkpoint file of the run
+    :param worker_index: index of the worker
+
+    :return path of the worker's checkpoint file
+    """
+    root, ext = os.path.splitext(path)
+
+    return "{0}.{1}{2}".format(root, worker_index, ext)
@@ -0,0 +1,131 @@
+"""
+Author:     Chris Knowles
+File:       combinatorics.py
+Version:    1.0.0
+Notes:      Combinatorial number system indexing of card sets, every set of k different integer
+            encoded cards (see Card.index, the position of the card in Deck.ordered_cards) maps
+            to a dense index from 0 to C(52, k) - 1, the index of the cards c1 < c2 < ... < ck is
+            C(c1, 1) + C(c2, 2) + ... + C(ck, k), so sets are in colexicographic order, ranking is
+            a sum of table lookups and unranking finds each card from the highest down with a
+            search of one column of the binomial table
+"""
+# Imports
+from math import comb
+import numpy as np
+from engine import evaluator
+from engine import tables
+
+
+# Global consts
+MIN_SET_SIZE = 2
+MAX_SET_SIZE = 7
+
+
+# Tables
+# BINOMIALS[n, k] is C(n, k), for every card n and set size k up to MAX_SET_SIZE
+BINOMIALS = np.array([[comb(n, k) for k in range(MAX_SET_SIZE + 1)] for n in range(evaluator.CARD_COUNT + 1)],
+                     dtype=np.int64)
+BINOMIAL_LISTS = tables.as_tuples(tables.freeze(BINOMIALS))
+
+
+# Functions
+def set_count(card_count):
+    """
+    Returns the number of different sets of the supplied number of cards, ie. C(52, card_count)
+
+    :param card_count: number of cards in each set
+
+    :return number of sets
+    """
+    return BINOMIAL_LISTS[evaluator.CARD_COUNT][card_count]
+
+
+def rank(cards):
+    """
+    Returns the index of the supplied set of cards
+
+    :param cards: iterable of different integer encoded cards, in any order
+
+    :return index from 0 to C(52, number of cards) - 1
+    """
+    return sum(BINOMIAL_LISTS[c][k] for k, c in enumerate(sorted(cards), 1))
+
+
+def unrank(index, card_count):
+    """
+    Returns the set of cards of the supplied index
+
+    :param index: index from 0 to C(52, card_count) - 1
+    :param card_count: number of cards in the set
+
+    :return list of integer encoded cards, in ascending order
+    """
+    cards = []
+    c = evaluator.CARD_COUNT
+
+    for k in range(card_count, 0, -1):
+        # Highest card whose binomial does not exceed what is left of the index
+        c -= 1
+        while BINOMIAL_LISTS[c][k] > index:
+            c -= 1
+        index -= BINOMIAL_LISTS[c][k]
+        cards.append(c)
+
+    return cards[::-1]
+
+
+def rank_batch(cards):
+    """
+    Returns the index of every set of cards in the supplied array
+
+    :param cards: numpy integer array of shape (sets, card count) of different integer encoded cards, in any
+                  order within a row
+
+    :return numpy int64 array of the index of each set
+    """
+    cards = np.sort(cards, axis=1)
+    k = np.arange(1, cards.shape[1] + 1)
+
+    return BINOMIALS[cards, k].sum(axis=1)
+
+
+def unrank_batch(indices, card_count):
+    """
+    Returns the set of cards of every one of the supplied indices
+
+    :param indices: numpy integer array of indices from 0 to C(52, card_count) - 1
+    :param card_count: number of cards in each set
+
+    :return numpy int8 array of shape (sets, card_count) of integer encoded cards, in ascending order in each
+            row
+    """
+    indices = np.array(indices, dtype=np.int64)
+    cards = np.empty((len(indices), card_count), dtype=np.int8)
+
+    for k in range(card_count, 0, -1):
+        # Each column of the table is non-decreasing, so the highest card whose binomial does not exceed the
+        # index is one before the first that does
+        column = BINOMIALS[:, k]
+        c = np.searchsorted(column, indices, side="right") - 1
+        indices -= column[c]
+        cards[:, k - 1] = c
+
+    return cards
+
+
+def iter_sets(card_count, chunk_size=1000000, start=0, stop=None):
+    """
+    Lazily yields every set of the supplied number of cards in index order, in chunks
+
+    :param card_count: number of cards in each set
+    :param chunk_size: number of sets in each chunk (the last chunk may be smaller)
+    :param start: index of the first set
+    :param stop: index after the last set, if None then up to the last set
+
+    :return generator of tuples of (index of the first set of the chunk, numpy int8 array of shape (sets,
+            card_count))
+    """
+    stop = set_count(card_count) if stop is None else stop
+
+    for first in range(start, stop, chunk_size):
+        yield first, unrank_batch(np.arange(first, min(first + chunk_size, stop)), card_count)
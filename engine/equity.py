@@ -0,0 +1,408 @@
+"""
+Author:     Chris Knowles
+File:       equity.py
+Version:    1.0.0
+Notes:      Showdown and all-in equity of known hands for Texas Holdem and Omaha, high only or
+            hi/lo split eight-or-better, the rest of the board is enumerated exactly when there are
+            few enough runouts and sampled at random otherwise, every runout is evaluated for every
+            player in a single batch, ties are split, equity_adaptive() instead samples batches
+            of runouts until the win, tie and EV of every player are known to a target precision,
+            optionally with a variance reducing sampler (stratified, antithetic or importance)
+"""
+# Imports
+from functools import partial
+from math import comb
+import numpy as np
+from engine import backends
+from engine import evaluator
+from engine import gconsts
+from engine import lowball
+from engine import omaha
+from engine import preflop
+from engine import running_stats
+
+
+# Global consts
+UNIFORM_SAMPLING = "uniform"
+STRATIFIED_SAMPLING = "stratified"
+ANTITHETIC_SAMPLING = "antithetic"
+IMPORTANCE_SAMPLING = "importance"
+SAMPLINGS = (UNIFORM_SAMPLING, STRATIFIED_SAMPLING, ANTITHETIC_SAMPLING, IMPORTANCE_SAMPLING)
+IMPORTANCE_BOOST = 1.5
+
+
+# Functions
+def showdown(holes, boards, game=gconsts.HOLDEM_GAME_VALUE):
+    """
+    Evaluates the strength of the hand of every player on every one of the supplied boards
+
+    :param holes: numpy integer array of shape (players, hole cards) of integer encoded hole cards
+    :param boards: numpy integer array of shape (boards, board size) of integer encoded board cards
+    :param game: game value (as gconsts.GAMES)
+
+    :return numpy int64 array of shape (boards, players) of the strength of each player's hand on each board
+    """
+    holes = np.asarray(holes)
+    boards = np.asarray(boards)
+
+    if game == gconsts.OMAHA_GAME_VALUE:
+        return omaha.omaha_showdown(holes, boards)
+
+    players = len(holes)
+    count = len(boards)
+    cards = np.concatenate((np.broadcast_to(holes[None, :, :], (count, players, holes.shape[1])),
+                            np.broadcast_to(boards[:, None, :], (count, players, boards.shape[1]))), axis=2)
+
+    return evaluator.evaluate_batch(cards.reshape(count * players, -1)).reshape(count, players)
+
+
+def showdown_hi_lo(holes, boards, game=gconsts.HOLDEM_HI_LO_GAME_VALUE):
+    """
+    Evaluates the high hand and the eight-or-better low of every player on every one of the supplied boards in
+    one pass
+
+    :param holes: numpy integer array of shape (players, hole cards) of integer encoded hole cards
+    :param boards: numpy integer array of shape (boards, board size) of integer encoded board cards
+    :param game: hi/lo game value (as gconsts.GAMES)
+
+    :return tuple of numpy int64 arrays of shape (boards, players) (high strengths, low strengths), a low
+            strength of lowball.NO_LOW means no qualifying low
+    """
+    if game == gconsts.OMAHA_HI_LO_GAME_VALUE:
+        return lowball.omaha_hi_lo_showdown(holes, boards)
+
+    return lowball.hi_lo_showdown(holes, boards)
+
+
+def shares(strengths):
+    """
+    Returns the share of the pot won by every player on every board, a pot is split equally between tied
+    winners
+
+    :param strengths: numpy integer array of shape (boards, players) of hand strengths (see showdown())
+
+    :return numpy float64 array of shape (boards, players)
+    """
+    winners = strengths == strengths.max(axis=1, keepdims=True)
+
+    return winners / winners.sum(axis=1, keepdims=True)
+
+
+def shares_hi_lo(high, low):
+    """
+    Returns the share of the pot won by every player on every board of a hi/lo split game, half the pot goes
+    to the best high hands and half to the best qualifying lows, or the whole pot to the best high hands if
+    there is no qualifying low
+
+    :param high: numpy integer array of shape (boards, players) of high strengths
+    :param low: numpy integer array of shape (boards, players) of low strengths
+
+    :return numpy float64 array of shape (boards, players)
+    """
+    high_shares = shares(high)
+    has_low = (low > lowball.NO_LOW).any(axis=1, keepdims=True)
+    low_winners = (low == low.max(axis=1, keepdims=True)) & has_low
+    low_shares = low_winners / np.maximum(low_winners.sum(axis=1, keepdims=True), 1)
+
+    return np.where(has_low, (high_shares + low_shares) / 2, high_shares)
+
+
+def runouts(known_cards, to_come, samples, exact_limit, rng):
+    """
+    Returns every rest of the board that avoids the supplied known cards, or a random sample of them if there
+    are more than the supplied limit
+
+    :param known_cards: integer encoded cards that may not be dealt
+    :param to_come: number of board cards still to come
+    :param samples: number of runouts sampled when not enumerating
+    :param exact_limit: largest number of runouts enumerated exactly
+    :param rng: numpy random generator used when sampling
+
+    :return tuple of (numpy int8 array of shape (runouts, to_come), True if the runouts are exact)
+    """
+    known_mask = sum(1 << int(c) for c in known_cards)
+    remaining = np.array([c for c in range(evaluator.CARD_COUNT) if not known_mask >> c & 1], dtype=np.int8)
+
+    if not to_come:
+        return np.zeros((1, 0), dtype=np.int8), True
+
+    if comb(len(remaining), to_come) <= exact_limit:
+        # Every combination of to_come remaining cards, built one column at a time
+        rows = np.arange(len(remaining))[:, None]
+        for _ in range(to_come - 1):
+            last = rows[:, -1]
+            extend = np.nonzero(np.arange(len(remaining))[None, :] > last[:, None])
+            rows = np.hstack((rows[extend[0]], extend[1][:, None]))
+
+        return remaining[rows], True
+
+    dead = np.tile(np.array(sorted(known_cards), dtype=np.int8), (samples, 1))
+
+    return preflop.deal_boards(dead, to_come, rng), False
+
+
+def equity(holes, board=(), dead=(), game=gconsts.HOLDEM_GAME_VALUE, samples=100000, exact_limit=100000,
+           seed=None, backend=None):
+    """
+    Calculates the all-in equity of every one of the supplied hands on the supplied board
+
+    :param holes: hole cards of each player, as list of lists of integer encoded cards
+    :param board: integer encoded board cards dealt so far
+    :param dead: integer encoded cards known to be out of play (eg. folded or burnt)
+    :param game: game value (as gconsts.GAMES)
+    :param samples: number of runouts sampled when there are too many to enumerate
+    :param exact_limit: largest number of runouts enumerated exactly
+    :param seed: seed of the random generator used when sampling
+    :param backend: name of the backend whose equity kernel is used for Holdem (as backends.BACKENDS), if None
+                    then the runouts are evaluated with NumPy array operations
+
+    :return numpy float64 array of the equity of each player, summing to one
+    """
+    board = list(board)
+    known = [c for cards in holes for c in cards] + board + list(dead)
+    to_come = preflop.BOARD_SIZE - len(board)
+
+    rest, _ = runouts(known, to_come, samples, exact_limit, np.random.default_rng(seed))
+    boards = np.hstack((np.tile(np.array(board, dtype=np.int8), (len(rest), 1)), rest))
+
+    if game in gconsts.HI_LO_GAME_VALUES:
+        return shares_hi_lo(*showdown_hi_lo(np.array(holes), boards, game)).mean(axis=0)
+
+    if backend is not None and game == gconsts.HOLDEM_GAME_VALUE:
+        return backends.get(backend).equity(np.array(holes), boards)
+
+    return shares(showdown(np.array(holes), boards, game)).mean(axis=0)
+
+
+def equity_hands(hands, board, dead=(), game=gconsts.HOLDEM_GAME_VALUE, samples=100000, exact_limit=100000,
+                 seed=None):
+    """
+    Calculates the all-in equity of the hole cards of every one of the supplied hands on the supplied board
+
+    :param hands: hands of the players, as list of Hand class, their hole cards are used
+    :param board: board cards, as list of Card class (eg. Table.board)
+    :param dead: cards known to be out of play, as list of Card class
+    :param game: game value (as gconsts.GAMES)
+    :param samples: number of runouts sampled when there are too many to enumerate
+    :param exact_limit: largest number of runouts enumerated exactly
+    :param seed: seed of the random generator used when sampling
+
+    :return numpy float64 array of the equity of each player
+    """
+    return equity([[c.index for c in h.hole_cards] for h in hands], [c.index for c in board],
+                  [c.index for c in dead], game, samples, exact_limit, seed)
+
+
+def outcomes(holes, boards, game=gconsts.HOLDEM_GAME_VALUE, investments=None):
+    """
+    Returns the outcome for every player on every one of the supplied complete boards
+
+    :param holes: numpy integer array of shape (players, hole cards) of integer encoded hole cards
+    :param boards: numpy integer array of shape (boards, board size) of integer encoded board cards
+    :param game: game value (as gconsts.GAMES)
+    :param investments: chips each player has put into the pot, if None then EV is the share of the pot
+
+    :return numpy float64 array of shape (boards, 3 * players), for each board whether each player wins the
+            whole pot, whether each player ties for a share of it, then the EV of each player
+    """
+    if game in gconsts.HI_LO_GAME_VALUES:
+        won = shares_hi_lo(*showdown_hi_lo(holes, boards, game))
+    else:
+        won = shares(showdown(holes, boards, game))
+
+    if investments is None:
+        ev = won
+    else:
+        investments = np.asarray(investments, dtype=np.float64)
+        ev = won * investments.sum() - investments
+
+    return np.hstack((won == 1, (won > 0) & (won < 1), ev))
+
+
+def remaining_cards(known_cards):
+    """
+    Returns the cards that may still be dealt, ordered by rank and then by suit
+
+    :param known_cards: integer encoded cards that may not be dealt
+
+    :return numpy int8 array of integer encoded cards
+    """
+    known_mask = sum(1 << int(c) for c in known_cards)
+    cards = [c for c in range(evaluator.CARD_COUNT) if not known_mask >> c & 1]
+
+    return np.array(sorted(cards, key=lambda c: ((c // evaluator.SUIT_COUNT - 1) % evaluator.RANK_COUNT, c)),
+                    dtype=np.int8)
+
+
+def texture_weights(holes, board, remaining):
+    """
+    Returns the importance of every remaining card to the outcome, a card is live if it pairs a hole card or is
+    of a suit that some player already holds three or more of (counting the board), live cards are weighted
+    by IMPORTANCE_BOOST and all other cards by one
+
+    :param holes: numpy integer array of shape (players, hole cards) of integer encoded hole cards
+    :param board: numpy integer array of integer encoded board cards
+    :param remaining: numpy integer array of the cards that may still be dealt
+
+    :return numpy float64 array of the weight of each remaining card
+    """
+    hole_ranks = np.unique((holes // evaluator.SUIT_COUNT - 1) % evaluator.RANK_COUNT)
+    suits = np.concatenate((holes, np.tile(board, (len(holes), 1))), axis=1) % evaluator.SUIT_COUNT
+    counts = np.stack([(suits == s).sum(axis=1) for s in range(evaluator.SUIT_COUNT)], axis=1)
+    draw_suits = np.nonzero((counts >= 3).any(axis=0))[0]
+
+    live = (np.isin((remaining // evaluator.SUIT_COUNT - 1) % evaluator.RANK_COUNT, hole_ranks) |
+            np.isin(remaining % evaluator.SUIT_COUNT, draw_suits))
+
+    return np.where(live, IMPORTANCE_BOOST, 1.0)
+
+
+def weighted_runouts(remaining, weights, to_come, count, rng):
+    """
+    Samples runouts with each card drawn in turn with probability in proportion to its weight (using the
+    Gumbel top-k trick to draw every runout at once) and returns the likelihood ratio of each, ie. its
+    probability when dealt uniformly over its probability when drawn by weight
+
+    :param remaining: numpy integer array of the cards that may still be dealt
+    :param weights: numpy float64 array of the weight of each remaining card
+    :param to_come: number of board cards still to come
+    :param count: number of runouts
+    :param rng: numpy random generator
+
+    :return tuple of (numpy int8 array of shape (count, to_come) of dealt cards, numpy float64 array of the
+            likelihood ratio of each runout)
+    """
+    keys = np.log(weights) + rng.gumbel(size=(count, len(remaining)))
+    chosen = np.argpartition(-keys, to_come - 1, axis=1)[:, :to_come]
+    chosen = np.take_along_axis(chosen, np.argsort(-np.take_along_axis(keys, chosen, axis=1), axis=1), axis=1)
+
+    chosen_weights = weights[chosen]
+    left = weights.sum() - (np.cumsum(chosen_weights, axis=1) - chosen_weights)
+    uniform = np.prod(1.0 / (len(remaining) - np.arange(to_come)))
+
+    return remaining[chosen], uniform / np.prod(chosen_weights / left, axis=1)
+
+
+def runouts_per_sample(sampling, to_come, remaining_count):
+    """
+    Returns the number of runouts evaluated for each sample of the supplied sampling mode
+
+    :param sampling: sampling mode (as SAMPLINGS)
+    :param to_come: number of board cards still to come
+    :param remaining_count: number of cards that may still be dealt
+
+    :return number of runouts
+    """
+    if not to_come:
+        return 1
+
+    if sampling == STRATIFIED_SAMPLING:
+        return remaining_count
+
+    return 2 if sampling == ANTITHETIC_SAMPLING else 1
+
+
+def outcome_samples(batch_size, rng, holes, board=(), dead=(), game=gconsts.HOLDEM_GAME_VALUE, investments=None,
+                    sampling=UNIFORM_SAMPLING, hero=None):
+    """
+    Samples random runouts of the supplied hands and returns the outcome for every player in each sample, this
+    is the sampler of equity_adaptive() (see running_stats.simulate()), every sampling mode gives an unbiased
+    estimate of the outcomes:
+        uniform: each sample is one runout dealt uniformly
+        stratified: each sample is one runout for every card that may come next (eg. every turn card on the
+                    flop) with the rest of the runout dealt uniformly, so every sample covers every stratum
+        antithetic: each sample is the mean of a uniform runout and its mirror, the runout with every card
+                    swapped for the card opposite it when the remaining cards are ordered by texture weight
+                    and rank (see texture_weights()), so boards of high live cards are paired with boards of
+                    low blank cards
+        importance: each sample is one runout dealt with live cards (see texture_weights()) more likely,
+                    weighted by its likelihood ratio, the live cards are those of the hero if there is one,
+                    this speeds up the estimates of the players whose outcome the live cards decide at the
+                    expense of the others
+
+    :param batch_size: number of runouts to evaluate, the number of samples is this divided by the runouts in
+                       each sample (see runouts_per_sample())
+    :param rng: numpy random generator used to deal the runouts
+    :param holes: hole cards of each player, as list of lists of integer encoded cards
+    :param board: integer encoded board cards dealt so far
+    :param dead: integer encoded cards known to be out of play
+    :param game: game value (as gconsts.GAMES)
+    :param investments: chips each player has put into the pot, if None then EV is the share of the pot
+    :param sampling: sampling mode (as SAMPLINGS)
+    :param hero: index of the player whose cards decide which cards are live, if None then every player's
+
+    :return numpy float64 array of shape (samples, 3 * players) of outcomes (see outcomes())
+    """
+    holes = np.array(holes)
+    board = np.array(board, dtype=np.int8)
+    known = np.concatenate((holes.reshape(-1), board, np.array(dead, dtype=np.int8))).astype(np.int8)
+    to_come = preflop.BOARD_SIZE - len(board)
+    remaining = remaining_cards(known)
+    count = max(batch_size // runouts_per_sample(sampling, to_come, len(remaining)), 1)
+
+    def evaluate(rest):
+        return outcomes(holes, np.hstack((np.tile(board, (len(rest), 1)), rest)), game, investments)
+
+    if not to_come or sampling == UNIFORM_SAMPLING:
+        return evaluate(preflop.deal_boards(np.tile(known, (count, 1)), to_come, rng))
+
+    if sampling == STRATIFIED_SAMPLING:
+        first = np.tile(remaining, count)[:, None]
+        rest = preflop.deal_boards(np.hstack((np.tile(known, (len(first), 1)), first)), to_come - 1, rng)
+        return evaluate(np.hstack((first, rest))).reshape(count, len(remaining), -1).mean(axis=1)
+
+    if sampling == ANTITHETIC_SAMPLING:
+        by_texture = remaining[np.argsort(texture_weights(holes, board, remaining), kind="stable")]
+        mirror = np.zeros(evaluator.CARD_COUNT, dtype=np.int8)
+        mirror[by_texture] = by_texture[::-1]
+        rest = preflop.deal_boards(np.tile(known, (count, 1)), to_come, rng)
+        return (evaluate(rest) + evaluate(mirror[rest])) / 2
+
+    if sampling == IMPORTANCE_SAMPLING:
+        weights = texture_weights(holes if hero is None else holes[hero:hero + 1], board, remaining)
+        rest, likelihood = weighted_runouts(remaining, weights, to_come, count, rng)
+        return evaluate(rest) * likelihood[:, None]
+
+    raise ValueError("Unknown sampling mode: {0}".format(sampling))
+
+
+def equity_adaptive(holes, board=(), dead=(), game=gconsts.HOLDEM_GAME_VALUE, investments=None, precision=0.001,
+                    confidence=running_stats.DEFAULT_CONFIDENCE, batch_size=10000, min_samples=10000,
+                    max_samples=10000000, seed=None, workers=None, sampling=UNIFORM_SAMPLING, hero=None,
+                    threads=None):
+    """
+    Estimates the win, tie and EV of every one of the supplied hands on the supplied board by sampling runouts
+    until the confidence interval of every player's EV is within the target precision
+
+    :param holes: hole cards of each player, as list of lists of integer encoded cards
+    :param board: integer encoded board cards dealt so far
+    :param dead: integer encoded cards known to be out of play
+    :param game: game value (as gconsts.GAMES)
+    :param investments: chips each player has put into the pot, if None then EV is the share of the pot won
+                        (ie. the equity) and the precision is a fraction of the pot, otherwise it is in chips
+    :param precision: target half width of the confidence interval of each player's EV
+    :param confidence: confidence level of the intervals
+    :param batch_size: number of runouts evaluated in each batch
+    :param min_samples: number of samples taken before stopping is considered
+    :param max_samples: largest number of samples taken
+    :param seed: seed of the runouts, the result depends only on this and never on the number of workers
+    :param workers: number of worker processes sampling runouts, if None then all are sampled in this process
+    :param sampling: sampling mode (as SAMPLINGS, see outcome_samples()), a variance reducing mode reaches
+                     the target precision with fewer runouts in most spots
+    :param hero: index of the player whose EV must reach the target precision, if None then every player's,
+                 with importance sampling only the hero's cards are live
+    :param threads: number of threads sampling runouts, used rather than worker processes if not None
+
+    :return running_stats.SimulationReport class instance, whose means are the win probability of each
+            player, then the tie probability of each player, then the EV of each player
+    """
+    if sampling not in SAMPLINGS:
+        raise ValueError("Unknown sampling mode: {0}".format(sampling))
+
+    players = len(holes)
+    sampler = partial(outcome_samples, holes=[list(h) for h in holes], board=list(board), dead=list(dead),
+                      game=game, investments=investments, sampling=sampling, hero=hero)
+    tracked = np.arange(2 * players, 3 * players) if hero is None else [2 * players + hero]
+
+    return running_stats.simulate(sampler, precision, confidence, tracked, batch_size, min_samples, max_samples,
+                                  seed, workers, threads)
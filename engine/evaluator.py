@@ -0,0 +1,368 @@
+"""
+Author:     Chris Knowles
+File:       evaluator.py
+Version:    1.0.0
+Notes:      Fast table-driven poker hand evaluator working on integer encoded cards, a card is
+            encoded as its position in an ordered deck (see Card.index), ie. value index times
+            the number of suits plus suit index, a hand of up to seven cards is evaluated to a
+            single integer strength where a higher strength is a better hand, the hand quality
+            value (as gconsts.HAND_QUALITIES) is held in the top bits of the strength, every
+            table is indexed by a 13-bit mask of card ranks and built once on import
+"""
+# Imports
+from itertools import combinations_with_replacement
+import numpy as np
+from engine import gconsts
+from engine import tables
+
+
+# Global consts
+RANK_COUNT = len(gconsts.VALUE_NAMES)
+SUIT_COUNT = len(gconsts.SUIT_NAMES)
+CARD_COUNT = RANK_COUNT * SUIT_COUNT
+MASK_COUNT = 1 << RANK_COUNT
+QUALITY_SHIFT = 2 * RANK_COUNT
+MAJOR_SHIFT = RANK_COUNT
+ACE_RANK = RANK_COUNT - 1
+NO_CARD = -1
+
+# Key of each rank (twos first) chosen by a greedy search so that the sum of the keys of any five cards is
+# different for every multiset of five ranks, the sum indexes the five card table
+RANK_KEYS = (0, 1, 5, 22, 94, 312, 992, 2422, 5624, 12522, 19998, 43258, 79415)
+
+
+# Tables
+def _build_tables():
+    """
+    Builds the lookup tables used by the evaluator, rank bits have the twos in bit 0 through to the aces
+    in bit 12, so comparing two masks with the same number of bits set compares their cards from highest
+    down
+
+    :return tuple of numpy int32 arrays (card rank bits, card suits, popcounts, top cards tables, straight
+            table)
+    """
+    # Card values in gconsts.VALUE_NAMES order start with the ace, which is the highest rank
+    card_rank_bits = [1 << ((c // SUIT_COUNT - 1) % RANK_COUNT) for c in range(CARD_COUNT)]
+    card_suits = [c % SUIT_COUNT for c in range(CARD_COUNT)]
+
+    popcounts = [bin(m).count("1") for m in range(MASK_COUNT)]
+
+    # top_cards[k][mask] is the mask of the highest k bits set in mask
+    top_cards = [[0] * MASK_COUNT]
+    for k in range(1, 6):
+        table = [0] * MASK_COUNT
+        for m in range(1, MASK_COUNT):
+            high = 1 << (m.bit_length() - 1)
+            table[m] = high | top_cards[k - 1][m ^ high]
+        top_cards.append(table)
+
+    # straights[mask] is the bit of the top card of the highest straight in mask, or 0 if none, the
+    # ace can also play low in the five high straight (A,2,3,4,5)
+    straights = [0] * MASK_COUNT
+    wheel = (1 << ACE_RANK) | 0b1111
+    for m in range(MASK_COUNT):
+        for top in range(ACE_RANK, 3, -1):
+            run = 0b11111 << (top - 4)
+            if m & run == run:
+                straights[m] = 1 << top
+                break
+        else:
+            if m & wheel == wheel:
+                straights[m] = 1 << 3
+
+    return tuple(np.array(t, dtype=np.int32) for t in (card_rank_bits, card_suits, popcounts, top_cards, straights))
+
+
+# The scalar evaluator works on Python tuples, which are much faster to index one entry at a time
+_TABLES = tables.load("evaluator", _build_tables)
+CARD_RANK_BITS, CARD_SUITS, POPCOUNTS, TOP_CARDS, STRAIGHTS = (tables.as_tuples(t) for t in _TABLES)
+TOP1, TOP2, TOP3, TOP5 = TOP_CARDS[1], TOP_CARDS[2], TOP_CARDS[3], TOP_CARDS[5]
+ROYAL_STRAIGHT = 1 << ACE_RANK
+
+# Numpy versions of the tables, the card tables have one extra entry so that NO_CARD (-1) pads to nothing
+NP_CARD_RANK_BITS = np.array(CARD_RANK_BITS + (0,), dtype=np.int32)
+NP_CARD_RANK_KEYS = np.array([RANK_KEYS[b.bit_length() - 1] for b in CARD_RANK_BITS] + [0], dtype=np.int32)
+NP_CARD_SUITS = np.array(CARD_SUITS + (SUIT_COUNT,), dtype=np.int8)
+NP_POPCOUNTS = np.array(POPCOUNTS, dtype=np.int8)
+tables.freeze((NP_CARD_RANK_BITS, NP_CARD_RANK_KEYS, NP_CARD_SUITS, NP_POPCOUNTS))
+NP_TOP_CARDS = _TABLES[3]
+NP_STRAIGHTS = _TABLES[4]
+
+
+# Functions
+def _build_five_card_tables():
+    """
+    Builds the tables of five card hands used where the same five card parts are combined many times (eg. the
+    Omaha evaluator), one table gives the strength of five cards that are not a flush by the sum of their rank
+    keys and the other gives the strength of five suited cards by their rank mask
+
+    :return tuple of numpy int32 arrays (strengths by rank key sum, flush strengths by rank mask)
+    """
+    strengths = np.zeros(4 * RANK_KEYS[-1] + RANK_KEYS[-2] + 1, dtype=np.int32)
+
+    for ranks in combinations_with_replacement(range(RANK_COUNT), 5):
+        masks = [0] * (4 + SUIT_COUNT)
+        for r in ranks:
+            b = 1 << r
+            masks[3] |= masks[2] & b
+            masks[2] |= masks[1] & b
+            masks[1] |= masks[0] & b
+            masks[0] |= b
+
+        # Five of a kind is not possible
+        if not ranks[0] == ranks[4]:
+            strengths[sum(RANK_KEYS[r] for r in ranks)] = evaluate_masks(masks)
+
+    flush_strengths = np.zeros(MASK_COUNT, dtype=np.int32)
+    for m in range(MASK_COUNT):
+        if POPCOUNTS[m] == 5:
+            flush_strengths[m] = evaluate_masks([m, 0, 0, 0, m, 0, 0, 0])
+
+    return strengths, flush_strengths
+
+
+def hand_quality_value(strength):
+    """
+    Returns the hand quality value (as gconsts.HAND_QUALITIES) of the supplied strength
+
+    :param strength: strength as returned by evaluate()
+
+    :return hand quality value
+    """
+    return strength >> QUALITY_SHIFT
+
+
+def rank_masks(cards):
+    """
+    Builds the rank masks of the supplied cards, these are the masks of ranks held at least once, at least
+    twice, at least three times and four times plus the mask of ranks held in each suit, the masks can be
+    built incrementally so a partial hand can be shared between evaluations (see evaluate_masks())
+
+    :param cards: iterable of integer encoded cards
+
+    :return list of [seen, pairs, trips, quads, suit 0, suit 1, suit 2, suit 3] masks
+    """
+    return add_cards([0] * (4 + SUIT_COUNT), cards)
+
+
+def add_cards(masks, cards):
+    """
+    Returns new rank masks with the supplied cards added to the supplied rank masks
+
+    :param masks: rank masks as returned by rank_masks()
+    :param cards: iterable of integer encoded cards to add
+
+    :return list of rank masks
+    """
+    seen, pairs, trips, quads = masks[0], masks[1], masks[2], masks[3]
+    suits = masks[4:]
+
+    for c in cards:
+        b = CARD_RANK_BITS[c]
+        quads |= trips & b
+        trips |= pairs & b
+        pairs |= seen & b
+        seen |= b
+        suits[CARD_SUITS[c]] |= b
+
+    return [seen, pairs, trips, quads] + suits
+
+
+def evaluate_masks(masks):
+    """
+    Evaluates the strength of the hand held in the supplied rank masks, using the best five cards
+
+    :param masks: rank masks as returned by rank_masks()
+
+    :return strength of the hand, a higher strength is a better hand
+    """
+    seen, pairs, trips, quads = masks[0], masks[1], masks[2], masks[3]
+
+    # Check for flush
+    #   - Check for royal flush
+    #   - Check for straight flush
+    flush = 0
+    for suit in masks[4:]:
+        if POPCOUNTS[suit] >= 5:
+            flush = suit
+            break
+
+    if flush:
+        top = STRAIGHTS[flush]
+        if top:
+            if top == ROYAL_STRAIGHT:
+                return (gconsts.ROYAL_FLUSH_QUALITY_VALUE << QUALITY_SHIFT) | (top << MAJOR_SHIFT)
+            return (gconsts.STRAIGHT_FLUSH_QUALITY_VALUE << QUALITY_SHIFT) | (top << MAJOR_SHIFT)
+
+    if quads:
+        top = TOP1[quads]
+        return (gconsts.QUADS_QUALITY_VALUE << QUALITY_SHIFT) | (top << MAJOR_SHIFT) | TOP1[seen ^ top]
+
+    if trips:
+        top = TOP1[trips]
+        low = pairs ^ top
+        if low:
+            return (gconsts.FULL_HOUSE_QUALITY_VALUE << QUALITY_SHIFT) | (top << MAJOR_SHIFT) | TOP1[low]
+
+    if flush:
+        return (gconsts.FLUSH_QUALITY_VALUE << QUALITY_SHIFT) | (TOP5[flush] << MAJOR_SHIFT)
+
+    top = STRAIGHTS[seen]
+    if top:
+        return (gconsts.STRAIGHT_QUALITY_VALUE << QUALITY_SHIFT) | (top << MAJOR_SHIFT)
+
+    if trips:
+        top = TOP1[trips]
+        return (gconsts.TRIPS_QUALITY_VALUE << QUALITY_SHIFT) | (top << MAJOR_SHIFT) | TOP2[seen ^ top]
+
+    if pairs:
+        top = TOP2[pairs]
+        if top ^ TOP1[top]:
+            return (gconsts.TWO_PAIRS_QUALITY_VALUE << QUALITY_SHIFT) | (top << MAJOR_SHIFT) | TOP1[seen ^ top]
+        return (gconsts.PAIR_QUALITY_VALUE << QUALITY_SHIFT) | (top << MAJOR_SHIFT) | TOP3[seen ^ top]
+
+    return (gconsts.HIGH_CARD_QUALITY_VALUE << QUALITY_SHIFT) | (TOP5[seen] << MAJOR_SHIFT)
+
+
+def evaluate(cards):
+    """
+    Evaluates the strength of the hand made of the supplied cards (up to seven), using the best five cards
+
+    :param cards: iterable of integer encoded cards
+
+    :return strength of the hand, a higher strength is a better hand
+    """
+    seen = pairs = trips = quads = 0
+    suits = [0, 0, 0, 0]
+
+    for c in cards:
+        b = CARD_RANK_BITS[c]
+        quads |= trips & b
+        trips |= pairs & b
+        pairs |= seen & b
+        seen |= b
+        suits[CARD_SUITS[c]] |= b
+
+    return evaluate_masks([seen, pairs, trips, quads] + suits)
+
+
+def evaluate_hand(hand):
+    """
+    Evaluates the strength of the supplied hand of cards
+
+    :param hand: Hand class instance to evaluate
+
+    :return strength of the hand, a higher strength is a better hand
+    """
+    return evaluate([c.index for c in hand.cards])
+
+
+def evaluate_batch(cards):
+    """
+    Evaluates the strength of every hand in the supplied array of hands, the whole batch is evaluated with
+    numpy array operations so there is no Python loop over the hands
+
+    :param cards: numpy integer array of shape (hands, cards per hand) of integer encoded cards, a hand
+                  with fewer cards is padded with NO_CARD
+
+    :return numpy int64 array of the strength of each hand
+    """
+    return evaluate_masks_batch(*rank_masks_batch(cards))
+
+
+def rank_masks_batch(cards):
+    """
+    Builds the rank masks (see rank_masks()) of every hand in the supplied array of hands
+
+    :param cards: numpy integer array of shape (hands, cards per hand) of integer encoded cards, padded with
+                  NO_CARD
+
+    :return tuple of numpy int32 arrays (seen, pairs, trips, quads, suits), each of one element per hand
+            except suits which is of shape (suits, hands)
+    """
+    hands = len(cards)
+    empty = (np.zeros(hands, dtype=np.int32), np.zeros(hands, dtype=np.int32), np.zeros(hands, dtype=np.int32),
+             np.zeros(hands, dtype=np.int32), np.zeros((SUIT_COUNT, hands), dtype=np.int32))
+
+    return add_cards_batch(empty, cards)
+
+
+def add_cards_batch(masks, cards):
+    """
+    Returns new rank masks with the cards of each row of the supplied array added to the rank masks of the
+    same row, so the masks of a shared part of many hands can be built once and then reused
+
+    :param masks: tuple of rank mask arrays as returned by rank_masks_batch()
+    :param cards: numpy integer array of shape (hands, cards to add) of integer encoded cards, padded with
+                  NO_CARD
+
+    :return tuple of numpy int32 arrays (seen, pairs, trips, quads, suits)
+    """
+    cards = np.asarray(cards)
+    seen, pairs, trips, quads = [m.copy() for m in masks[:4]]
+    suits = np.vstack((masks[4], np.zeros((1, len(seen)), dtype=np.int32)))
+    rows = np.arange(len(seen))
+
+    for i in range(cards.shape[1]):
+        b = NP_CARD_RANK_BITS[cards[:, i]]
+        quads |= trips & b
+        trips |= pairs & b
+        pairs |= seen & b
+        seen |= b
+        suits[NP_CARD_SUITS[cards[:, i]], rows] |= b
+
+    return seen, pairs, trips, quads, suits[:SUIT_COUNT]
+
+
+def evaluate_masks_batch(seen, pairs, trips, quads, suits):
+    """
+    Evaluates the strength of every hand held in the supplied arrays of rank masks (see rank_masks())
+
+    :param seen: numpy int32 array of the mask of ranks held at least once in each hand
+    :param pairs: numpy int32 array of the mask of ranks held at least twice in each hand
+    :param trips: numpy int32 array of the mask of ranks held at least three times in each hand
+    :param quads: numpy int32 array of the mask of ranks held four times in each hand
+    :param suits: numpy int32 array of shape (suits, hands) of the mask of ranks held in each suit
+
+    :return numpy int64 array of the strength of each hand
+    """
+    flush = np.zeros_like(seen)
+    for suit in suits[::-1]:
+        flush = np.where(NP_POPCOUNTS[suit] >= 5, suit, flush)
+
+    top1, top2, top3, top5 = NP_TOP_CARDS[1], NP_TOP_CARDS[2], NP_TOP_CARDS[3], NP_TOP_CARDS[5]
+
+    flush_straight = NP_STRAIGHTS[flush]
+    straight = NP_STRAIGHTS[seen]
+    quad = top1[quads]
+    trip = top1[trips]
+    full_low = top1[pairs & ~trip]
+    top_pairs = top2[pairs]
+    pair_count = NP_POPCOUNTS[pairs]
+
+    major = np.select(
+        [flush_straight > 0, quads > 0, (trips > 0) & (full_low > 0), flush > 0, straight > 0, trips > 0,
+         pair_count > 0],
+        [flush_straight, quad, trip, top5[flush], straight, trip, top_pairs],
+        top5[seen])
+
+    minor = np.select(
+        [flush_straight > 0, quads > 0, (trips > 0) & (full_low > 0), flush > 0, straight > 0, trips > 0,
+         pair_count > 1, pair_count > 0],
+        [0, top1[seen & ~quad], full_low, 0, 0, top2[seen & ~trip], top1[seen & ~top_pairs],
+         top3[seen & ~top_pairs]],
+        0)
+
+    quality = np.select(
+        [flush_straight == ROYAL_STRAIGHT, flush_straight > 0, quads > 0, (trips > 0) & (full_low > 0),
+         flush > 0, straight > 0, trips > 0, pair_count > 1, pair_count > 0],
+        [gconsts.ROYAL_FLUSH_QUALITY_VALUE, gconsts.STRAIGHT_FLUSH_QUALITY_VALUE, gconsts.QUADS_QUALITY_VALUE,
+         gconsts.FULL_HOUSE_QUALITY_VALUE, gconsts.FLUSH_QUALITY_VALUE, gconsts.STRAIGHT_QUALITY_VALUE,
+         gconsts.TRIPS_QUALITY_VALUE, gconsts.TWO_PAIRS_QUALITY_VALUE, gconsts.PAIR_QUALITY_VALUE],
+        gconsts.HIGH_CARD_QUALITY_VALUE)
+
+    return ((quality.astype(np.int64) << QUALITY_SHIFT) | (major.astype(np.int64) << MAJOR_SHIFT) |
+            minor.astype(np.int64))
+
+
+NP_FIVE_CARD_STRENGTHS, NP_FLUSH_STRENGTHS = tables.load("evaluator.five_card", _build_five_card_tables)
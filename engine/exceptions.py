@@ -16,3 +16,13 @@ class InsufficientCardsError(Exception):
     """
     def __init__(self, msg):
         super().__init__(msg)
+
+
+class IllegalActionError(Exception):
+    """
+    Exception class to indicate a player has attempted a betting action that is not allowed
+    by the rules in the current state of the betting - class variables:
+        none
+    """
+    def __init__(self, msg):
+        super().__init__(msg)
@@ -28,3 +28,14 @@ JOKER_NAMES = ("X", "Y", "Z")
 HAND_WINS = 1
 HAND_TIES = 0
 HAND_LOSE = -1
+ACTIONS = ("Fold", "CheckCall", "BetRaise")
+FOLD_ACTION_VALUE = 0
+CHECK_CALL_ACTION_VALUE = 1
+BET_RAISE_ACTION_VALUE = 2
+NO_PLAYER_INDEX = -1
+GAMES = ("Holdem", "Omaha", "Holdem Hi/Lo", "Omaha Hi/Lo")
+HOLDEM_GAME_VALUE = 0
+OMAHA_GAME_VALUE = 1
+HOLDEM_HI_LO_GAME_VALUE = 2
+OMAHA_HI_LO_GAME_VALUE = 3
+HI_LO_GAME_VALUES = (HOLDEM_HI_LO_GAME_VALUE, OMAHA_HI_LO_GAME_VALUE)
@@ -0,0 +1,284 @@
+"""
+Author:     Chris Knowles
+File:       hand_strength.py
+Version:    1.0.0
+Notes:      Hand strength (HS) and hand potential (PPot / NPot) calculator for bot decisions, the
+            strength is the chance of currently being ahead of a single random opponent hand and the
+            potentials are the chances of moving from behind to ahead (PPot) or from ahead to behind
+            (NPot) by the river, every opponent hand and board is evaluated with the batch evaluator
+            and results are cached by a suit-isomorphic key so equivalent spots are only worked out once,
+            one calculator can be shared by several threads as its cache is locked
+"""
+# Imports
+from collections import OrderedDict
+from math import comb
+import threading
+import numpy as np
+from engine import evaluator
+from engine import preflop
+from engine.exceptions import InsufficientCardsError
+
+
+# Global consts
+AHEAD = 0
+TIED = 1
+BEHIND = 2
+
+
+# Classes
+class HandStrength:
+    """
+    Hand strength and potential of a hand against a single random opponent - class variables:
+        none
+    """
+    def __init__(self, hs, ppot, npot):
+        """
+        Initialiser - instance variables:
+            __hs: chance of currently being ahead of a random hand (ties count half), property with read only
+                  access
+            __ppot: positive potential, chance of being behind now but ahead by the river (ties count half),
+                    property with read only access
+            __npot: negative potential, chance of being ahead now but behind by the river (ties count half),
+                    property with read only access
+
+        :param hs: hand strength
+        :param ppot: positive potential
+        :param npot: negative potential
+        """
+        self.__hs = hs
+        self.__ppot = ppot
+        self.__npot = npot
+
+    @property
+    def hs(self):
+        return self.__hs
+
+    @property
+    def ppot(self):
+        return self.__ppot
+
+    @property
+    def npot(self):
+        return self.__npot
+
+    @property
+    def ehs(self):
+        # Effective hand strength, chance of being ahead by the river taking the potentials into account
+        return self.hs * (1 - self.npot) + (1 - self.hs) * self.ppot
+
+    def __str__(self):
+        """
+        To string method
+
+        :return string representation of this hand strength instance
+        """
+        return "HS:{0:.4f}:PPot:{1:.4f}:NPot:{2:.4f}:EHS:{3:.4f}".format(self.hs, self.ppot, self.npot, self.ehs)
+
+
+class HandStrengthCalculator:
+    """
+    Calculates and caches the hand strength and potential of hole cards on a board - class variables:
+        none
+    """
+    def __init__(self, cache_size=100000, max_evaluations=100000, seed=None):
+        """
+        Initialiser - instance variables:
+            __cache: results by suit-isomorphic key, as OrderedDict used as a least recently used cache
+            __lock: lock held while the cache or its counts are read or changed, as threading.Lock
+            __cache_size: maximum number of results held in the cache, property with read only access
+            __max_evaluations: largest number of (opponent hand, board) pairs enumerated for the potentials,
+                               if there are more (ie. on the flop) this many pairs are sampled at random,
+                               property with read only access
+            __rng: numpy random generator used when sampling
+            __hits: number of calculations answered from the cache, property with read only access
+            __misses: number of calculations that had to be worked out, property with read only access
+
+        :param cache_size: maximum number of results held in the cache
+        :param max_evaluations: largest number of pairs enumerated for the potentials before sampling
+        :param seed: seed of the random generator used when sampling
+        """
+        self.__cache = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__cache_size = cache_size
+        self.__max_evaluations = max_evaluations
+        self.__rng = np.random.default_rng(seed)
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def cache_size(self):
+        return self.__cache_size
+
+    @property
+    def max_evaluations(self):
+        return self.__max_evaluations
+
+    @property
+    def hits(self):
+        return self.__hits
+
+    @property
+    def misses(self):
+        return self.__misses
+
+    def clear_cache(self):
+        """
+        Empties the cache of results
+
+        :return nothing
+        """
+        with self.__lock:
+            self.__cache.clear()
+
+    @staticmethod
+    def canonical_key(hole_cards, board):
+        """
+        Returns the suit-isomorphic key of the supplied hole cards and board, spots that only differ by a
+        renaming of the suits (eg. A♠K♠ on Q♠7♥2♦ and A♥K♥ on Q♥7♠2♣) have the same key, the key is the
+        sorted tuple of the (hole rank mask, board rank mask) of every suit
+
+        :param hole_cards: integer encoded hole cards
+        :param board: integer encoded board cards
+
+        :return hashable key
+        """
+        hole_masks = [0] * evaluator.SUIT_COUNT
+        board_masks = [0] * evaluator.SUIT_COUNT
+
+        for c in hole_cards:
+            hole_masks[evaluator.CARD_SUITS[c]] |= evaluator.CARD_RANK_BITS[c]
+        for c in board:
+            board_masks[evaluator.CARD_SUITS[c]] |= evaluator.CARD_RANK_BITS[c]
+
+        return tuple(sorted(zip(hole_masks, board_masks)))
+
+    def calculate_hand(self, hand, board):
+        """
+        Calculates the hand strength and potential of the hole cards of the supplied hand on the supplied board
+
+        :param hand: Hand class instance, its hole cards are used
+        :param board: board cards, as list of Card class (eg. Table.board)
+
+        :return HandStrength instance
+        """
+        return self.calculate([c.index for c in hand.hole_cards], [c.index for c in board])
+
+    def calculate(self, hole_cards, board):
+        """
+        Calculates the hand strength and potential of the supplied hole cards on the supplied board, the result
+        is taken from the cache if an equivalent spot has already been calculated
+
+        :param hole_cards: two integer encoded hole cards
+        :param board: three to five integer encoded board cards
+
+        :return HandStrength instance
+
+        :exception InsufficientCardsError: thrown when the board has fewer than three cards
+        """
+        if len(board) < 3:
+            msg = "Not enough board cards for hand strength: available={0} required=3".format(len(board))
+            raise InsufficientCardsError(msg)
+
+        key = self.canonical_key(hole_cards, board)
+        with self.__lock:
+            result = self.__cache.get(key)
+            if result is not None:
+                self.__hits += 1
+                self.__cache.move_to_end(key)
+                return result
+            self.__misses += 1
+
+        # Worked out without holding the lock, if two threads miss on the same spot both work it out
+        result = self.__calculate(list(hole_cards), list(board))
+
+        with self.__lock:
+            self.__cache[key] = result
+            if len(self.__cache) > self.__cache_size:
+                self.__cache.popitem(last=False)
+
+        return result
+
+    def __calculate(self, hole_cards, board):
+        """
+        Works out the hand strength and potential of the supplied hole cards on the supplied board
+
+        :param hole_cards: two integer encoded hole cards
+        :param board: three to five integer encoded board cards
+
+        :return HandStrength instance
+        """
+        known = hole_cards + board
+        known_mask = sum(1 << c for c in known)
+        remaining = np.array([c for c in range(evaluator.CARD_COUNT) if not known_mask >> c & 1], dtype=np.int8)
+
+        # Every opponent hand from the remaining cards and where the hero stands against it now
+        opponents = remaining[np.array(np.triu_indices(len(remaining), k=1)).T]
+        board_row = np.array(board, dtype=np.int8)
+        hero_now = evaluator.evaluate(known)
+        opponent_now = evaluator.evaluate_batch(np.hstack((opponents, np.tile(board_row, (len(opponents), 1)))))
+        now = self.__states(hero_now, opponent_now)
+
+        counts = np.bincount(now, minlength=3)
+        hs = (counts[AHEAD] + counts[TIED] / 2) / len(opponents)
+
+        to_come = preflop.BOARD_SIZE - len(board)
+        if not to_come:
+            return HandStrength(hs, 0.0, 0.0)
+
+        # Every (or a sample of) opponent hand and rest of the board, and where the hero stands by the river
+        opponent_rows, boards = self.__runouts(opponents, remaining, to_come)
+        hero_cards = np.tile(np.array(known, dtype=np.int8), (len(boards), 1))
+        hero_future = evaluator.evaluate_batch(np.hstack((hero_cards, boards)))
+        opponent_cards = np.hstack((opponents[opponent_rows], np.tile(board_row, (len(boards), 1)), boards))
+        future = self.__states(hero_future, evaluator.evaluate_batch(opponent_cards))
+
+        # Transition counts from the state now to the state by the river
+        transitions = np.bincount(now[opponent_rows] * 3 + future, minlength=9).reshape(3, 3)
+        totals = transitions.sum(axis=1)
+
+        ppot_den = totals[BEHIND] + totals[TIED] / 2
+        npot_den = totals[AHEAD] + totals[TIED] / 2
+        ppot = ((transitions[BEHIND, AHEAD] + transitions[BEHIND, TIED] / 2 + transitions[TIED, AHEAD] / 2) /
+                ppot_den if ppot_den else 0.0)
+        npot = ((transitions[AHEAD, BEHIND] + transitions[TIED, BEHIND] / 2 + transitions[AHEAD, TIED] / 2) /
+                npot_den if npot_den else 0.0)
+
+        return HandStrength(float(hs), float(ppot), float(npot))
+
+    def __runouts(self, opponents, remaining, to_come):
+        """
+        Returns every pair of opponent hand and rest of the board that do not share a card, or a random sample
+        of them if there are more than the maximum number of evaluations
+
+        :param opponents: numpy array of shape (opponent hands, 2) of opponent hole cards
+        :param remaining: numpy array of the cards not held by the hero or on the board
+        :param to_come: number of board cards still to come
+
+        :return tuple of (numpy array of the row in opponents of each pair, numpy array of shape (pairs, to_come)
+                of the rest of the board of each pair)
+        """
+        runout_count = len(opponents) * comb(len(remaining) - 2, to_come)
+
+        if runout_count > self.__max_evaluations:
+            rows = self.__rng.integers(len(opponents), size=self.__max_evaluations)
+            known = np.setdiff1d(np.arange(evaluator.CARD_COUNT), remaining).astype(np.int8)
+            dead = np.hstack((opponents[rows], np.tile(known, (len(rows), 1))))
+
+            return rows, preflop.deal_boards(dead, to_come, self.__rng)
+
+        if to_come == 1:
+            boards = remaining[:, None]
+        else:
+            boards = remaining[np.array(np.triu_indices(len(remaining), k=1)).T]
+
+        opponent_masks = (np.int64(1) << opponents[:, 0].astype(np.int64)) | \
+                         (np.int64(1) << opponents[:, 1].astype(np.int64))
+        board_masks = np.bitwise_or.reduce(np.int64(1) << boards.astype(np.int64), axis=1)
+        rows, columns = np.nonzero((opponent_masks[:, None] & board_masks[None, :]) == 0)
+
+        return rows, boards[columns]
+
+    @staticmethod
+    def __states(hero, opponents):
+        # Whether the hero is ahead of, tied with or behind each opponent
+        return np.where(hero > opponents, AHEAD, np.where(hero == opponents, TIED, BEHIND))
@@ -0,0 +1,207 @@
+"""
+Author:     Chris Knowles
+File:       icm.py
+Version:    1.0.0
+Notes:      Independent Chip Model (ICM) tournament equity, under the Malmuth-Harville model a
+            player finishes first with probability in proportion to their stack and each later
+            place is decided in the same way among the players left, the naive recursion over
+            every finishing order grows factorially with the number of players, here the chance
+            of every set of players taking the top places is built up one place at a time over
+            subsets (a subset dynamic programme), so only the sets of players that can hold the
+            paid places are visited and a ten player final table is exact in milliseconds, for a
+            larger field finishing orders are sampled instead, drawing a finishing order is an
+            exponential race (each player finishes at an exponential time of rate their stack,
+            the first to finish takes first place) so whole batches are drawn with numpy
+"""
+# Imports
+from math import comb
+import numpy as np
+
+
+# Global consts
+DEFAULT_EXACT_LIMIT = 2000000
+# Sets of players are bit masks held in 64-bit integers
+MAX_EXACT_PLAYERS = 62
+DEFAULT_SAMPLES = 200000
+SAMPLE_CHUNK_SIZE = 10000
+
+
+# Functions
+def finish_probabilities(stacks, places=None):
+    """
+    Returns the exact chance of every player finishing in each of the top places
+
+    :param stacks: chips of each player, players with no chips have already busted and take no place
+    :param places: number of top places, if None then every place
+
+    :return numpy float64 array of shape (players, places)
+
+    :exception ValueError: thrown when there are more than MAX_EXACT_PLAYERS players with chips
+    """
+    stacks = np.asarray(stacks, dtype=np.float64)
+    player_count = len(stacks)
+    places = player_count if places is None else min(places, player_count)
+    live = np.flatnonzero(stacks > 0)
+    live_stacks = stacks[live]
+    result = np.zeros((player_count, places))
+
+    if len(live) > MAX_EXACT_PLAYERS:
+        msg_str = "Too many players for exact ICM: players={0} maximum={1}"
+        raise ValueError(msg_str.format(len(live), MAX_EXACT_PLAYERS))
+
+    if not len(live):
+        return result
+
+    # Each level holds every set of players (as a bit mask over the live players) that can have taken the top
+    # places so far, with the chance that exactly those players took them in some order
+    level = np.zeros(1, dtype=np.int64)
+    chance = np.ones(1)
+    shifts = np.arange(len(live), dtype=np.int64)
+    total = live_stacks.sum()
+
+    for place in range(min(places, len(live))):
+        bits = (level[:, None] >> shifts) & 1
+        remaining = total - bits @ live_stacks
+        next_masks = []
+        next_chances = []
+
+        for i in range(len(live)):
+            free = bits[:, i] == 0
+            taken = chance[free] * (live_stacks[i] / remaining[free])
+            result[live[i], place] = taken.sum()
+            next_masks.append(level[free] | (1 << i))
+            next_chances.append(taken)
+
+        if place + 1 == min(places, len(live)):
+            break
+
+        # The same set of players is reached in as many ways as it has players, their chances are summed
+        level, inverse = np.unique(np.concatenate(next_masks), return_inverse=True)
+        chance = np.bincount(inverse, weights=np.concatenate(next_chances))
+
+    return result
+
+
+def subset_count(player_count, places):
+    """
+    Returns the number of sets of players visited by the exact calculation, a measure of its cost
+
+    :param player_count: number of players with chips
+    :param places: number of paid places
+
+    :return integer
+    """
+    return sum(comb(player_count, k) for k in range(min(places, player_count) + 1))
+
+
+def sample_finish_probabilities(stacks, places=None, samples=DEFAULT_SAMPLES, seed=None):
+    """
+    Estimates the chance of every player finishing in each of the top places by sampling finishing orders
+
+    :param stacks: chips of each player, players with no chips have already busted and take no place
+    :param places: number of top places, if None then every place
+    :param samples: number of finishing orders sampled
+    :param seed: seed of the random generator
+
+    :return numpy float64 array of shape (players, places)
+    """
+    stacks = np.asarray(stacks, dtype=np.float64)
+    player_count = len(stacks)
+    places = player_count if places is None else min(places, player_count)
+    live = np.flatnonzero(stacks > 0)
+    places_taken = min(places, len(live))
+    counts = np.zeros((player_count, places))
+    rng = np.random.default_rng(seed)
+
+    if not places_taken:
+        return counts
+
+    for start in range(0, samples, SAMPLE_CHUNK_SIZE):
+        size = min(SAMPLE_CHUNK_SIZE, samples - start)
+
+        # The player with the smallest finishing time takes first place, the next smallest second and so on
+        times = rng.standard_exponential((size, len(live))) / stacks[live]
+        if places_taken < len(live):
+            top = np.argpartition(times, places_taken - 1, axis=1)[:, :places_taken]
+            order = np.take_along_axis(top, np.argsort(np.take_along_axis(times, top, axis=1), axis=1), axis=1)
+        else:
+            order = np.argsort(times, axis=1)
+
+        for place in range(places_taken):
+            counts[:, place] += np.bincount(live[order[:, place]], minlength=player_count)
+
+    return counts / samples
+
+
+def equities(stacks, payouts, exact_limit=DEFAULT_EXACT_LIMIT, samples=DEFAULT_SAMPLES, seed=None):
+    """
+    Returns the tournament equity of every player, worked out exactly unless the field is too large (too many
+    sets of players to visit or more than MAX_EXACT_PLAYERS players) in which case it is estimated by sampling
+    finishing orders
+
+    :param stacks: chips of each player
+    :param payouts: prize of each paid place, first place first
+    :param exact_limit: largest number of sets of players (see subset_count()) visited exactly
+    :param samples: number of finishing orders sampled when the field is too large
+    :param seed: seed of the random generator used when sampling
+
+    :return numpy float64 array of the equity of each player
+    """
+    payouts = np.asarray(payouts, dtype=np.float64)
+    live_count = int(np.count_nonzero(np.asarray(stacks) > 0))
+
+    if live_count <= MAX_EXACT_PLAYERS and subset_count(live_count, len(payouts)) <= exact_limit:
+        probabilities = finish_probabilities(stacks, len(payouts))
+    else:
+        probabilities = sample_finish_probabilities(stacks, len(payouts), samples, seed)
+
+    return probabilities @ payouts[:probabilities.shape[1]]
+
+
+def equity_changes(stacks, payouts, deltas, **kwargs):
+    """
+    Returns the change in the tournament equity of every player for each of the supplied changes in chips,
+    eg. the outcomes of an all-in, for decisions that take the payouts into account
+
+    :param stacks: chips of each player
+    :param payouts: prize of each paid place, first place first
+    :param deltas: change in chips of each player for each outcome, as sequence of sequences indexed by player
+    :param kwargs: any of the keyword parameters of equities()
+
+    :return numpy float64 array of shape (outcomes, players)
+    """
+    stacks = np.asarray(stacks, dtype=np.float64)
+    before = equities(stacks, payouts, **kwargs)
+
+    return np.array([equities(np.maximum(stacks + np.asarray(delta), 0), payouts, **kwargs) - before
+                     for delta in deltas])
+
+
+def table_equities(table, payouts, **kwargs):
+    """
+    Returns the tournament equity of every player at the supplied table, eg. a final table, from their funds
+
+    :param table: Table class instance
+    :param payouts: prize of each paid place, first place first
+    :param kwargs: any of the keyword parameters of equities()
+
+    :return numpy float64 array of the equity of each player, in the order of Table.players
+    """
+    return equities([p.funds for p in table.players], payouts, **kwargs)
+
+
+def player_equities(players, payouts, **kwargs):
+    """
+    Returns the tournament equity of every one of the supplied players by ident, eg. every player still in a
+    tournament (Tournament.players) across all its tables
+
+    :param players: iterable of Player class instances
+    :param payouts: prize of each paid place, first place first
+    :param kwargs: any of the keyword parameters of equities()
+
+    :return dict of player ident to equity
+    """
+    players = list(players)
+    result = equities([p.funds for p in players], payouts, **kwargs)
+
+    return {p.ident: float(e) for p, e in zip(players, result)}
@@ -0,0 +1,291 @@
+"""
+Author:     Chris Knowles
+File:       lowball.py
+Version:    1.0.0
+Notes:      Table-driven low hand evaluation for lowball and hi/lo split games, ace-to-five lows
+            (aces low, straights and flushes ignored) with the eight-or-better qualifier and
+            deuce-to-seven lows (aces high, straights and flushes count against the hand), a five
+            card part is looked up by the sum of its rank keys (see evaluator.RANK_KEYS), the same
+            key the high five card table uses, so hi/lo evaluation finds each key once and looks it
+            up in both tables, like the high evaluator a higher low strength is a better low hand
+            and a low strength of NO_LOW means the hand has no qualifying low
+"""
+# Imports
+from itertools import combinations, combinations_with_replacement
+import numpy as np
+from engine import evaluator
+from engine import gconsts
+from engine import omaha
+from engine import tables
+
+
+# Global consts
+NO_LOW = 0
+LOW_SIZE = 5
+EIGHT_RANK = 6
+
+# Ace-to-five raw values are base 13 numbers of a category (from no pair up to quads) followed by the ranks
+# ordered by count then rank, all with aces low, a smaller raw value is a better low
+ACE_TO_FIVE_CATEGORIES = {(1, 1, 1, 1, 1): 0, (2, 1, 1, 1): 1, (2, 2, 1): 2, (3, 1, 1): 3, (3, 2): 4, (4, 1): 5}
+ACE_TO_FIVE_SCALE = (len(ACE_TO_FIVE_CATEGORIES) + 1) * evaluator.RANK_COUNT ** LOW_SIZE
+
+# Deuce-to-seven raw values are high strengths (see evaluator.evaluate()), so are below 1 << 30
+DEUCE_TO_SEVEN_SCALE = 1 << 30
+
+
+# Tables
+def _ace_to_five_raw(ranks):
+    """
+    Returns the ace-to-five raw value of five cards of the supplied ranks, a smaller value is a better low
+
+    :param ranks: five ranks (twos as 0 through to aces as 12)
+
+    :return raw value
+    """
+    # Aces play low, so move them below the twos
+    low_ranks = [(r + 1) % evaluator.RANK_COUNT for r in ranks]
+    counts = {r: low_ranks.count(r) for r in set(low_ranks)}
+    ordered = sorted(counts, key=lambda r: (counts[r], r), reverse=True)
+
+    raw = ACE_TO_FIVE_CATEGORIES[tuple(counts[r] for r in ordered)]
+    for r in ordered:
+        for _ in range(counts[r]):
+            raw = raw * evaluator.RANK_COUNT + r
+
+    return raw
+
+
+def _deuce_to_seven_raw(masks):
+    """
+    Returns the deuce-to-seven raw value of the five cards held in the supplied rank masks, ie. their high
+    strength except that the five high straight (A,2,3,4,5) is not a straight, a smaller value is a better low
+
+    :param masks: rank masks as returned by evaluator.rank_masks()
+
+    :return raw value
+    """
+    strength = evaluator.evaluate_masks(masks)
+    quality = evaluator.hand_quality_value(strength)
+    five_high = ((strength >> evaluator.MAJOR_SHIFT) & (evaluator.MASK_COUNT - 1)) == 1 << 3
+
+    if five_high and quality == gconsts.STRAIGHT_QUALITY_VALUE:
+        quality = gconsts.HIGH_CARD_QUALITY_VALUE
+        strength = (quality << evaluator.QUALITY_SHIFT) | (masks[0] << evaluator.MAJOR_SHIFT)
+    elif five_high and quality == gconsts.STRAIGHT_FLUSH_QUALITY_VALUE:
+        quality = gconsts.FLUSH_QUALITY_VALUE
+        strength = (quality << evaluator.QUALITY_SHIFT) | (masks[0] << evaluator.MAJOR_SHIFT)
+
+    return strength
+
+
+def _build_low_tables():
+    """
+    Builds the low hand tables, every table except the deuce-to-seven flush table is indexed by the sum of the
+    rank keys of five cards (as evaluator.NP_FIVE_CARD_STRENGTHS), the deuce-to-seven flush table is indexed
+    by the rank mask of five suited cards (as evaluator.NP_FLUSH_STRENGTHS)
+
+    :return tuple of numpy int32 arrays (ace-to-five, eight-or-better, deuce-to-seven, deuce-to-seven flush)
+    """
+    size = len(evaluator.NP_FIVE_CARD_STRENGTHS)
+    ace_to_five = np.zeros(size, dtype=np.int32)
+    eight_or_better = np.zeros(size, dtype=np.int32)
+    deuce_to_seven = np.zeros(size, dtype=np.int32)
+
+    for ranks in combinations_with_replacement(range(evaluator.RANK_COUNT), LOW_SIZE):
+        # Five of a kind is not possible
+        if ranks[0] == ranks[4]:
+            continue
+
+        key = sum(evaluator.RANK_KEYS[r] for r in ranks)
+        low = ACE_TO_FIVE_SCALE - _ace_to_five_raw(ranks)
+        ace_to_five[key] = low
+
+        # Qualifies for eight-or-better with five different ranks all eight or lower (aces count low)
+        if len(set(ranks)) == LOW_SIZE and all(r <= EIGHT_RANK or r == evaluator.ACE_RANK for r in ranks):
+            eight_or_better[key] = low
+
+        # Alternate two suits so that the cards are never a flush
+        masks = evaluator.rank_masks(evaluator.SUIT_COUNT * ((r + 1) % evaluator.RANK_COUNT) + i % 2
+                                     for i, r in enumerate(ranks))
+        deuce_to_seven[key] = DEUCE_TO_SEVEN_SCALE - _deuce_to_seven_raw(masks)
+
+    deuce_to_seven_flush = np.zeros(evaluator.MASK_COUNT, dtype=np.int32)
+    for m in range(evaluator.MASK_COUNT):
+        if evaluator.POPCOUNTS[m] == LOW_SIZE:
+            deuce_to_seven_flush[m] = DEUCE_TO_SEVEN_SCALE - _deuce_to_seven_raw([m, 0, 0, 0, m, 0, 0, 0])
+
+    return ace_to_five, eight_or_better, deuce_to_seven, deuce_to_seven_flush
+
+
+NP_ACE_TO_FIVE_STRENGTHS, NP_EIGHT_OR_BETTER_STRENGTHS, NP_DEUCE_TO_SEVEN_STRENGTHS, \
+    NP_DEUCE_TO_SEVEN_FLUSH_STRENGTHS = tables.load("lowball", _build_low_tables)
+
+
+# Functions
+def five_card_parts(card_count):
+    """
+    Returns the positions of every five card part of a hand of the supplied number of cards
+
+    :param card_count: number of cards in the hand (at least five)
+
+    :return numpy int8 array of shape (parts, 5)
+    """
+    return np.array(list(combinations(range(card_count), LOW_SIZE)), dtype=np.int8)
+
+
+def five_card_keys(cards):
+    """
+    Returns the rank key sum, rank mask and suit (or evaluator.SUIT_COUNT if not suited) of every five card part
+    of every one of the supplied hands, these index both the high and the low five card tables
+
+    :param cards: numpy integer array of shape (hands, cards per hand) of integer encoded cards
+
+    :return tuple of numpy int32 arrays of shape (hands, parts)
+    """
+    cards = np.asarray(cards)
+    parts = cards[:, five_card_parts(cards.shape[1])]
+    keys = evaluator.NP_CARD_RANK_KEYS[parts].sum(axis=-1, dtype=np.int32)
+    masks = np.bitwise_or.reduce(evaluator.NP_CARD_RANK_BITS[parts], axis=-1)
+    suits = evaluator.NP_CARD_SUITS[parts].astype(np.int32)
+    suits = np.where((suits == suits[..., :1]).all(axis=-1), suits[..., 0], evaluator.SUIT_COUNT)
+
+    return keys, masks, suits
+
+
+def evaluate_ace_to_five_batch(cards, eight_or_better=False):
+    """
+    Evaluates the best ace-to-five low of every one of the supplied hands, using the best five cards
+
+    :param cards: numpy integer array of shape (hands, cards per hand) of integer encoded cards (at least five)
+    :param eight_or_better: True if a low only qualifies with five different ranks of eight or lower
+
+    :return numpy int64 array of the low strength of each hand, NO_LOW if it has no qualifying low
+    """
+    keys, _, _ = five_card_keys(cards)
+    table = NP_EIGHT_OR_BETTER_STRENGTHS if eight_or_better else NP_ACE_TO_FIVE_STRENGTHS
+
+    return table[keys].max(axis=1).astype(np.int64)
+
+
+def evaluate_deuce_to_seven_batch(cards):
+    """
+    Evaluates the best deuce-to-seven low of every one of the supplied hands, using the best five cards
+
+    :param cards: numpy integer array of shape (hands, cards per hand) of integer encoded cards (at least five)
+
+    :return numpy int64 array of the low strength of each hand
+    """
+    keys, masks, suits = five_card_keys(cards)
+    strengths = np.where(suits < evaluator.SUIT_COUNT, NP_DEUCE_TO_SEVEN_FLUSH_STRENGTHS[masks],
+                         NP_DEUCE_TO_SEVEN_STRENGTHS[keys])
+
+    return strengths.max(axis=1).astype(np.int64)
+
+
+def evaluate_hi_lo_batch(cards):
+    """
+    Evaluates the best high hand and the best eight-or-better low of every one of the supplied hands in one
+    pass, the key of each five card part is found once and looked up in both the high and the low tables
+
+    :param cards: numpy integer array of shape (hands, cards per hand) of integer encoded cards (at least five)
+
+    :return tuple of numpy int64 arrays (high strength of each hand, low strength of each hand)
+    """
+    keys, masks, suits = five_card_keys(cards)
+    high = np.where(suits < evaluator.SUIT_COUNT, evaluator.NP_FLUSH_STRENGTHS[masks],
+                    evaluator.NP_FIVE_CARD_STRENGTHS[keys])
+
+    return high.max(axis=1).astype(np.int64), NP_EIGHT_OR_BETTER_STRENGTHS[keys].max(axis=1).astype(np.int64)
+
+
+def evaluate_ace_to_five(cards, eight_or_better=False):
+    """
+    Evaluates the best ace-to-five low of the supplied cards (five to seven)
+
+    :param cards: integer encoded cards
+    :param eight_or_better: True if a low only qualifies with five different ranks of eight or lower
+
+    :return low strength, NO_LOW if there is no qualifying low
+    """
+    return int(evaluate_ace_to_five_batch(np.array([cards]), eight_or_better)[0])
+
+
+def evaluate_deuce_to_seven(cards):
+    """
+    Evaluates the best deuce-to-seven low of the supplied cards (five to seven)
+
+    :param cards: integer encoded cards
+
+    :return low strength
+    """
+    return int(evaluate_deuce_to_seven_batch(np.array([cards]))[0])
+
+
+def evaluate_hand_low(hand, deuce_to_seven=False, eight_or_better=False):
+    """
+    Evaluates the best low of the supplied hand of cards
+
+    :param hand: Hand class instance to evaluate, it must hold at least five cards
+    :param deuce_to_seven: True for a deuce-to-seven low, False for an ace-to-five low
+    :param eight_or_better: True if an ace-to-five low only qualifies as eight-or-better
+
+    :return low strength
+    """
+    cards = [c.index for c in hand.cards]
+
+    return evaluate_deuce_to_seven(cards) if deuce_to_seven else evaluate_ace_to_five(cards, eight_or_better)
+
+
+def hi_lo_showdown(holes, boards):
+    """
+    Evaluates the high hand and the eight-or-better low of every player on every one of the supplied boards for
+    Texas Holdem hi/lo, using the best five of the hole and board cards
+
+    :param holes: numpy integer array of shape (players, 2) of integer encoded hole cards
+    :param boards: numpy integer array of shape (boards, 5) of integer encoded board cards
+
+    :return tuple of numpy int64 arrays of shape (boards, players) (high strengths, low strengths)
+    """
+    holes = np.asarray(holes)
+    boards = np.asarray(boards)
+    players = len(holes)
+    count = len(boards)
+    cards = np.concatenate((np.broadcast_to(holes[None, :, :], (count, players, holes.shape[1])),
+                            np.broadcast_to(boards[:, None, :], (count, players, boards.shape[1]))), axis=2)
+    high, low = evaluate_hi_lo_batch(cards.reshape(count * players, -1))
+
+    return high.reshape(count, players), low.reshape(count, players)
+
+
+def omaha_hi_lo_showdown(holes, boards, chunk_size=omaha.CHUNK_SIZE):
+    """
+    Evaluates the Omaha high hand and the eight-or-better low of every player on every one of the supplied
+    boards, each uses exactly two hole cards and three board cards (not necessarily the same ones), the board
+    triple keys are built once per board and every combined key is looked up in both tables
+
+    :param holes: numpy integer array of shape (players, 4) of integer encoded hole cards
+    :param boards: numpy integer array of shape (boards, board size) of integer encoded board cards
+    :param chunk_size: number of combinations evaluated in each chunk, which limits the memory used (see
+                       omaha.chunks())
+
+    :return tuple of numpy int64 arrays of shape (boards, players) (high strengths, low strengths)
+    """
+    triple_keys, triple_masks, triple_suits = omaha.board_triple_keys(boards)
+    pair_keys, pair_masks, pair_suits = omaha.hole_pair_keys(holes)
+    high_result = np.empty((len(triple_keys), len(pair_keys)), dtype=np.int64)
+    low_result = np.empty_like(high_result)
+
+    for rows in omaha.chunks(len(high_result), pair_keys.size * triple_keys.shape[1], chunk_size):
+        # Axes are board, player, hole pair and board triple
+        keys = pair_keys[None, :, :, None] + triple_keys[rows, None, None, :]
+        flush = pair_suits[None, :, :, None] == triple_suits[rows, None, None, :]
+        high = evaluator.NP_FIVE_CARD_STRENGTHS[keys]
+
+        if flush.any():
+            masks = pair_masks[None, :, :, None] | triple_masks[rows, None, None, :]
+            high = np.where(flush, evaluator.NP_FLUSH_STRENGTHS[masks], high)
+
+        high_result[rows] = high.max(axis=(2, 3))
+        low_result[rows] = NP_EIGHT_OR_BETTER_STRENGTHS[keys].max(axis=(2, 3))
+
+    return high_result, low_result
@@ -0,0 +1,190 @@
+"""
+Author:     Chris Knowles
+File:       omaha.py
+Version:    1.0.0
+Notes:      Omaha high hand evaluation, a hand is made of exactly two of the four hole cards and
+            exactly three of the board cards, so each hand has up to 60 combinations, the rank masks
+            of every three card part of the board are built once per board and shared between every
+            combination and every player, only the two hole cards are added for each combination,
+            the combinations are evaluated a chunk of boards (or hands) at a time so the memory used
+            is bounded however many boards and players there are
+"""
+# Imports
+from itertools import combinations
+import numpy as np
+from engine import evaluator
+from engine import tables
+
+
+# Global consts
+HOLE_SIZE = 4
+HOLE_PAIRS = tables.freeze(np.array(list(combinations(range(HOLE_SIZE), 2)), dtype=np.int8))
+# Number of combinations of a hole pair and a board triple evaluated in each chunk, each chunk's arrays take a
+# few megabytes
+CHUNK_SIZE = 1 << 20
+
+
+# Functions
+def board_triples(board_size):
+    """
+    Returns the positions of every three card part of a board of the supplied size
+
+    :param board_size: number of board cards (at least three)
+
+    :return numpy int8 array of shape (triples, 3)
+    """
+    return np.array(list(combinations(range(board_size), 3)), dtype=np.int8)
+
+
+def evaluate_omaha(hole_cards, board):
+    """
+    Evaluates the strength of the best Omaha high hand made from exactly two of the supplied hole cards and
+    exactly three of the supplied board cards
+
+    :param hole_cards: four integer encoded hole cards
+    :param board: three to five integer encoded board cards
+
+    :return strength of the hand (see evaluator.evaluate()), a higher strength is a better hand
+    """
+    return int(omaha_showdown(np.array([hole_cards]), np.array([board]))[0, 0])
+
+
+def evaluate_omaha_hand(hand, board):
+    """
+    Evaluates the strength of the best Omaha high hand of the hole cards of the supplied hand on the supplied
+    board
+
+    :param hand: Hand class instance, its four hole cards are used
+    :param board: board cards, as list of Card class (eg. Table.board)
+
+    :return strength of the hand
+    """
+    return evaluate_omaha([c.index for c in hand.hole_cards], [c.index for c in board])
+
+
+def evaluate_omaha_batch(holes, boards, chunk_size=CHUNK_SIZE):
+    """
+    Evaluates the strength of the best Omaha high hand of every row of the supplied hole cards on the board
+    of the same row
+
+    :param holes: numpy integer array of shape (hands, 4) of integer encoded hole cards
+    :param boards: numpy integer array of shape (hands, board size) of integer encoded board cards
+    :param chunk_size: number of combinations evaluated in each chunk, which limits the memory used
+
+    :return numpy int64 array of the strength of each hand
+    """
+    triple_keys, triple_masks, triple_suits = board_triple_keys(boards)
+    pair_keys, pair_masks, pair_suits = hole_pair_keys(holes)
+    result = np.empty(len(triple_keys), dtype=np.int64)
+
+    for rows in chunks(len(result), pair_keys.shape[1] * triple_keys.shape[1], chunk_size):
+        # Every hole pair (axis 1) with every board triple (axis 2) of the same row
+        strengths = _combine(pair_keys[rows, :, None], pair_masks[rows, :, None], pair_suits[rows, :, None],
+                             triple_keys[rows, None, :], triple_masks[rows, None, :], triple_suits[rows, None, :])
+        result[rows] = strengths.max(axis=(1, 2))
+
+    return result
+
+
+def omaha_showdown(holes, boards, chunk_size=CHUNK_SIZE):
+    """
+    Evaluates the strength of the best Omaha high hand of every player on every one of the supplied boards,
+    the board triple keys are built once per board and shared by every player
+
+    :param holes: numpy integer array of shape (players, 4) of integer encoded hole cards
+    :param boards: numpy integer array of shape (boards, board size) of integer encoded board cards
+    :param chunk_size: number of combinations evaluated in each chunk, which limits the memory used
+
+    :return numpy int64 array of shape (boards, players) of the strength of each player's hand on each board
+    """
+    triple_keys, triple_masks, triple_suits = board_triple_keys(boards)
+    pair_keys, pair_masks, pair_suits = hole_pair_keys(holes)
+    result = np.empty((len(triple_keys), len(pair_keys)), dtype=np.int64)
+
+    for rows in chunks(len(result), pair_keys.size * triple_keys.shape[1], chunk_size):
+        # Axes are board, player, hole pair and board triple
+        strengths = _combine(pair_keys[None, :, :, None], pair_masks[None, :, :, None],
+                             pair_suits[None, :, :, None], triple_keys[rows, None, None, :],
+                             triple_masks[rows, None, None, :], triple_suits[rows, None, None, :])
+        result[rows] = strengths.max(axis=(2, 3))
+
+    return result
+
+
+def chunks(count, combinations_per_row, chunk_size=CHUNK_SIZE):
+    """
+    Returns the slices of rows (eg. boards) evaluated in each chunk, as many whole rows as fit in the supplied
+    number of combinations and always at least one
+
+    :param count: number of rows
+    :param combinations_per_row: number of combinations evaluated for each row
+    :param chunk_size: number of combinations evaluated in each chunk
+
+    :return generator of slices
+    """
+    step = max(1, chunk_size // max(combinations_per_row, 1))
+
+    return (slice(start, start + step) for start in range(0, count, step))
+
+
+def board_triple_keys(boards):
+    """
+    Returns the partial keys of every three card part of each of the supplied boards, these are built once per
+    board and then combined with the partial keys of every hole pair
+
+    :param boards: numpy integer array of shape (boards, board size) of integer encoded board cards
+
+    :return tuple of numpy int32 arrays of shape (boards, triples) of the rank key sum, rank mask and suit (or
+            SUIT_COUNT + 1 if the cards are not all of one suit) of each triple
+    """
+    cards = np.asarray(boards)[:, board_triples(np.shape(boards)[1])]
+
+    return _partial_keys(cards, evaluator.SUIT_COUNT + 1)
+
+
+def hole_pair_keys(holes):
+    """
+    Returns the partial keys of every two card part of each of the supplied sets of hole cards
+
+    :param holes: numpy integer array of shape (hands, 4) of integer encoded hole cards
+
+    :return tuple of numpy int32 arrays of shape (hands, 6) of the rank key sum, rank mask and suit (or
+            SUIT_COUNT if the cards are not of one suit) of each pair
+    """
+    cards = np.asarray(holes)[:, HOLE_PAIRS]
+
+    return _partial_keys(cards, evaluator.SUIT_COUNT)
+
+
+def _partial_keys(cards, unsuited):
+    """
+    Returns the partial keys of the supplied parts of hands
+
+    :param cards: numpy integer array with the cards of each part along the last axis
+    :param unsuited: suit value given to parts whose cards are not all of one suit
+
+    :return tuple of numpy int32 arrays (rank key sums, rank masks, suits)
+    """
+    keys = evaluator.NP_CARD_RANK_KEYS[cards].sum(axis=-1, dtype=np.int32)
+    masks = np.bitwise_or.reduce(evaluator.NP_CARD_RANK_BITS[cards], axis=-1)
+    suits = evaluator.NP_CARD_SUITS[cards].astype(np.int32)
+    suits = np.where((suits == suits[..., :1]).all(axis=-1), suits[..., 0], unsuited)
+
+    return keys, masks, suits
+
+
+def _combine(pair_keys, pair_masks, pair_suits, triple_keys, triple_masks, triple_suits):
+    """
+    Combines (with broadcasting) hole pair partial keys with board triple partial keys into the strength of each
+    five card hand, a hand is a flush only when the pair and the triple are of the same suit and then its
+    strength is taken from the flush table, otherwise it is taken from the five card table by rank key sum
+
+    :return numpy int32 array of the strength of each combination
+    """
+    strengths = evaluator.NP_FIVE_CARD_STRENGTHS[pair_keys + triple_keys]
+    flush = pair_suits == triple_suits
+
+    if flush.any():
+        strengths = np.where(flush, evaluator.NP_FLUSH_STRENGTHS[pair_masks | triple_masks], strengths)
+
+    return strengths
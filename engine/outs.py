@@ -0,0 +1,192 @@
+"""
+Author:     Chris Knowles
+File:       outs.py
+Version:    1.0.0
+Notes:      Outs calculator, finds the unseen cards that improve a hand to a better hand quality
+            or make it the winning hand against known opponent cards, the rank masks of the hand
+            and of each opponent are built once and every unseen card is then added to them with
+            a single mask update and evaluation, so the whole deck is checked in one pass
+"""
+# Imports
+from math import comb
+from engine import evaluator
+from engine.exceptions import InsufficientCardsError
+
+
+# Classes
+class Outs:
+    """
+    Outs of a hand on a board - class variables:
+        none
+    """
+    def __init__(self, quality_value, unseen_count, cards_to_come, improving, winning):
+        """
+        Initialiser - instance variables:
+            __quality_value: current hand quality value of the hand (as gconsts.HAND_QUALITIES), property with
+                             read only access
+            __unseen_count: number of cards not seen (ie. not in the hand, on the board or known opponent
+                            cards), property with read only access
+            __cards_to_come: number of board cards still to come, property with read only access
+            __improving: cards that improve the hand quality, as dict of resulting hand quality value to list
+                         of integer encoded cards, property with read only access
+            __winning: cards that make the hand beat every known opponent when it does not already, as list of
+                       integer encoded cards, empty if there are no known opponents, property with read only
+                       access
+
+        :param quality_value: current hand quality value
+        :param unseen_count: number of unseen cards
+        :param cards_to_come: number of board cards still to come
+        :param improving: improving cards by resulting hand quality value
+        :param winning: winning cards
+        """
+        self.__quality_value = quality_value
+        self.__unseen_count = unseen_count
+        self.__cards_to_come = cards_to_come
+        self.__improving = improving
+        self.__winning = winning
+
+    @property
+    def quality_value(self):
+        return self.__quality_value
+
+    @property
+    def unseen_count(self):
+        return self.__unseen_count
+
+    @property
+    def cards_to_come(self):
+        return self.__cards_to_come
+
+    @property
+    def improving(self):
+        return self.__improving
+
+    @property
+    def improving_cards(self):
+        return sorted(c for cards in self.__improving.values() for c in cards)
+
+    @property
+    def winning(self):
+        return self.__winning
+
+    def next_card_probability(self, cards=None):
+        """
+        Returns the chance of the next card dealt being one of the supplied outs
+
+        :param cards: outs to check for, if None then all improving cards are used
+
+        :return probability
+        """
+        count = len(self.improving_cards if cards is None else cards)
+
+        return count / self.unseen_count if self.unseen_count else 0.0
+
+    def by_river_probability(self, cards=None):
+        """
+        Returns the chance of at least one of the supplied outs being dealt by the river, ie. on the turn or the
+        river when on the flop
+
+        :param cards: outs to check for, if None then all improving cards are used
+
+        :return probability
+        """
+        count = len(self.improving_cards if cards is None else cards)
+        dealt = min(self.cards_to_come, self.unseen_count)
+
+        if not dealt:
+            return 0.0
+
+        return 1 - comb(self.unseen_count - count, dealt) / comb(self.unseen_count, dealt)
+
+    def __str__(self):
+        """
+        To string method
+
+        :return string representation of this outs instance
+        """
+        i = " ".join("{0}:{1}".format(q, len(cards)) for q, cards in sorted(self.improving.items()))
+
+        return "{0}:[{1}]:Winning:{2}:Next:{3:.4f}:ByRiver:{4:.4f}".format(self.quality_value, i,
+                                                                           len(self.winning),
+                                                                           self.next_card_probability(),
+                                                                           self.by_river_probability())
+
+
+# Functions
+def find_outs(hole_cards, board, opponents=None):
+    """
+    Finds the outs of the supplied hole cards on the supplied board, every unseen card is checked once
+
+    :param hole_cards: integer encoded hole cards
+    :param board: three or four integer encoded board cards
+    :param opponents: known hole cards of each opponent, as list of lists of integer encoded cards
+
+    :return Outs instance
+
+    :exception InsufficientCardsError: thrown when the board has fewer than three cards
+    :exception ValueError: thrown when the board has more than four cards, ie. there are no cards to come
+    """
+    if len(board) < 3:
+        msg = "Not enough board cards for outs: available={0} required=3".format(len(board))
+        raise InsufficientCardsError(msg)
+
+    if len(board) > 4:
+        msg_str = "Too many board cards for outs, there are no cards to come: board={0} maximum=4"
+        raise ValueError(msg_str.format(len(board)))
+
+    opponents = opponents if opponents else []
+
+    seen = 0
+    for c in hole_cards:
+        seen |= 1 << c
+    for c in board:
+        seen |= 1 << c
+    for cards in opponents:
+        for c in cards:
+            seen |= 1 << c
+
+    hero_masks = evaluator.rank_masks(list(hole_cards) + list(board))
+    opponent_masks = [evaluator.rank_masks(list(cards) + list(board)) for cards in opponents]
+
+    hero_strength = evaluator.evaluate_masks(hero_masks)
+    quality_value = evaluator.hand_quality_value(hero_strength)
+    ahead = all(hero_strength > evaluator.evaluate_masks(m) for m in opponent_masks)
+
+    improving = {}
+    winning = []
+    unseen_count = 0
+
+    for c in range(evaluator.CARD_COUNT):
+        if seen >> c & 1:
+            continue
+
+        unseen_count += 1
+        strength = evaluator.evaluate_masks(evaluator.add_cards(hero_masks, (c,)))
+        new_quality = evaluator.hand_quality_value(strength)
+
+        if new_quality > quality_value:
+            improving.setdefault(new_quality, []).append(c)
+
+        if opponent_masks and not ahead:
+            if all(strength > evaluator.evaluate_masks(evaluator.add_cards(m, (c,))) for m in opponent_masks):
+                winning.append(c)
+
+    return Outs(quality_value, unseen_count, 5 - len(board), improving, winning)
+
+
+def find_hand_outs(hand, board, opponent_hands=None):
+    """
+    Finds the outs of the hole cards of the supplied hand on the supplied board
+
+    :param hand: Hand class instance, its hole cards are used
+    :param board: board cards, as list of Card class (eg. Table.board)
+    :param opponent_hands: hands of opponents whose hole cards are known, as list of Hand class
+
+    :return Outs instance
+
+    :exception InsufficientCardsError: thrown when the board has fewer than three cards
+    :exception ValueError: thrown when the board has more than four cards
+    """
+    opponents = [[c.index for c in h.hole_cards] for h in opponent_hands] if opponent_hands else None
+
+    return find_outs([c.index for c in hand.hole_cards], [c.index for c in board], opponents)
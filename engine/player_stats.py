@@ -0,0 +1,400 @@
+"""
+Author:     Chris Knowles
+File:       player_stats.py
+Version:    1.0.0
+Notes:      Player statistics for opponent modelling, kept per player (by Player.ident) in a local
+            SQLite database, only the running counts behind each statistic are stored (hands dealt,
+            hands voluntarily put money in pre-flop, pre-flop raises, showdowns reached and won,
+            post-flop bets and raises, post-flop calls) so the statistics are updated incrementally
+            by adding counts rather than by storing and re-reading every hand, eg.
+
+                recorder = player_stats.HandRecorder()
+                recorder.start(betting)
+                recorder.act(betting, gconsts.CHECK_CALL_ACTION_VALUE)
+                ...
+                recorder.showdown(betting, betting.settle(ranks))
+                store.add([p.ident for p in table.players], recorder.counts)
+
+            counts added to the store are summed per player in memory and written a batch at a time
+            as upserts within one transaction, so ingesting millions of hands costs a handful of
+            writes, a lookup is one primary key read of a table without row ids (plus anything not
+            yet written), and an index on the hand count serves queries over the whole field
+"""
+# Imports
+import sqlite3
+import uuid
+import numpy as np
+from engine import gconsts
+
+
+# Global consts
+# Columns of the counts of a player, in the order of the count arrays recorded by HandRecorder
+HANDS_COUNT = 0
+VPIP_COUNT = 1
+PFR_COUNT = 2
+SHOWDOWN_COUNT = 3
+SHOWDOWN_WIN_COUNT = 4
+BET_RAISE_COUNT = 5
+CALL_COUNT = 6
+COUNT_NAMES = ("hands", "vpip_hands", "pfr_hands", "showdowns", "showdown_wins", "bets_raises", "calls")
+DEFAULT_BATCH_SIZE = 100000
+
+_CREATE_SQL = ("CREATE TABLE IF NOT EXISTS player_stats (ident BLOB PRIMARY KEY, {0}) WITHOUT ROWID".format(
+                   ", ".join("{0} INTEGER NOT NULL DEFAULT 0".format(name) for name in COUNT_NAMES)),
+               "CREATE INDEX IF NOT EXISTS player_stats_hands ON player_stats (hands)")
+_UPSERT_SQL = "INSERT INTO player_stats (ident, {0}) VALUES (?, {1}) ON CONFLICT (ident) DO UPDATE SET {2}".format(
+    ", ".join(COUNT_NAMES), ", ".join("?" * len(COUNT_NAMES)),
+    ", ".join("{0} = {0} + excluded.{0}".format(name) for name in COUNT_NAMES))
+_SELECT_SQL = "SELECT {0} FROM player_stats WHERE ident = ?".format(", ".join(COUNT_NAMES))
+_SELECT_MIN_HANDS_SQL = "SELECT ident, {0} FROM player_stats WHERE hands >= ? ORDER BY hands DESC".format(
+    ", ".join(COUNT_NAMES))
+
+
+# Classes
+class PlayerStats:
+    """
+    Statistics of one player worked out from their counts - class variables:
+        none
+    """
+    def __init__(self, ident, counts):
+        """
+        Initialiser - instance variables:
+            __ident: identifier of the player, as UUID, property with read only access
+            __counts: counts of the player (as COUNT_NAMES), as tuple of integers, property with read only
+                      access
+
+        :param ident: identifier of the player
+        :param counts: counts of the player, as sequence of integers in the order of COUNT_NAMES
+        """
+        self.__ident = ident
+        self.__counts = tuple(int(c) for c in counts)
+
+    @property
+    def ident(self):
+        return self.__ident
+
+    @property
+    def counts(self):
+        return self.__counts
+
+    @property
+    def hands(self):
+        return self.__counts[HANDS_COUNT]
+
+    @property
+    def vpip(self):
+        # Fraction of hands where the player voluntarily put money in pre-flop
+        return self.__ratio(VPIP_COUNT, HANDS_COUNT)
+
+    @property
+    def pfr(self):
+        # Fraction of hands where the player raised pre-flop
+        return self.__ratio(PFR_COUNT, HANDS_COUNT)
+
+    @property
+    def showdown_win_rate(self):
+        # Fraction of showdowns reached that the player won (or split)
+        return self.__ratio(SHOWDOWN_WIN_COUNT, SHOWDOWN_COUNT)
+
+    @property
+    def aggression(self):
+        # Post-flop aggression factor, bets and raises per call, infinite if the player never called
+        bets_raises, calls = self.__counts[BET_RAISE_COUNT], self.__counts[CALL_COUNT]
+        if not calls:
+            return float("inf") if bets_raises else 0.0
+        return bets_raises / calls
+
+    def __ratio(self, numerator, denominator):
+        """
+        Returns the ratio of two of the counts, 0 if the denominator count is 0
+
+        :param numerator: index of the numerator count
+        :param denominator: index of the denominator count
+
+        :return ratio as float
+        """
+        return self.__counts[numerator] / self.__counts[denominator] if self.__counts[denominator] else 0.0
+
+    def __str__(self):
+        """
+        To string method
+
+        :return string representation of this player statistics instance
+        """
+        return "{0}:hands={1}:VPIP={2:.3f}:PFR={3:.3f}:WSD={4:.3f}:AF={5:.2f}".format(
+            str(self.__ident), self.hands, self.vpip, self.pfr, self.showdown_win_rate, self.aggression)
+
+
+class HandRecorder:
+    """
+    Records the counts of every seat during one hand of betting - class variables:
+        none
+    """
+    def __init__(self):
+        """
+        Initialiser - instance variables:
+            __counts: counts of every seat this hand, as numpy int64 array of shape (seats, len(COUNT_NAMES)),
+                      property with read only access
+            __preflop: the betting is on the first street, as boolean
+        """
+        self.__counts = np.zeros((0, len(COUNT_NAMES)), dtype=np.int64)
+        self.__preflop = True
+
+    @property
+    def counts(self):
+        return self.__counts
+
+    def start(self, betting):
+        """
+        Starts recording a new hand, every seat dealt in (ie. with chips) is counted as having played a hand,
+        this should be called once the blinds are posted and before the first action
+
+        :param betting: Betting class instance of the hand
+
+        :return nothing
+        """
+        if not len(self.__counts) == betting.seat_count:
+            self.__counts = np.zeros((betting.seat_count, len(COUNT_NAMES)), dtype=np.int64)
+        else:
+            self.__counts[:] = 0
+
+        self.__counts[:, HANDS_COUNT] = ~betting.pot.folded
+        self.__preflop = True
+
+    def start_street(self, betting):
+        """
+        Starts a new street of betting, after the first street every action is post-flop
+
+        :param betting: Betting class instance of the hand
+
+        :return nothing
+        """
+        betting.start_street()
+        self.__preflop = False
+
+    def act(self, betting, action, amount=0):
+        """
+        Applies the supplied action to the betting (see Betting.act()) and records it for the seat that acted,
+        nothing is recorded if the action is not allowed
+
+        :param betting: Betting class instance of the hand
+        :param action: one of gconsts.FOLD_ACTION_VALUE, gconsts.CHECK_CALL_ACTION_VALUE or
+                       gconsts.BET_RAISE_ACTION_VALUE
+        :param amount: for a bet or raise, the total street bet to raise to
+
+        :return nothing
+
+        :exception IllegalActionError: thrown when there is no seat to act or the action is not allowed
+        """
+        seat = betting.to_act
+        to_call = betting.to_call(seat) if not seat == gconsts.NO_PLAYER_INDEX else 0
+        betting.act(action, amount)
+
+        # Checking is not voluntary and is not a call
+        is_call = action == gconsts.CHECK_CALL_ACTION_VALUE and to_call > 0
+        is_raise = action == gconsts.BET_RAISE_ACTION_VALUE
+
+        if self.__preflop:
+            self.__counts[seat, VPIP_COUNT] |= is_call or is_raise
+            self.__counts[seat, PFR_COUNT] |= is_raise
+        else:
+            self.__counts[seat, BET_RAISE_COUNT] += is_raise
+            self.__counts[seat, CALL_COUNT] += is_call
+
+    def showdown(self, betting, payouts):
+        """
+        Records the showdown of the hand, if two or more seats are still in the hand each of them reached
+        showdown and those paid out won it
+
+        :param betting: Betting class instance of the hand
+        :param payouts: chips won by each seat, as returned by Betting.settle()
+
+        :return nothing
+        """
+        in_hand = ~betting.pot.folded
+        if np.count_nonzero(in_hand) < 2:
+            return
+
+        self.__counts[in_hand, SHOWDOWN_COUNT] = 1
+        self.__counts[in_hand & (np.asarray(payouts) > 0), SHOWDOWN_WIN_COUNT] = 1
+
+
+class PlayerStatsStore:
+    """
+    Store of the counts of every player in a local SQLite database - class variables:
+        none
+    """
+    def __init__(self, path=":memory:", batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Initialiser - instance variables:
+            __path: path of the database file, ":memory:" for a database held in memory, property with read only
+                    access
+            __batch_size: number of player hands added before the pending counts are written, property with
+                          read only access
+            __connection: connection to the database, as sqlite3.Connection
+            __added_keys: identifier bytes of every player hand added since the counts were last collected, as
+                          list, adding is kept this cheap as it may be called for every hand played
+            __added_counts: counts added since the counts were last collected, as list of numpy arrays of shape
+                            (seats, len(COUNT_NAMES)) matching __added_keys
+            __pending: counts collected but not yet written, as dict of ident bytes to numpy int64 array
+            __pending_hands: number of player hands (ie. hands times seats) added but not yet written, property
+                             with read only access
+
+        :param path: path of the database file, it is created if it does not exist
+        :param batch_size: number of player hands (ie. hands times seats) added before the pending counts are
+                           written
+        """
+        self.__path = path
+        self.__batch_size = batch_size
+        self.__connection = sqlite3.connect(path)
+        self.__added_keys = []
+        self.__added_counts = []
+        self.__pending = {}
+        self.__pending_hands = 0
+
+        # Written a batch at a time, so a crash loses at most the batch in hand rather than corrupting the file
+        self.__connection.execute("PRAGMA journal_mode = WAL")
+        self.__connection.execute("PRAGMA synchronous = NORMAL")
+        with self.__connection:
+            for sql in _CREATE_SQL:
+                self.__connection.execute(sql)
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def batch_size(self):
+        return self.__batch_size
+
+    @property
+    def pending_hands(self):
+        return self.__pending_hands
+
+    def add(self, idents, counts):
+        """
+        Adds the counts of one or more hands of the supplied players, the counts are written once a batch of
+        player hands has built up (see flush())
+
+        :param idents: identifier of the player in each seat, as sequence of UUID (eg. Player.ident)
+        :param counts: counts of each seat, as numpy array of shape (seats, len(COUNT_NAMES)) for one hand (eg.
+                       HandRecorder.counts) or of shape (hands, seats, len(COUNT_NAMES)) for many hands at the
+                       same seats, the counts are copied so the caller may reuse the array
+
+        :return nothing
+
+        :exception ValueError: thrown when the counts do not match the number of players
+        """
+        counts = np.asarray(counts, dtype=np.int64)
+        hands = 1
+        if counts.ndim == 3:
+            hands = len(counts)
+            counts = counts.sum(axis=0)
+        else:
+            # Held until the next collect, by which time a recorder will have reset its counts for a new hand
+            counts = counts.copy()
+
+        if not counts.shape == (len(idents), len(COUNT_NAMES)):
+            msg_str = "Counts do not match players: counts={0} players={1}"
+            raise ValueError(msg_str.format(counts.shape, len(idents)))
+
+        self.__added_keys.extend([ident.bytes for ident in idents])
+        self.__added_counts.append(counts)
+        self.__pending_hands += hands * len(idents)
+
+        if self.__pending_hands >= self.__batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the pending counts in one transaction, adding them to the counts already stored
+
+        :return nothing
+        """
+        self.__collect()
+        if not self.__pending:
+            return
+
+        with self.__connection:
+            self.__connection.executemany(_UPSERT_SQL, ((key,) + tuple(counts.tolist())
+                                                        for key, counts in self.__pending.items()))
+
+        self.__pending = {}
+        self.__pending_hands = 0
+
+    def get(self, ident):
+        """
+        Returns the statistics of the supplied player, including any counts not yet written
+
+        :param ident: identifier of the player, as UUID
+
+        :return PlayerStats class instance, with every count 0 if the player has no hands recorded
+        """
+        self.__collect()
+        key = ident.bytes
+        row = self.__connection.execute(_SELECT_SQL, (key,)).fetchone()
+        counts = np.zeros(len(COUNT_NAMES), dtype=np.int64) if row is None else np.array(row, dtype=np.int64)
+
+        pending = self.__pending.get(key)
+        if pending is not None:
+            counts += pending
+
+        return PlayerStats(ident, counts)
+
+    def get_players(self, min_hands=0):
+        """
+        Returns the statistics of every player with at least the supplied number of hands recorded, most hands
+        first, the pending counts are written first
+
+        :param min_hands: least number of hands recorded
+
+        :return list of PlayerStats class instances
+        """
+        self.flush()
+        rows = self.__connection.execute(_SELECT_MIN_HANDS_SQL, (min_hands,))
+
+        return [PlayerStats(uuid.UUID(bytes=row[0]), row[1:]) for row in rows]
+
+    def __collect(self):
+        """
+        Sums the counts added since they were last collected into the pending counts of each player
+
+        :return nothing
+        """
+        if not self.__added_keys:
+            return
+
+        # Number the players of the added counts so every player's counts are summed in one operation
+        numbers = {}
+        player_numbers = [numbers.setdefault(key, len(numbers)) for key in self.__added_keys]
+        added = np.concatenate(self.__added_counts)
+        order = np.argsort(player_numbers, kind="stable")
+        starts = np.searchsorted(np.asarray(player_numbers)[order], np.arange(len(numbers)))
+        sums = np.add.reduceat(added[order], starts, axis=0)
+
+        for key, counts in zip(numbers, sums):
+            pending = self.__pending.get(key)
+            if pending is None:
+                self.__pending[key] = counts
+            else:
+                pending += counts
+
+        self.__added_keys = []
+        self.__added_counts = []
+
+    def close(self):
+        """
+        Writes the pending counts and closes the database, the store must not be used afterwards
+
+        :return nothing
+        """
+        self.flush()
+        self.__connection.close()
+
+    def __str__(self):
+        """
+        To string method
+
+        :return string representation of this player statistics store instance
+        """
+        return "{0}:pending={1}".format(self.__path, self.__pending_hands)
@@ -0,0 +1,230 @@
+"""
+Author:     Chris Knowles
+File:       preflop.py
+Version:    1.0.0
+Notes:      The 169 pre-flop starting hand classes of Texas Holdem (pairs, suited and offsuit
+            hands) and the equity matrix of every class against every other class, the classes
+            are laid out as the usual 13x13 grid with aces first, pairs on the diagonal, suited
+            hands above it and offsuit hands below it, a class index is row * 13 + column
+"""
+# Imports
+import os
+import numpy as np
+from engine import gconsts
+from engine import evaluator
+from engine import tables
+
+
+# Global consts
+CLASS_COUNT = evaluator.RANK_COUNT * evaluator.RANK_COUNT
+COMBO_COUNT = evaluator.CARD_COUNT * (evaluator.CARD_COUNT - 1) // 2
+BOARD_SIZE = 5
+
+
+# Functions
+def card_of(rank, suit):
+    """
+    Returns the integer encoded card (see Card.index) of the supplied evaluator rank and suit
+
+    :param rank: evaluator rank of the card, 0 for a two through to 12 for an ace
+    :param suit: suit index of the card
+
+    :return integer encoded card
+    """
+    return ((rank + 1) % evaluator.RANK_COUNT) * evaluator.SUIT_COUNT + suit
+
+
+def rank_of(card):
+    """
+    Returns the evaluator rank (0 for a two through to 12 for an ace) of the supplied integer encoded card
+
+    :param card: integer encoded card
+
+    :return evaluator rank of the card
+    """
+    return (card // evaluator.SUIT_COUNT - 1) % evaluator.RANK_COUNT
+
+
+def class_of(card1, card2):
+    """
+    Returns the pre-flop class index of the two supplied hole cards
+
+    :param card1: first integer encoded hole card
+    :param card2: second integer encoded hole card
+
+    :return class index
+    """
+    high = max(rank_of(card1), rank_of(card2))
+    low = min(rank_of(card1), rank_of(card2))
+    row = evaluator.ACE_RANK - high
+    column = evaluator.ACE_RANK - low
+
+    if card1 % evaluator.SUIT_COUNT == card2 % evaluator.SUIT_COUNT:
+        return row * evaluator.RANK_COUNT + column
+
+    return column * evaluator.RANK_COUNT + row
+
+
+def class_name(index):
+    """
+    Returns the usual name of the supplied pre-flop class index, eg. "AA", "AKs" or "72o"
+
+    :param index: class index
+
+    :return class name
+    """
+    row, column = divmod(index, evaluator.RANK_COUNT)
+    symbols = [gconsts.VALUE_SYMBOLS[(evaluator.ACE_RANK - i + 1) % evaluator.RANK_COUNT]
+               for i in (min(row, column), max(row, column))]
+
+    if row == column:
+        return symbols[0] + symbols[1]
+
+    return symbols[0] + symbols[1] + ("s" if row < column else "o")
+
+
+def class_index(name):
+    """
+    Returns the pre-flop class index of the supplied class name, eg. "AA", "AKs" or "72o"
+
+    :param name: class name
+
+    :return class index
+    """
+    row, column = [evaluator.ACE_RANK - rank_of(gconsts.VALUE_SYMBOLS.index(s) * evaluator.SUIT_COUNT)
+                   for s in name[:2]]
+    row, column = min(row, column), max(row, column)
+
+    if name.endswith("o"):
+        row, column = column, row
+
+    return row * evaluator.RANK_COUNT + column
+
+
+def _build_combos():
+    """
+    Builds every two card combination of the deck with its pre-flop class
+
+    :return tuple of (numpy array of shape (1326, 2) of combos, numpy array of class index of each combo)
+    """
+    combos = np.array([(a, b) for a in range(evaluator.CARD_COUNT) for b in range(a + 1, evaluator.CARD_COUNT)],
+                      dtype=np.int8)
+    classes = np.array([class_of(int(a), int(b)) for a, b in combos], dtype=np.int16)
+
+    return combos, classes
+
+
+COMBOS, COMBO_CLASSES = tables.load("preflop.combos", _build_combos)
+CLASS_COMBO_COUNTS = tables.freeze(np.bincount(COMBO_CLASSES, minlength=CLASS_COUNT))
+CLASS_FREQUENCIES = tables.freeze(CLASS_COMBO_COUNTS / COMBO_COUNT)
+
+
+def _build_compatibility():
+    """
+    Builds the card removal weights between classes, entry [a, b] is the average number of combos of class
+    b that do not share a card with a combo of class a
+
+    :return numpy float64 array of shape (169, 169)
+    """
+    masks = (np.uint64(1) << COMBOS[:, 0].astype(np.uint64)) | (np.uint64(1) << COMBOS[:, 1].astype(np.uint64))
+    compatible = np.zeros((CLASS_COUNT, CLASS_COUNT))
+
+    for i in range(COMBO_COUNT):
+        free = (masks & masks[i]) == 0
+        compatible[COMBO_CLASSES[i]] += np.bincount(COMBO_CLASSES[free], minlength=CLASS_COUNT)
+
+    return compatible / CLASS_COMBO_COUNTS[:, None]
+
+
+COMPATIBILITY = tables.load("preflop.compatibility", _build_compatibility)
+
+
+def equity_matrix(samples_per_cell=1000, seed=None, chunk_size=250000):
+    """
+    Builds the all-in pre-flop equity matrix of every class against every other class, pairs of non
+    overlapping combos are evaluated on random boards using the batch evaluator, each pair of combos is
+    dealt enough boards for its pair of classes to get about the supplied number of samples (so classes
+    with few combos, like pairs against pairs, are as accurate as the rest), each result counts for
+    both combos so entry [a, b] + entry [b, a] is always 1, ties count as half a win
+
+    :param samples_per_cell: approximate number of boards evaluated for each pair of classes
+    :param seed: seed of the random generator used to deal the boards
+    :param chunk_size: number of boards evaluated in each batch, which limits the memory used
+
+    :return numpy float64 array of shape (169, 169) of the equity of each class against each other class
+    """
+    rng = np.random.default_rng(seed)
+    masks = (np.uint64(1) << COMBOS[:, 0].astype(np.uint64)) | (np.uint64(1) << COMBOS[:, 1].astype(np.uint64))
+
+    # Every unordered pair of combos that do not share a card
+    first, second = np.triu_indices(COMBO_COUNT, k=1)
+    free = (masks[first] & masks[second]) == 0
+    first, second = first[free], second[free]
+
+    # Deal more boards to the pairs of combos in pairs of classes that have fewer combos
+    cells = COMBO_CLASSES[first].astype(np.int64) * CLASS_COUNT + COMBO_CLASSES[second]
+    mirrored = COMBO_CLASSES[second].astype(np.int64) * CLASS_COUNT + COMBO_CLASSES[first]
+    cell_sizes = np.bincount(cells, minlength=CLASS_COUNT * CLASS_COUNT)
+    cell_sizes += np.bincount(mirrored, minlength=CLASS_COUNT * CLASS_COUNT)
+    boards = -(-samples_per_cell // cell_sizes[cells])
+    rows = np.repeat(np.arange(len(first)), boards)
+
+    wins = np.zeros(CLASS_COUNT * CLASS_COUNT)
+    counts = np.zeros(CLASS_COUNT * CLASS_COUNT)
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        hero = COMBOS[first[chunk]]
+        villain = COMBOS[second[chunk]]
+        board = deal_boards(np.hstack((hero, villain)), BOARD_SIZE, rng)
+
+        hero_strength = evaluator.evaluate_batch(np.hstack((hero, board)))
+        villain_strength = evaluator.evaluate_batch(np.hstack((villain, board)))
+        result = (hero_strength > villain_strength) + 0.5 * (hero_strength == villain_strength)
+
+        wins += np.bincount(cells[chunk], weights=result, minlength=len(wins))
+        wins += np.bincount(mirrored[chunk], weights=1.0 - result, minlength=len(wins))
+        counts += np.bincount(cells[chunk], minlength=len(counts))
+        counts += np.bincount(mirrored[chunk], minlength=len(counts))
+
+    return (wins / np.maximum(counts, 1)).reshape(CLASS_COUNT, CLASS_COUNT)
+
+
+def load_equity_matrix(path, samples_per_cell=1000, seed=None):
+    """
+    Loads the pre-flop equity matrix from the supplied numpy file, if the file does not exist then the
+    matrix is built (see equity_matrix()) and saved to the file so that it is only ever built once
+
+    :param path: path of the .npy file holding the matrix
+    :param samples_per_cell: approximate number of boards evaluated for each pair of classes if the matrix
+                             is built
+    :param seed: seed of the random generator used if the matrix is built
+
+    :return numpy float64 array of shape (169, 169) of the equity of each class against each other class
+    """
+    if os.path.exists(path):
+        return np.load(path)
+
+    equities = equity_matrix(samples_per_cell, seed)
+    np.save(path, equities)
+
+    return equities
+
+
+def deal_boards(dead_cards, count, rng):
+    """
+    Deals random cards for every row of the supplied dead cards, the cards dealt for a row are all different
+    and none of them are in the row's dead cards
+
+    :param dead_cards: numpy integer array of shape (rows, dead cards) of integer encoded cards that may not
+                       be dealt, padded with evaluator.NO_CARD
+    :param count: number of cards to deal for each row
+    :param rng: numpy random generator used to deal
+
+    :return numpy int8 array of shape (rows, count) of dealt cards
+    """
+    keys = rng.random((len(dead_cards), evaluator.CARD_COUNT + 1), dtype=np.float32)
+    np.put_along_axis(keys, np.where(dead_cards < 0, evaluator.CARD_COUNT, dead_cards), 2.0, axis=1)
+    keys[:, evaluator.CARD_COUNT] = 2.0
+
+    return np.argpartition(keys, count, axis=1)[:, :count].astype(np.int8)
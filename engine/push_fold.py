@@ -0,0 +1,263 @@
+"""
+Author:     Chris Knowles
+File:       push_fold.py
+Version:    1.0.0
+Notes:      Push/fold equilibrium solver for short-stacked Texas Holdem, every player either folds
+            or pushes all-in pre-flop and each later player either calls the push or folds, the
+            strategies are probabilities over the 169 pre-flop classes and are found by fictitious
+            play (repeated best responses averaged together) using the pre-flop equity matrix, so
+            every iteration is a handful of 169x169 matrix products, later best responses are given
+            linearly more weight in the average (in proportion to the iteration that found them),
+            which forgets the poor early strategies far faster than a plain average and reaches an
+            exploitability of 1e-3 big blinds in tens to hundreds of iterations rather than many
+            thousands
+"""
+# Imports
+import numpy as np
+from engine import evaluator
+from engine import preflop
+
+
+# Classes
+class PushFoldSolver:
+    """
+    Push/fold equilibrium solver, the players are indexed by pre-flop acting order so the last player is the
+    big blind and the one before it is the small blind (heads-up the first player is the small blind), only
+    the first player to call a push is modelled (any later player is assumed to fold once the push has been
+    called) and chips are measured in big blinds - class variables:
+        none
+    """
+    def __init__(self, equities, stack=10.0, player_count=2, small_blind=0.5, ante=0.0, stacks=None):
+        """
+        Initialiser - instance variables:
+            __equities: pre-flop equity matrix of every class against every other class, as numpy float64
+                        array of shape (169, 169) (see preflop.equity_matrix())
+            __stacks: stack of each player at the start of the hand (before posting blinds and antes) in big
+                      blinds, as numpy float64 array indexed by acting order, property with read only access
+            __posted: chips posted by each player as blinds and antes before the hand, as numpy float64 array
+                      indexed by acting order
+            __push: probability of each player pushing each class when folded to, as numpy float64 array of
+                    shape (players, 169), the big blind never pushes, property with read only access
+            __call: probability of each player calling a push by each earlier player with each class, as numpy
+                    float64 array of shape (callers, pushers, 169), property with read only access
+            __iterations: number of iterations run by the last solve, property with read only access
+            __exploitability: total gain (in big blinds) every player could make by switching to a best response
+                              against the strategies from the last solve, property with read only access
+            __converged: the last solve reached its tolerance before its iteration limit, as boolean, property
+                         with read only access
+
+        :param equities: pre-flop equity matrix
+        :param stack: stack of every player in big blinds, ignored if stacks is supplied
+        :param player_count: number of players at the table
+        :param small_blind: size of the small blind in big blinds
+        :param ante: size of the ante paid by every player in big blinds
+        :param stacks: stack of each player in big blinds, indexed by acting order
+        """
+        self.__equities = np.asarray(equities, dtype=np.float64)
+
+        if stacks is None:
+            stacks = [stack] * player_count
+        self.__stacks = np.array(stacks, dtype=np.float64)
+        players = len(self.__stacks)
+
+        self.__posted = np.full(players, float(ante))
+        self.__posted[-1] += 1.0
+        self.__posted[-2] += small_blind
+        self.__posted = np.minimum(self.__posted, self.__stacks)
+
+        self.__push = np.zeros((players, preflop.CLASS_COUNT))
+        self.__call = np.zeros((players, players, preflop.CLASS_COUNT))
+        self.__iterations = 0
+        self.__exploitability = np.inf
+        self.__converged = False
+
+        # Card removal weights, the weighted equities and the fraction of each class an opponent holds
+        self.__weights = preflop.COMPATIBILITY
+        self.__weighted_equities = preflop.COMPATIBILITY * self.__equities
+        self.__weight_totals = preflop.COMPATIBILITY.sum(axis=1)
+
+    @property
+    def stacks(self):
+        return self.__stacks
+
+    @property
+    def player_count(self):
+        return len(self.__stacks)
+
+    @property
+    def push(self):
+        return self.__push
+
+    @property
+    def call(self):
+        return self.__call
+
+    @property
+    def iterations(self):
+        return self.__iterations
+
+    @property
+    def exploitability(self):
+        return self.__exploitability
+
+    @property
+    def converged(self):
+        return self.__converged
+
+    def solve(self, max_iterations=2000, tolerance=1e-3):
+        """
+        Solves for the push/fold equilibrium by fictitious play, on each iteration every player's best
+        response to the current strategies is found and blended into that player's linearly weighted
+        average strategy, iteration stops once the exploitability is below the supplied tolerance, if the
+        iteration limit is reached first the strategies are left unconverged and converged is False
+
+        :param max_iterations: maximum number of iterations to run
+        :param tolerance: exploitability (in big blinds) below which the strategies are regarded as solved
+
+        :return exploitability of the final strategies, check converged to see whether it is below the
+                tolerance
+        """
+        players = self.player_count
+        pushers = np.arange(players - 1)
+
+        # Only a later player can call a push, so only [caller, pusher] entries with caller > pusher are used
+        can_call = np.tril(np.ones((players, players)), k=-1)[:, :, None]
+        self.__converged = False
+
+        for iteration in range(1, max_iterations + 1):
+            push_evs, fold_evs, call_evs = self.__evs()
+
+            push_best = (push_evs > fold_evs[:, None]).astype(np.float64)
+            call_best = (call_evs > -self.__posted[:, None, None]) * can_call
+
+            # Exploitability is the gain from switching to the best response, weighted by class frequency and
+            # by how often each decision is reached
+            push_gain = np.maximum(push_evs, fold_evs[:, None]) - (self.__push * push_evs +
+                                                                   (1 - self.__push) * fold_evs[:, None])
+            call_gain = can_call * (np.maximum(call_evs, -self.__posted[:, None, None]) -
+                                    (self.__call * call_evs + (1 - self.__call) * -self.__posted[:, None, None]))
+            push_reach, call_reach = self.__reach_probabilities()
+            self.__exploitability = float(push_reach[pushers] @ (push_gain[pushers] @ preflop.CLASS_FREQUENCIES) +
+                                          ((call_gain @ preflop.CLASS_FREQUENCIES) * call_reach).sum())
+            self.__iterations = iteration
+
+            if self.__exploitability < tolerance:
+                self.__converged = True
+                break
+
+            # The starting strategy and the best responses of iterations 1..t are weighted 1..t+1 in the average
+            step = 2.0 / (iteration + 2)
+            self.__push[pushers] += step * (push_best[pushers] - self.__push[pushers])
+            self.__call += step * (call_best - self.__call)
+
+        return self.__exploitability
+
+    def push_range(self, player, threshold=0.5):
+        """
+        Returns the names of the classes the supplied player pushes with at least the supplied probability
+
+        :param player: index of the player by acting order
+        :param threshold: minimum push probability
+
+        :return list of class names
+        """
+        return [preflop.class_name(i) for i in np.flatnonzero(self.__push[player] >= threshold)]
+
+    def call_range(self, player, pusher, threshold=0.5):
+        """
+        Returns the names of the classes the supplied player calls a push by the supplied pusher with at
+        least the supplied probability
+
+        :param player: index of the calling player by acting order
+        :param pusher: index of the pushing player by acting order
+        :param threshold: minimum call probability
+
+        :return list of class names
+        """
+        return [preflop.class_name(i) for i in np.flatnonzero(self.__call[player, pusher] >= threshold)]
+
+    def chart(self, strategy):
+        """
+        Returns a text chart of the supplied strategy as the usual 13x13 grid of classes, each class shows its
+        probability as a percentage
+
+        :param strategy: probability of each class, as sequence of 169 values (eg. solver.push[0])
+
+        :return chart as a multi-line string
+        """
+        rows = []
+        for row in range(evaluator.RANK_COUNT):
+            cells = []
+            for column in range(evaluator.RANK_COUNT):
+                index = row * evaluator.RANK_COUNT + column
+                cells.append("{0:>4}:{1:>3.0f}".format(preflop.class_name(index), 100 * strategy[index]))
+            rows.append(" ".join(cells))
+
+        return "\n".join(rows)
+
+    def __reach_probabilities(self):
+        """
+        Returns the probability of each push and call decision being reached with the current strategies, card
+        removal between the players is ignored here
+
+        :return tuple of (probability each player is folded to, of shape (players,), probability each caller
+                faces a push by each pusher with every player in between folding, of shape (callers, pushers))
+        """
+        players = self.player_count
+        push_probabilities = self.__push @ preflop.CLASS_FREQUENCIES
+        call_probabilities = self.__call @ preflop.CLASS_FREQUENCIES
+
+        push_reach = np.concatenate(([1.0], np.cumprod(1 - push_probabilities[:-1])))
+        call_reach = np.zeros((players, players))
+
+        for pusher in range(players - 1):
+            reach = push_reach[pusher] * push_probabilities[pusher]
+            for caller in range(pusher + 1, players):
+                call_reach[caller, pusher] = reach
+                reach *= 1 - call_probabilities[caller, pusher]
+
+        return push_reach, call_reach
+
+    def __evs(self):
+        """
+        Returns the expected value (change in stack in big blinds) of each player pushing, folding and
+        calling with each class against the current strategies
+
+        :return tuple of (push EVs of shape (players, 169), fold EVs of shape (players,), call EVs of shape
+                (callers, pushers, 169))
+        """
+        players = self.player_count
+        dead = self.__posted.sum()
+        push_evs = np.zeros((players, preflop.CLASS_COUNT))
+        call_evs = np.zeros((players, players, preflop.CLASS_COUNT))
+
+        # Probability of each caller calling and the equity when called, for each hand held by the pusher
+        calls = self.__call.reshape(-1, preflop.CLASS_COUNT).T
+        call_weights = (self.__weights @ calls).T.reshape(players, players, preflop.CLASS_COUNT)
+        call_equities = (self.__weighted_equities @ calls).T.reshape(players, players, preflop.CLASS_COUNT)
+        call_probabilities = call_weights / self.__weight_totals
+        call_equities = np.divide(call_equities, call_weights, out=np.full_like(call_equities, 0.5),
+                                  where=call_weights > 0)
+
+        # Equity of each caller against each pusher's pushing range
+        push_weights = self.__weights @ self.__push.T
+        push_equities = np.divide(self.__weighted_equities @ self.__push.T, push_weights,
+                                  out=np.full_like(push_weights, 0.5), where=push_weights > 0)
+
+        for pusher in range(players - 1):
+            no_call = np.ones(preflop.CLASS_COUNT)
+
+            for caller in range(pusher + 1, players):
+                risked = min(self.__stacks[pusher], self.__stacks[caller])
+                pot = 2 * risked + dead - self.__posted[pusher] - self.__posted[caller]
+
+                # Pusher called by this caller after every player in between has folded
+                called = no_call * call_probabilities[caller, pusher]
+                push_evs[pusher] += called * (call_equities[caller, pusher] * pot - risked)
+                no_call *= 1 - call_probabilities[caller, pusher]
+
+                call_evs[caller, pusher] = push_equities[:, pusher] * pot - risked
+
+            push_evs[pusher] += no_call * (dead - self.__posted[pusher])
+
+        return push_evs, -self.__posted, call_evs
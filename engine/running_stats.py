@@ -0,0 +1,311 @@
+"""
+Author:     Chris Knowles
+File:       running_stats.py
+Version:    1.0.0
+Notes:      Streaming statistics for Monte Carlo simulations, RunningStats keeps the count, running
+            means and sums of squared deviations of a vector of values (eg. the win, tie and EV
+            of every player) so samples are folded in a batch at a time in constant memory, the
+            accumulators of separate workers merge exactly (Chan et al.) in any grouping, and
+            simulate() draws batches, on worker processes if asked, until the confidence
+            interval of every tracked mean is within a target precision, the batches are seeded
+            from one SeedSequence and merged in order so the result depends only on the seed and
+            never on the number of workers, batches can instead be drawn on a pool of threads,
+            which avoids starting processes and pickling the sampler and scales with the number
+            of threads on a free-threaded (no GIL) build of Python, on a build with the GIL only
+            the parts of a batch that release it (eg. large numpy operations) run in parallel
+"""
+# Imports
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from statistics import NormalDist
+import time
+import numpy as np
+
+
+# Global consts
+DEFAULT_CONFIDENCE = 0.95
+
+
+# Classes
+class RunningStats:
+    """
+    Running count, means and variances of a vector of values - class variables:
+        none
+    """
+    def __init__(self, size):
+        """
+        Initialiser - instance variables:
+            __count: number of samples so far, as integer, property with read only access
+            __mean: running mean of each value, as numpy float64 array, property with read only access
+            __m2: running sum of squared deviations from the mean of each value, as numpy float64 array
+
+        :param size: number of values in each sample, an accumulator of size 0 takes the size of the first
+                     samples folded into it
+        """
+        self.__count = 0
+        self.__mean = np.zeros(size)
+        self.__m2 = np.zeros(size)
+
+    @property
+    def count(self):
+        return self.__count
+
+    @property
+    def size(self):
+        return len(self.__mean)
+
+    @property
+    def mean(self):
+        return self.__mean
+
+    @property
+    def variance(self):
+        # Unbiased sample variance of each value
+        return self.__m2 / (self.__count - 1) if self.__count > 1 else np.full(self.size, np.inf)
+
+    @property
+    def std_error(self):
+        return np.sqrt(self.variance / max(self.__count, 1))
+
+    def update(self, samples):
+        """
+        Folds the supplied samples into the running statistics
+
+        :param samples: numpy array of shape (samples, size) of values
+
+        :return nothing
+        """
+        samples = np.asarray(samples, dtype=np.float64)
+        if not len(samples):
+            return
+
+        mean = samples.mean(axis=0)
+        self.__merge(len(samples), mean, ((samples - mean) ** 2).sum(axis=0))
+
+    def merge(self, other):
+        """
+        Folds the statistics of another accumulator of the same values into this one (eg. those of a worker),
+        the result is the same as if every sample of both had been folded into one accumulator
+
+        :param other: RunningStats class instance
+
+        :return nothing
+        """
+        self.__merge(other.count, other.mean, other.__m2)
+
+    def half_width(self, confidence=DEFAULT_CONFIDENCE):
+        """
+        Returns the half width of the normal approximation confidence interval of each mean
+
+        :param confidence: confidence level of the interval, eg. 0.95
+
+        :return numpy float64 array
+        """
+        return z_score(confidence) * self.std_error
+
+    def confidence_interval(self, confidence=DEFAULT_CONFIDENCE):
+        """
+        Returns the normal approximation confidence interval of each mean
+
+        :param confidence: confidence level of the interval, eg. 0.95
+
+        :return tuple of numpy float64 arrays (lower bounds, upper bounds)
+        """
+        half_width = self.half_width(confidence)
+
+        return self.__mean - half_width, self.__mean + half_width
+
+    def __merge(self, count, mean, m2):
+        """
+        Folds the count, means and sums of squared deviations of another set of samples into this one
+
+        :param count: number of samples
+        :param mean: numpy array of the mean of each value
+        :param m2: numpy array of the sum of squared deviations from the mean of each value
+
+        :return nothing
+        """
+        if not count:
+            return
+
+        if not self.__count:
+            self.__count = count
+            self.__mean = np.array(mean, dtype=np.float64)
+            self.__m2 = np.array(m2, dtype=np.float64)
+            return
+
+        total = self.__count + count
+        delta = mean - self.__mean
+        self.__mean = self.__mean + delta * (count / total)
+        self.__m2 = self.__m2 + m2 + delta ** 2 * (self.__count * count / total)
+        self.__count = total
+
+    def __str__(self):
+        """
+        To string method
+
+        :return string representation of this running statistics instance
+        """
+        return "n={0} mean={1} se={2}".format(self.__count, np.round(self.__mean, 6),
+                                              np.round(self.std_error, 6))
+
+
+class SimulationReport:
+    """
+    Outcome of a simulation run to a target precision - class variables:
+        none
+    """
+    def __init__(self, stats, confidence, precision, converged, elapsed):
+        """
+        Initialiser - instance variables:
+            __stats: statistics of every sample, as RunningStats class, property with read only access
+            __confidence: confidence level of the intervals, as float, property with read only access
+            __precision: target half width of the tracked confidence intervals, as float, property with read
+                         only access
+            __converged: the target precision was reached before the sample limit, as boolean, property with
+                         read only access
+            __elapsed: time taken to converge (or reach the sample limit) in seconds, as float, property with
+                       read only access
+
+        :param stats: statistics of every sample
+        :param confidence: confidence level of the intervals
+        :param precision: target half width of the tracked confidence intervals
+        :param converged: the target precision was reached
+        :param elapsed: time taken in seconds
+        """
+        self.__stats = stats
+        self.__confidence = confidence
+        self.__precision = precision
+        self.__converged = converged
+        self.__elapsed = elapsed
+
+    @property
+    def stats(self):
+        return self.__stats
+
+    @property
+    def confidence(self):
+        return self.__confidence
+
+    @property
+    def precision(self):
+        return self.__precision
+
+    @property
+    def converged(self):
+        return self.__converged
+
+    @property
+    def elapsed(self):
+        return self.__elapsed
+
+    @property
+    def samples(self):
+        return self.__stats.count
+
+    @property
+    def mean(self):
+        return self.__stats.mean
+
+    @property
+    def half_width(self):
+        return self.__stats.half_width(self.__confidence)
+
+    def __str__(self):
+        """
+        To string method
+
+        :return string representation of this report instance
+        """
+        return "{0} samples in {1:.3f}s ({2}): mean={3} +/-{4} at {5:.0%}".format(
+            self.samples, self.__elapsed, "converged" if self.__converged else "sample limit reached",
+            np.round(self.mean, 6), np.round(self.half_width, 6), self.__confidence)
+
+
+# Functions
+def z_score(confidence):
+    """
+    Returns the two-sided standard normal critical value of the supplied confidence level
+
+    :param confidence: confidence level, eg. 0.95
+
+    :return critical value, eg. 1.96
+    """
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def sample_batch(sampler, batch_size, sequence):
+    """
+    Draws one batch of samples and returns their statistics, this runs on a worker process or thread when
+    simulating in parallel so only the small accumulator is sent back, each batch has its own generator so
+    batches drawn at the same time share no random state
+
+    :param sampler: function of (batch size, numpy Generator) returning a numpy array of shape (samples, size),
+                    it must be picklable (eg. a module level function or functools.partial of one) for worker
+                    processes and must not change any state shared with other batches for worker threads
+    :param batch_size: number of samples in the batch
+    :param sequence: SeedSequence of the batch
+
+    :return RunningStats class instance
+    """
+    samples = sampler(batch_size, np.random.default_rng(sequence))
+    stats = RunningStats(samples.shape[1])
+    stats.update(samples)
+
+    return stats
+
+
+def simulate(sampler, precision, confidence=DEFAULT_CONFIDENCE, tracked=None, batch_size=10000,
+             min_samples=10000, max_samples=10000000, seed=None, workers=None, threads=None):
+    """
+    Draws batches of samples until the confidence interval of every tracked mean is no wider than the target
+    precision either side of the mean, or until the sample limit is reached
+
+    :param sampler: function of (batch size, numpy Generator) returning a numpy array of shape (samples, size)
+    :param precision: target half width of the confidence interval of each tracked mean
+    :param confidence: confidence level of the intervals
+    :param tracked: indices of the values whose means must reach the target precision, if None then every value
+    :param batch_size: number of samples in each batch
+    :param min_samples: number of samples drawn before stopping is considered
+    :param max_samples: largest number of samples drawn
+    :param seed: seed of the root SeedSequence the batches are seeded from, None for fresh entropy
+    :param workers: number of worker processes drawing batches, if None then batches are drawn in this process
+    :param threads: number of threads drawing batches in this process, used rather than worker processes if
+                    not None, the result is the same for any number of threads or workers
+
+    :return SimulationReport class instance
+    """
+    start = time.perf_counter()
+    root = np.random.SeedSequence(seed)
+    sequences = iter(root.spawn(-(-max_samples // batch_size)))
+    stats = RunningStats(0)
+
+    def converged():
+        if stats.count < min_samples:
+            return False
+        half_width = stats.half_width(confidence)
+        return bool(np.all((half_width if tracked is None else half_width[tracked]) <= precision))
+
+    if workers is None and threads is None:
+        for sequence in sequences:
+            stats.merge(sample_batch(sampler, batch_size, sequence))
+            if converged():
+                break
+    else:
+        executor, workers = (ProcessPoolExecutor, workers) if threads is None else (ThreadPoolExecutor, threads)
+        with executor(workers) as pool:
+            # Keep every worker busy with a couple of batches in hand, merging the results in the order submitted
+            pending = deque(pool.submit(sample_batch, sampler, batch_size, sequence)
+                            for sequence in islice(sequences, workers * 2))
+            while pending:
+                stats.merge(pending.popleft().result())
+                if converged():
+                    for future in pending:
+                        future.cancel()
+                    break
+                for sequence in islice(sequences, 1):
+                    pending.append(pool.submit(sample_batch, sampler, batch_size, sequence))
+
+    return SimulationReport(stats, confidence, precision, converged(), time.perf_counter() - start)
@@ -0,0 +1,146 @@
+"""
+Author:     Chris Knowles
+File:       shared_batch.py
+Version:    1.0.0
+Notes:      Batches of dealt hands held in shared memory, a batch is a numpy int8 array of integer
+            encoded cards (one byte per card, see Card.index) of shape (hands, cards per hand), one
+            process creates and deals the batch and any number of worker processes attach to it by
+            its small descriptor and read the cards in place, so passing a batch of hands to a
+            worker costs no more than passing its name
+"""
+# Imports
+import numpy as np
+from engine import evaluator
+from engine import preflop
+from engine import tables
+from data_model import codec
+
+
+# Classes
+class SharedHandBatch:
+    """
+    Batch of dealt hands held in shared memory - class variables:
+        none
+    """
+    def __init__(self, shape, memory):
+        """
+        Initialiser - instance variables:
+            __shape: shape of the batch, as tuple of (hands, cards per hand), property with read only access
+            __memory: SharedMemory instance holding the batch
+            __cards: integer encoded cards of every hand, as numpy int8 array of shape (hands, cards per hand)
+                     viewing the shared memory, unused cards are evaluator.NO_CARD, property with read only
+                     access
+
+        :param shape: shape of the batch
+        :param memory: SharedMemory instance holding the batch
+        """
+        self.__shape = tuple(shape)
+        self.__memory = memory
+        self.__cards = np.ndarray(self.__shape, dtype=np.int8, buffer=memory.buf)
+
+    @property
+    def shape(self):
+        return self.__shape
+
+    @property
+    def cards(self):
+        return self.__cards
+
+    @property
+    def descriptor(self):
+        # Everything another process needs to attach to this batch
+        return self.__memory.name, self.__shape
+
+    @classmethod
+    def create(cls, hand_count, cards_per_hand):
+        """
+        Creates a new batch in shared memory with every card set to evaluator.NO_CARD
+
+        :param hand_count: number of hands in the batch
+        :param cards_per_hand: number of cards in each hand
+
+        :return SharedHandBatch instance
+        """
+        memory = tables.create_memory(max(hand_count * cards_per_hand, 1))
+        batch = cls((hand_count, cards_per_hand), memory)
+        batch.cards.fill(evaluator.NO_CARD)
+
+        return batch
+
+    @classmethod
+    def attach(cls, descriptor):
+        """
+        Attaches to an existing batch, no cards are copied
+
+        :param descriptor: descriptor of the batch (see descriptor property)
+
+        :return SharedHandBatch instance
+        """
+        name, shape = descriptor
+
+        return cls(shape, tables.open_memory(name))
+
+    def deal(self, rng, dead_cards=None):
+        """
+        Deals a random hand into every row of the batch, the cards of each hand are all different
+
+        :param rng: numpy random generator used to deal
+        :param dead_cards: numpy integer array of shape (hands, dead cards) of cards that may not be dealt into
+                           the hand of the same row, padded with evaluator.NO_CARD, None if there are none
+
+        :return nothing
+        """
+        hand_count, cards_per_hand = self.__shape
+        if dead_cards is None:
+            dead_cards = np.full((hand_count, 1), evaluator.NO_CARD, dtype=np.int8)
+
+        self.__cards[:] = preflop.deal_boards(dead_cards, cards_per_hand, rng)
+
+    def fill(self, hands, start=0):
+        """
+        Copies the cards of the supplied hands into the batch, from the supplied row on
+
+        :param hands: list of Hand class instances
+        :param start: row of the batch to copy the first hand into
+
+        :return nothing
+        """
+        for row, hand in enumerate(hands, start):
+            self.__cards[row] = evaluator.NO_CARD
+            self.__cards[row, :hand.size] = [c.index for c in hand.cards]
+
+    def hands(self, start=0, stop=None, cards=codec.CARDS):
+        """
+        Returns the hands of the supplied rows of the batch as Hand class instances
+
+        :param start: first row
+        :param stop: row after the last row, None for the end of the batch
+        :param cards: cards indexed by card index to take the cards from (eg. Deck.ordered_cards)
+
+        :return list of Hand class instances
+        """
+        hands = []
+        for row in self.__cards[start:stop]:
+            row = row[row >= 0]
+            hands.append(codec.decode_hand(bytes((self.__shape[1], len(row), 0)) + row.tobytes(), cards))
+
+        return hands
+
+    def close(self):
+        """
+        Closes this process's access to the batch, the cards of this instance must not be used afterwards
+
+        :return nothing
+        """
+        self.__cards = None
+        self.__memory.close()
+
+    def unlink(self):
+        """
+        Closes and frees the batch, this should only be called by the process that created it once every worker
+        has finished with it
+
+        :return nothing
+        """
+        self.close()
+        self.__memory.unlink()
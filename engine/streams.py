@@ -0,0 +1,129 @@
+"""
+Author:     Chris Knowles
+File:       streams.py
+Version:    1.0.0
+Notes:      Seeded random number streams, rather than every component drawing from the global
+            random and numpy generators each dealer's deck (and anything else that needs one)
+            owns a numpy Generator whose stream is spawned from one root SeedSequence, spawned
+            streams are statistically independent of each other, so a run is reproduced from
+            its root seed alone however many components it has, for a multi-process run the
+            main process spawns one child sequence per worker and each worker seeds its own
+            root from it, eg.
+
+                sequences = streams.spawn_sequences(64)
+                with ProcessPoolExecutor(64) as pool:
+                    pool.map(work, sequences)
+
+                def work(sequence):
+                    streams.seed(sequence)
+                    ...
+
+            which keeps the workers independent of each other and repeatable, the same goes for
+            threads, the main thread creates one generator per thread with generator() before the
+            threads start, the functions here are locked so they can be called from any thread but
+            the streams handed out then depend on the order the threads ask for them
+"""
+# Imports
+import threading
+import numpy as np
+
+
+# Global variables
+_root = np.random.SeedSequence()
+_default = None
+_lock = threading.RLock()
+
+
+# Functions
+def seed(entropy=None):
+    """
+    Resets the root sequence of this process, every stream spawned after this follows from the supplied seed
+
+    :param entropy: integer seed, or SeedSequence (eg. one of those returned by spawn_sequences() in the main
+                    process), if None then fresh entropy is taken from the operating system
+
+    :return nothing
+    """
+    global _root, _default
+    with _lock:
+        _root = entropy if isinstance(entropy, np.random.SeedSequence) else np.random.SeedSequence(entropy)
+        _default = None
+
+
+def root_entropy():
+    """
+    Returns the entropy of the root sequence, recording this is enough to repeat a run seeded with fresh entropy
+
+    :return integer entropy of the root sequence
+    """
+    return _root.entropy
+
+
+def spawn_sequences(count):
+    """
+    Spawns child sequences of the root sequence, eg. to seed worker processes
+
+    :param count: number of sequences to spawn
+
+    :return list of SeedSequence instances
+    """
+    with _lock:
+        return _root.spawn(count)
+
+
+def generator():
+    """
+    Returns a new generator whose stream is spawned from the root sequence, the stream of the nth generator
+    spawned depends only on the root seed and n
+
+    :return numpy Generator instance
+    """
+    return np.random.Generator(np.random.PCG64(spawn_sequences(1)[0]))
+
+
+def default_generator():
+    """
+    Returns the generator shared by components that do not own one (eg. Hand.shuffle() when no generator is
+    supplied), it is spawned from the root sequence the first time it is needed after seeding
+
+    :return numpy Generator instance
+    """
+    global _default
+    with _lock:
+        if _default is None:
+            _default = generator()
+
+        return _default
+
+
+def get_state():
+    """
+    Returns the state of the streams of this process for a checkpoint, ie. the root sequence with how many
+    streams it has spawned so far and the state of the shared generator, see set_state()
+
+    :return dict of the state of the streams
+    """
+    with _lock:
+        return {"entropy": _root.entropy,
+                "spawn_key": _root.spawn_key,
+                "spawned": _root.n_children_spawned,
+                "default": None if _default is None else _default.bit_generator.state}
+
+
+def set_state(state):
+    """
+    Restores the streams of this process to the supplied state returned by get_state(), streams spawned after
+    this continue from where the checkpointed run had got to
+
+    :param state: dict as returned by get_state()
+
+    :return nothing
+    """
+    global _root, _default
+    with _lock:
+        _root = np.random.SeedSequence(state["entropy"], spawn_key=state["spawn_key"],
+                                       n_children_spawned=state["spawned"])
+        _default = None
+        if state["default"] is not None:
+            _default = np.random.Generator(np.random.PCG64())
+            _default.bit_generator.state = state["default"]
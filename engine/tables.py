@@ -0,0 +1,312 @@
+"""
+Author:     Chris Knowles
+File:       tables.py
+Version:    1.0.0
+Notes:      Shared lookup tables for worker processes, every module that builds lookup tables on
+            import does so through load(), so once the tables have been built in the main process
+            they can be placed in one block of shared memory (or a memory-mapped file) and every
+            worker process attaches read-only numpy views of them without building or copying
+            anything, the block is described by a small manifest that is passed to the workers
+            either in the environment (see share()) or to install() as a pool initializer, eg.
+
+                shared = tables.share()
+                with ProcessPoolExecutor(64, initializer=tables.install,
+                                         initargs=(shared.manifest,)) as pool:
+                    ...
+                shared.unlink()
+
+            the process that creates the tables owns them and must unlink them once every worker
+            has finished with them, every table is read-only once loaded (numpy tables are marked
+            unwriteable, see freeze(), and list tables are kept as tuples) so they are safe to
+            share between threads without locking, only the numpy tables are shared between
+            processes, the scalar evaluators (evaluator, wild, combinatorics) index Python tuple
+            copies of their tables (see as_tuples()) as indexing a numpy array or a memoryview of
+            the shared block one entry at a time makes evaluate() about 45% slower, these copies
+            are built in every process on import and come to under 0.8 MB a process, the batch
+            evaluators, the Omaha, pre-flop and equity code use the shared numpy tables directly
+"""
+# Imports
+import json
+import os
+import multiprocessing
+from multiprocessing import resource_tracker
+from multiprocessing import shared_memory
+import numpy as np
+
+
+# Global consts
+SHARED_TABLES_ENV = "POKER_SHARED_TABLES"
+TABLE_ALIGNMENT = 64
+
+
+# Global variables
+_loaded = {}
+_installed = None
+_created = set()
+
+
+# Classes
+class SharedTables:
+    """
+    Block of shared memory or memory-mapped file holding groups of named read-only numpy tables - class
+    variables:
+        none
+    """
+    def __init__(self, manifest, memory=None):
+        """
+        Initialiser - instance variables:
+            __manifest: description of the block, as dict of the shared memory name or file path, the size and
+                        the dtype, shape and offset of every table of every group, this is small and can be
+                        pickled or written as JSON, property with read only access
+            __memory: SharedMemory instance, or None for a memory-mapped file
+            __groups: tables of each group, as dict of group name to tuple of read-only numpy arrays viewing
+                      the block, property with read only access
+
+        :param manifest: description of the block
+        :param memory: SharedMemory instance holding the block, None for a memory-mapped file
+        """
+        self.__manifest = manifest
+        self.__memory = memory
+        self.__groups = {}
+
+        for name, group in manifest["groups"].items():
+            arrays = []
+            for dtype, shape, offset in group["tables"]:
+                if memory is None:
+                    array = np.memmap(manifest["path"], dtype=dtype, mode="r", offset=offset, shape=tuple(shape))
+                else:
+                    array = np.ndarray(tuple(shape), dtype=dtype, buffer=memory.buf, offset=offset)
+                    array.flags.writeable = False
+                arrays.append(array)
+            self.__groups[name] = arrays[0] if group["single"] else tuple(arrays)
+
+    @property
+    def manifest(self):
+        return self.__manifest
+
+    @property
+    def groups(self):
+        return self.__groups
+
+    @property
+    def size(self):
+        return self.__manifest["size"]
+
+    @classmethod
+    def create(cls, groups=None, path=None):
+        """
+        Creates a block holding a copy of the supplied groups of tables
+
+        :param groups: tables of each group, as dict of group name to numpy array or tuple of numpy arrays, if
+                       None then every group loaded so far in this process is used
+        :param path: path of the memory-mapped file to write the tables to, if None then the tables are placed
+                     in a new block of shared memory
+
+        :return SharedTables instance
+        """
+        groups = _loaded if groups is None else groups
+        manifest = {"name": None, "path": path, "size": 0, "groups": {}}
+        layout = []
+        offset = 0
+
+        for name, group in groups.items():
+            single = isinstance(group, np.ndarray)
+            arrays = [np.ascontiguousarray(a) for a in ((group,) if single else group)]
+            entries = []
+            for a in arrays:
+                offset = -(-offset // TABLE_ALIGNMENT) * TABLE_ALIGNMENT
+                entries.append((a.dtype.str, list(a.shape), offset))
+                layout.append((a, offset))
+                offset += a.nbytes
+            manifest["groups"][name] = {"single": single, "tables": entries}
+
+        manifest["size"] = max(offset, 1)
+
+        if path is not None:
+            block = np.memmap(path, dtype=np.uint8, mode="w+", shape=(manifest["size"],))
+            for a, start in layout:
+                block[start:start + a.nbytes] = a.view(np.uint8).reshape(-1)
+            block.flush()
+            del block
+
+            return cls(manifest)
+
+        memory = create_memory(manifest["size"])
+        manifest["name"] = memory.name
+        for a, start in layout:
+            memory.buf[start:start + a.nbytes] = a.view(np.uint8).reshape(-1)
+
+        return cls(manifest, memory)
+
+    @classmethod
+    def attach(cls, manifest):
+        """
+        Attaches to an existing block, no tables are copied
+
+        :param manifest: description of the block (see manifest property)
+
+        :return SharedTables instance
+        """
+        if manifest["path"] is not None:
+            return cls(manifest)
+
+        return cls(manifest, open_memory(manifest["name"]))
+
+    def close(self):
+        """
+        Closes this process's access to the block, the tables of this instance must not be used afterwards
+
+        :return nothing
+        """
+        self.__groups = {}
+        if self.__memory is not None:
+            self.__memory.close()
+
+    def unlink(self):
+        """
+        Closes and frees the block, this should only be called by the process that created it once every
+        worker has finished with it
+
+        :return nothing
+        """
+        self.close()
+        if os.environ.get(SHARED_TABLES_ENV) == json.dumps(self.__manifest):
+            del os.environ[SHARED_TABLES_ENV]
+
+        if self.__memory is not None:
+            self.__memory.unlink()
+        elif self.__manifest["path"] is not None and os.path.exists(self.__manifest["path"]):
+            os.remove(self.__manifest["path"])
+
+
+# Functions
+def load(name, builder):
+    """
+    Returns the named group of tables, taken from the installed shared tables if they hold the group or built
+    by the supplied builder otherwise, every group loaded is remembered so that it can be shared
+
+    :param name: unique name of the group (eg. "evaluator.five_card")
+    :param builder: function without parameters returning a numpy array or a tuple of numpy arrays
+
+    :return numpy array or tuple of numpy arrays, as returned by the builder
+    """
+    installed = _installed_tables()
+    group = installed.groups.get(name) if installed is not None else None
+
+    if group is None:
+        group = freeze(builder())
+
+    _loaded[name] = group
+
+    return group
+
+
+def freeze(group):
+    """
+    Marks the supplied tables read-only, so that a table shared between threads (or processes) cannot be
+    changed by mistake, writing to a frozen table raises ValueError
+
+    :param group: numpy array or tuple of numpy arrays
+
+    :return the supplied group
+    """
+    for array in ((group,) if isinstance(group, np.ndarray) else group):
+        array.flags.writeable = False
+
+    return group
+
+
+def as_tuples(array, interned=None):
+    """
+    Returns the entries of the supplied table as (nested) tuples of Python scalars, for scalar code that indexes
+    one entry at a time, which is much faster on Python sequences than on numpy arrays, tuples rather than
+    lists so that the copy is as read-only as the table, this is a copy in each process (see the notes above)
+    so equal entries share one Python object, the tables hold few distinct values (eg. rank masks) so this
+    leaves little more than the tuples' pointers
+
+    :param array: numpy array
+    :param interned: dict of each value already seen to its Python object, used for the rows of a table
+
+    :return tuple, of tuples for a table of more than one dimension
+    """
+    interned = {} if interned is None else interned
+
+    if array.ndim == 1:
+        return tuple(interned.setdefault(v, v) for v in array.tolist())
+
+    return tuple(as_tuples(row, interned) for row in array)
+
+
+def install(manifest):
+    """
+    Attaches the described shared tables so that any module importing after this uses them rather than
+    building its own, this can be used as the initializer of a process pool
+
+    :param manifest: description of the block (see SharedTables.manifest)
+
+    :return nothing
+    """
+    global _installed
+    _installed = SharedTables.attach(manifest)
+
+
+def share(path=None):
+    """
+    Places every group of tables loaded so far in this process in a new block and sets the environment so that
+    any worker process started afterwards attaches to it when it first loads a table
+
+    :param path: path of a memory-mapped file to use, if None then shared memory is used
+
+    :return SharedTables instance, owned by the caller who must unlink it once the workers are finished
+    """
+    shared = SharedTables.create(path=path)
+    os.environ[SHARED_TABLES_ENV] = json.dumps(shared.manifest)
+
+    return shared
+
+
+def create_memory(size):
+    """
+    Creates a new block of shared memory owned by this process
+
+    :param size: size of the block in bytes
+
+    :return SharedMemory instance
+    """
+    memory = shared_memory.SharedMemory(create=True, size=size)
+    _created.add(memory.name)
+
+    return memory
+
+
+def open_memory(name):
+    """
+    Opens an existing block of shared memory without making this process responsible for freeing it, a worker
+    started by multiprocessing shares its parent's resource tracker (as does the creating process itself), but
+    any other process would have its own tracker free the block when it exits (the track parameter only exists
+    from Python 3.13)
+
+    :param name: name of the block
+
+    :return SharedMemory instance
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        memory = shared_memory.SharedMemory(name=name)
+        if multiprocessing.parent_process() is None and name not in _created:
+            resource_tracker.unregister(memory._name, "shared_memory")
+        return memory
+
+
+def _installed_tables():
+    """
+    Returns the installed shared tables, installing them from the environment if the environment describes a
+    block and none have been installed
+
+    :return SharedTables instance, or None if there are no shared tables
+    """
+    if _installed is None and os.environ.get(SHARED_TABLES_ENV):
+        install(json.loads(os.environ[SHARED_TABLES_ENV]))
+
+    return _installed
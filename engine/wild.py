@@ -0,0 +1,239 @@
+"""
+Author:     Chris Knowles
+File:       wild.py
+Version:    1.0.0
+Notes:      Wild card (joker) hand evaluation, a joker stands for any card not already in the hand,
+            rather than trying every substitution the best completion is found directly from the
+            rank masks of the real cards, each hand quality from the royal flush down is checked in
+            turn for whether the wild cards can complete it and the first that can is built with
+            the wild cards taking the highest ranks they can, straights with missing ranks are
+            found from tables built once on import, strengths are the same as evaluator.evaluate()
+"""
+# Imports
+import numpy as np
+from engine import evaluator
+from engine import gconsts
+from engine import tables
+
+
+# Global consts
+MAX_WILD_COUNT = 2
+ALL_RANKS = evaluator.MASK_COUNT - 1
+
+
+# Tables
+def _build_wild_straights():
+    """
+    Builds the straight tables for wild cards, wild_straights[n][mask] is the bit of the top card of the highest
+    straight that can be made from the ranks in mask plus n wild cards, or 0 if none
+
+    :return numpy int32 array of shape (MAX_WILD_COUNT + 1, masks), one table for each number of wild cards
+            from zero up to MAX_WILD_COUNT
+    """
+    runs = [(0b11111 << (top - 4), 1 << top) for top in range(evaluator.ACE_RANK, 3, -1)]
+    runs.append(((1 << evaluator.ACE_RANK) | 0b1111, 1 << 3))
+
+    straights = [evaluator.STRAIGHTS]
+    for n in range(1, MAX_WILD_COUNT + 1):
+        table = [0] * evaluator.MASK_COUNT
+        for m in range(evaluator.MASK_COUNT):
+            for run, top in runs:
+                if evaluator.POPCOUNTS[run & ~m] <= n:
+                    table[m] = top
+                    break
+        straights.append(table)
+
+    return np.array(straights, dtype=np.int32)
+
+
+NP_WILD_STRAIGHTS = tables.load("wild", _build_wild_straights)
+WILD_STRAIGHTS = tables.as_tuples(NP_WILD_STRAIGHTS)
+
+
+# Functions
+def evaluate_wild_masks(masks, wild_count):
+    """
+    Evaluates the strength of the best hand that can be made from the real cards held in the supplied rank
+    masks plus the supplied number of wild cards
+
+    :param masks: rank masks of the real cards as returned by evaluator.rank_masks()
+    :param wild_count: number of wild cards (up to MAX_WILD_COUNT)
+
+    :return strength of the hand (see evaluator.evaluate()), a higher strength is a better hand
+    """
+    if not wild_count:
+        return evaluator.evaluate_masks(masks)
+
+    seen, pairs, trips, quads = masks[0], masks[1], masks[2], masks[3]
+    straights = WILD_STRAIGHTS[wild_count]
+
+    # Check for royal flush and straight flush, the missing cards of a run in a suit are never in the hand
+    top = 0
+    for suit in masks[4:]:
+        top = max(top, straights[suit])
+
+    if top:
+        if top == evaluator.ROYAL_STRAIGHT:
+            return (gconsts.ROYAL_FLUSH_QUALITY_VALUE << evaluator.QUALITY_SHIFT) | (top << evaluator.MAJOR_SHIFT)
+        return (gconsts.STRAIGHT_FLUSH_QUALITY_VALUE << evaluator.QUALITY_SHIFT) | (top << evaluator.MAJOR_SHIFT)
+
+    # Quads of the highest rank held at least four less the wild count times, any wild card left over is the
+    # highest kicker
+    fours = quads | trips | (pairs if wild_count > 1 else 0)
+    if fours:
+        top = evaluator.TOP1[fours]
+        needed = 4 - (3 if trips & top else 2 if pairs & top else 1) if not quads & top else 0
+        kickers = seen | (ALL_RANKS if wild_count > needed else 0)
+        return ((gconsts.QUADS_QUALITY_VALUE << evaluator.QUALITY_SHIFT) | (top << evaluator.MAJOR_SHIFT) |
+                evaluator.TOP1[kickers & ~top])
+
+    # With no trips a full house needs one wild card and two pairs, the higher pair makes the trips (with two
+    # wild cards any pair would have made quads)
+    if evaluator.POPCOUNTS[pairs] > 1:
+        top = evaluator.TOP1[pairs]
+        return ((gconsts.FULL_HOUSE_QUALITY_VALUE << evaluator.QUALITY_SHIFT) | (top << evaluator.MAJOR_SHIFT) |
+                evaluator.TOP1[pairs ^ top])
+
+    # Flush with the wild cards taking the highest ranks missing from the suit
+    flush = 0
+    for suit in masks[4:]:
+        if evaluator.POPCOUNTS[suit] + wild_count >= 5:
+            fill = evaluator.TOP_CARDS[wild_count][ALL_RANKS & ~suit]
+            flush = max(flush, evaluator.TOP5[suit | fill])
+
+    if flush:
+        return (gconsts.FLUSH_QUALITY_VALUE << evaluator.QUALITY_SHIFT) | (flush << evaluator.MAJOR_SHIFT)
+
+    top = straights[seen]
+    if top:
+        return (gconsts.STRAIGHT_QUALITY_VALUE << evaluator.QUALITY_SHIFT) | (top << evaluator.MAJOR_SHIFT)
+
+    # Trips of the highest pair with one wild card or of the highest card with two
+    if pairs or wild_count > 1:
+        top = evaluator.TOP1[pairs if wild_count == 1 else seen]
+        return ((gconsts.TRIPS_QUALITY_VALUE << evaluator.QUALITY_SHIFT) | (top << evaluator.MAJOR_SHIFT) |
+                evaluator.TOP2[seen ^ top])
+
+    # One wild card and no pairs pairs the highest card
+    top = evaluator.TOP1[seen]
+    return ((gconsts.PAIR_QUALITY_VALUE << evaluator.QUALITY_SHIFT) | (top << evaluator.MAJOR_SHIFT) |
+            evaluator.TOP3[seen ^ top])
+
+
+def evaluate_wild(cards):
+    """
+    Evaluates the strength of the best hand made of the supplied cards (up to seven), any card with an index
+    of evaluator.CARD_COUNT or more (ie. a joker, see Joker.index) is wild
+
+    :param cards: iterable of integer encoded cards
+
+    :return strength of the hand, a higher strength is a better hand
+    """
+    real = [c for c in cards if c < evaluator.CARD_COUNT]
+
+    return evaluate_wild_masks(evaluator.rank_masks(real), len(cards) - len(real))
+
+
+def evaluate_wild_hand(hand):
+    """
+    Evaluates the strength of the supplied hand of cards, any jokers are wild
+
+    :param hand: Hand class instance to evaluate
+
+    :return strength of the hand, a higher strength is a better hand
+    """
+    return evaluate_wild([c.index for c in hand.cards])
+
+
+def evaluate_wild_batch(cards):
+    """
+    Evaluates the strength of every hand in the supplied array of hands, any card with an index of
+    evaluator.CARD_COUNT or more is wild, each hand may hold up to MAX_WILD_COUNT wild cards, the whole
+    batch is evaluated with numpy array operations
+
+    :param cards: numpy integer array of shape (hands, cards per hand) of integer encoded cards, padded with
+                  evaluator.NO_CARD
+
+    :return numpy int64 array of the strength of each hand
+    """
+    cards = np.asarray(cards)
+    is_wild = cards >= evaluator.CARD_COUNT
+    wild_count = is_wild.sum(axis=1)
+    seen, pairs, trips, quads, suits = evaluator.rank_masks_batch(np.where(is_wild, evaluator.NO_CARD, cards))
+
+    top1, top2, top3, top5 = (evaluator.NP_TOP_CARDS[1], evaluator.NP_TOP_CARDS[2], evaluator.NP_TOP_CARDS[3],
+                              evaluator.NP_TOP_CARDS[5])
+    popcounts = evaluator.NP_POPCOUNTS
+
+    # Straight flush and flush of the best suit
+    flush_straight = np.zeros_like(seen)
+    flush = np.zeros_like(seen)
+    for suit in suits:
+        flush_straight = np.maximum(flush_straight, NP_WILD_STRAIGHTS[wild_count, suit])
+        fill = evaluator.NP_TOP_CARDS[wild_count, ALL_RANKS & ~suit]
+        flush = np.maximum(flush, np.where(popcounts[suit] + wild_count >= 5, top5[suit | fill], 0))
+
+    # Quads, the rank held most often is completed with wild cards and any wild card left over is a kicker
+    fours = quads | np.where(wild_count > 0, trips, 0) | np.where(wild_count > 1, pairs, 0)
+    quad = top1[fours]
+    held = np.where(quads & quad, 4, np.where(trips & quad, 3, np.where(pairs & quad, 2, 1)))
+    kickers = seen | np.where(wild_count > 4 - held, ALL_RANKS, 0)
+
+    # Full house, without wild cards from trips and a pair, with one wild card from two pairs
+    trip = top1[trips]
+    full_low = top1[pairs & ~trip]
+    wild_full = (wild_count == 1) & (popcounts[pairs] > 1)
+    full_top = np.where(wild_full, top1[pairs], trip)
+    full_low = np.where(wild_full, top1[pairs & ~top1[pairs]], full_low)
+    full = ((trips > 0) & (full_low > 0)) | wild_full
+
+    straight = NP_WILD_STRAIGHTS[wild_count, seen]
+
+    # Trips, from trips held or with wild cards from the highest pair or card, and pairs
+    trips_top = np.select([wild_count == 0, wild_count == 1], [trip, top1[pairs]], top1[seen])
+    made_trips = np.where(wild_count == 0, trips > 0, (wild_count > 1) | (pairs > 0))
+    pair_count = np.where(wild_count == 0, popcounts[pairs], 1)
+    top_pairs = np.where(wild_count == 0, top2[pairs], top1[seen])
+
+    conditions = [flush_straight == evaluator.ROYAL_STRAIGHT, flush_straight > 0, fours > 0, full, flush > 0,
+                  straight > 0, made_trips, pair_count > 1, pair_count > 0]
+
+    major = np.select(conditions[1:],
+                      [flush_straight, quad, full_top, flush, straight, trips_top, top_pairs, top_pairs],
+                      top5[seen])
+    minor = np.select(conditions[1:],
+                      [0, top1[kickers & ~quad], full_low, 0, 0, top2[seen & ~trips_top], top1[seen & ~top_pairs],
+                       top3[seen & ~top_pairs]],
+                      0)
+    quality = np.select(conditions,
+                        [gconsts.ROYAL_FLUSH_QUALITY_VALUE, gconsts.STRAIGHT_FLUSH_QUALITY_VALUE,
+                         gconsts.QUADS_QUALITY_VALUE, gconsts.FULL_HOUSE_QUALITY_VALUE, gconsts.FLUSH_QUALITY_VALUE,
+                         gconsts.STRAIGHT_QUALITY_VALUE, gconsts.TRIPS_QUALITY_VALUE, gconsts.TWO_PAIRS_QUALITY_VALUE,
+                         gconsts.PAIR_QUALITY_VALUE],
+                        gconsts.HIGH_CARD_QUALITY_VALUE)
+
+    return ((quality.astype(np.int64) << evaluator.QUALITY_SHIFT) |
+            (major.astype(np.int64) << evaluator.MAJOR_SHIFT) | minor.astype(np.int64))
+
+
+def evaluate_wild_naive(cards):
+    """
+    Evaluates the strength of the best hand made of the supplied cards by trying every substitution of every
+    wild card, this is only intended as a reference for checking and benchmarking evaluate_wild()
+
+    :param cards: iterable of integer encoded cards
+
+    :return strength of the hand, a higher strength is a better hand
+    """
+    real = [c for c in cards if c < evaluator.CARD_COUNT]
+    wild_count = len(cards) - len(real)
+
+    if not wild_count:
+        return evaluator.evaluate(real)
+
+    best = 0
+    for c in range(evaluator.CARD_COUNT):
+        if c not in real:
+            best = max(best, evaluate_wild_naive(real + [c] + [evaluator.CARD_COUNT] * (wild_count - 1)))
+
+    return best